@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
+import hashlib
 import json
 import os
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Any, Optional
 
 from file_parser import FileParser
-from knowledge_base_manager import KnowledgeBaseManager
+from knowledge_base_manager import SharedKnowledgeBase, get_shared_knowledge_base
+from job_store import JobStore
+from job_manager import JobManager, STATUS_DONE, STATUS_FAILED
 from recommendation_engine import RecommendationEngine
+from pipeline import plan_profiles, process_students, build_export_data, dumps_export_data, json_default
+from reporters import StreamlitReporter
+from config import Config
 
 # Configuration de la page
 st.set_page_config(
@@ -70,6 +77,25 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_knowledge_base_resource(file_path: str) -> SharedKnowledgeBase:
+    """Base de connaissances partagée par toutes les sessions du serveur."""
+    return get_shared_knowledge_base(file_path)
+
+@st.cache_resource
+def get_job_store_resource(db_path: str) -> Optional[JobStore]:
+    """Journal des traitements partagé par toutes les sessions du serveur."""
+    try:
+        return JobStore(db_path)
+    except Exception as e:
+        st.warning(f"⚠️ Reprise des traitements indisponible: {str(e)}")
+        return None
+
+@st.cache_resource
+def get_job_manager_resource() -> JobManager:
+    """Traitements en arrière-plan du serveur (indépendants des sessions et des onglets)."""
+    return JobManager()
+
 def initialize_session_state():
     """Initialise les variables de session."""
     if 'api_key' not in st.session_state:
@@ -78,6 +104,22 @@ def initialize_session_state():
         st.session_state.processed_students = []
     if 'knowledge_base_loaded' not in st.session_state:
         st.session_state.knowledge_base_loaded = False
+    if 'use_cache' not in st.session_state:
+        st.session_state.use_cache = True
+    if 'deduplicate_profiles' not in st.session_state:
+        st.session_state.deduplicate_profiles = Config.DEDUPLICATE_PROFILES
+    if 'resume_jobs' not in st.session_state:
+        st.session_state.resume_jobs = Config.JOB_STORE_ENABLED
+    if 'live_streaming' not in st.session_state:
+        st.session_state.live_streaming = False
+    if 'pack_size' not in st.session_state:
+        st.session_state.pack_size = Config.PACK_SIZE
+    if 'structured_output' not in st.session_state:
+        st.session_state.structured_output = Config.STRUCTURED_OUTPUT
+    if 'results_by_upload' not in st.session_state:
+        st.session_state.results_by_upload = {}
+    if 'background_jobs' not in st.session_state:
+        st.session_state.background_jobs = Config.BACKGROUND_JOBS_ENABLED
 
 def main():
     """Fonction principale de l'application."""
@@ -124,6 +166,49 @@ def main():
             </div>
             """, unsafe_allow_html=True)
         
+        # Cache des recommandations
+        st.subheader("🗄️ Cache des Recommandations")
+        st.session_state.use_cache = st.checkbox(
+            "Réutiliser les recommandations déjà générées",
+            value=st.session_state.use_cache,
+            help="Décochez pour forcer un nouvel appel à l'IA pour chaque étudiant"
+        )
+        st.session_state.deduplicate_profiles = st.checkbox(
+            "Regrouper les profils identiques",
+            value=st.session_state.deduplicate_profiles,
+            help="Un seul appel à l'IA par couple filière / carrière envisagée, personnalisé ensuite pour chaque étudiant"
+        )
+        st.session_state.resume_jobs = st.checkbox(
+            "Reprendre les traitements interrompus",
+            value=st.session_state.resume_jobs,
+            help="Chaque résultat est enregistré dès qu'il est prêt: un fichier déjà traité en partie reprend là où il s'était arrêté"
+        )
+        st.session_state.live_streaming = st.checkbox(
+            "Afficher les réponses de l'IA en direct",
+            value=st.session_state.live_streaming,
+            help="Le texte s'affiche dès sa génération; les étudiants sont alors traités un par un, sans regroupement des profils"
+        )
+        st.session_state.background_jobs = st.checkbox(
+            "Traiter en arrière-plan",
+            value=st.session_state.background_jobs,
+            help="L'analyse se poursuit sur le serveur: la page reste utilisable et vous pouvez la quitter, "
+                 "puis revenir consulter l'avancement et les résultats (hors affichage en direct)"
+        )
+        st.session_state.structured_output = st.checkbox(
+            "Réponses structurées (JSON)",
+            value=st.session_state.structured_output,
+            help="L'IA répond en JSON selon un schéma fixe: les sections sont lues directement, "
+                 "sans recherche de titres dans le texte (non utilisé en affichage direct)"
+        )
+        st.session_state.pack_size = st.number_input(
+            "Étudiants par appel à l'IA",
+            min_value=1,
+            max_value=10,
+            value=st.session_state.pack_size,
+            help="Au-delà de 1, plusieurs étudiants partagent un même appel (moins d'appels et de tokens, "
+                 "qualité légèrement moindre); un étudiant dont la réponse est invalide est réanalysé seul"
+        )
+        
         # Informations sur l'application
         st.subheader("ℹ️ À Propos")
         st.markdown("""
@@ -142,8 +227,8 @@ def main():
         st.header("📁 Téléversement du Fichier Étudiants")
         
         uploaded_file = st.file_uploader(
-            "Choisissez un fichier Excel (.xlsx) ou Word (.docx)",
-            type=['xlsx', 'docx'],
+            "Choisissez un fichier Excel (.xlsx), Word (.docx), CSV, Parquet ou JSON Lines (.jsonl)",
+            type=Config.SUPPORTED_FILE_TYPES,
             help="Le fichier doit contenir les colonnes: Nom, Prénom, Date de Naissance, Lieu de Naissance, Filière Actuelle, Carrière Envisagée"
         )
         
@@ -157,56 +242,56 @@ def main():
                 return
             
             try:
-                # Traitement du fichier
-                with st.spinner("📖 Lecture du fichier..."):
-                    file_parser = FileParser()
-                    students_data = file_parser.parse_file(uploaded_file)
+                # Base de connaissances partagée (rechargée si le fichier a changé)
+                with st.spinner("📚 Chargement de la base de connaissances..."):
+                    shared_kb = get_knowledge_base_resource(knowledge_file_path)
+                    kb_manager = shared_kb.get()
                 
-                if students_data:
-                    st.success(f"✅ {len(students_data)} étudiants trouvés dans le fichier")
-                    
-                    # Chargement de la base de connaissances
-                    with st.spinner("📚 Chargement de la base de connaissances..."):
-                        kb_manager = KnowledgeBaseManager()
-                        kb_manager.load_knowledge_base(knowledge_file_path)
-                    
-                    # Initialisation du moteur de recommandation
-                    rec_engine = RecommendationEngine(st.session_state.api_key, kb_manager)
-                    
-                    # Traitement des recommandations
+                if kb_manager is None:
+                    st.error("📚 Impossible de charger la base de connaissances. Vérifiez le fichier knowledge_base_benin.json.")
+                    return
+                
+                # Résultats déjà calculés pour ce fichier (nouvelle exécution du script après un clic)
+                upload_hash = JobStore.hash_file(uploaded_file)
+                result_key = get_result_key(upload_hash, shared_kb.version)
+                memoized = st.session_state.results_by_upload.get(result_key)
+                
+                if memoized is not None:
+                    processed_students = memoized['processed_students']
                     st.header("🎯 Analyse et Recommandations")
-                    
-                    processed_students = []
-                    progress_bar = st.progress(0)
-                    
-                    for i, student in enumerate(students_data):
-                        with st.spinner(f"🤖 Analyse en cours pour {student.get('Nom', 'N/A')} {student.get('Prénom', 'N/A')}..."):
-                            try:
-                                recommendation = rec_engine.generate_recommendation(student)
-                                processed_students.append({
-                                    'student': student,
-                                    'recommendation': recommendation
-                                })
-                            except Exception as e:
-                                st.error(f"❌ Erreur lors de l'analyse de {student.get('Nom', 'N/A')}: {str(e)}")
-                                processed_students.append({
-                                    'student': student,
-                                    'recommendation': {'error': str(e)}
-                                })
-                        
-                        progress_bar.progress((i + 1) / len(students_data))
-                    
+                    st.success(f"✅ {len(processed_students)} étudiants déjà analysés pour ce fichier")
+                    if st.button("🔄 Relancer l'analyse", help="Refait l'analyse de ce fichier (les étudiants "
+                                 "déjà traités sont repris si la reprise des traitements est activée)"):
+                        st.session_state.results_by_upload.pop(result_key, None)
+                        st.rerun()
                     st.session_state.processed_students = processed_students
-                    progress_bar.empty()
+                    display_results(processed_students, result_key)
+                else:
+                    # Traitement en arrière-plan déjà lancé pour ce fichier (même session ou retour sur la page)
+                    job_manager = get_background_job_manager()
+                    background_job = job_manager.find(result_key, get_owner_id()) if job_manager else None
                     
-                    # Affichage des résultats
-                    display_results(processed_students)
+                    if background_job is None:
+                        processed_students = analyze_upload(uploaded_file, upload_hash, kb_manager,
+                                                            job_manager=job_manager, result_key=result_key)
+                        if job_manager is not None:
+                            background_job = job_manager.find(result_key, get_owner_id())
                     
-                else:
-                    st.error("❌ Aucun étudiant trouvé dans le fichier. Vérifiez le format.")
+                    if background_job is not None:
+                        render_background_job(background_job.job_id, result_key)
+                    elif processed_students:
+                        remember_results(result_key, processed_students)
+                        st.session_state.processed_students = processed_students
+                        
+                        # Affichage des résultats
+                        display_results(processed_students, result_key)
                     
             except Exception as e:
                 st.error(f"❌ Erreur lors du traitement du fichier: {str(e)}")
+        
+        elif st.session_state.api_key and get_background_job_manager() is not None:
+            # Retour sur la page: avancement et résultats des fichiers déjà soumis
+            render_background_jobs_overview()
     
     with col2:
         st.header("📊 Statistiques")
@@ -221,8 +306,325 @@ def main():
         else:
             st.info("📊 Les statistiques apparaîtront après l'analyse")
 
-def display_results(processed_students: List[Dict[str, Any]]):
-    """Affiche les résultats des analyses."""
+def get_result_key(upload_hash: str, kb_version: Optional[str]) -> str:
+    """
+    Clé des résultats mémorisés d'un fichier: contenu du fichier, version de la
+    base de connaissances, configuration du modèle et options d'analyse.
+    
+    Args:
+        upload_hash: Empreinte du fichier téléversé
+        kb_version: Version de la base de connaissances partagée
+        
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    parts = {
+        'upload': upload_hash,
+        'knowledge_base': kb_version,
+        'model': Config.get_model_config(),
+        'use_cache': st.session_state.use_cache,
+        'deduplicate_profiles': st.session_state.deduplicate_profiles,
+        'pack_size': st.session_state.pack_size,
+        'structured_output': st.session_state.structured_output
+    }
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def remember_results(result_key: str, processed_students: List[Dict[str, Any]]):
+    """
+    Mémorise les résultats d'un fichier dans la session (les plus anciens sont oubliés).
+    
+    Args:
+        result_key: Clé calculée par get_result_key
+        processed_students: Résultats {'student', 'recommendation'} du fichier
+    """
+    results = st.session_state.results_by_upload
+    results.pop(result_key, None)
+    results[result_key] = {'processed_students': processed_students, 'export_json': None}
+    while len(results) > Config.SESSION_RESULTS_MAX:
+        results.pop(next(iter(results)))
+
+def analyze_upload(uploaded_file, upload_hash: str, kb_manager,
+                   job_manager: Optional[JobManager] = None,
+                   result_key: str = '') -> Optional[List[Dict[str, Any]]]:
+    """
+    Analyse un fichier téléversé: lecture, regroupement des profils, appels à l'IA.
+    
+    Args:
+        uploaded_file: Fichier téléversé
+        upload_hash: Empreinte du fichier (identifiant du traitement dans le journal)
+        kb_manager: Base de connaissances chargée
+        job_manager: Gestionnaire des traitements en arrière-plan (sinon analyse dans la page)
+        result_key: Clé des résultats du fichier
+        
+    Returns:
+        Optional[List[Dict[str, Any]]]: Résultats {'student', 'recommendation'}, ou None si aucun
+        étudiant ou si l'analyse a été soumise en arrière-plan
+    """
+    # Traitement du fichier
+    with st.spinner("📖 Lecture du fichier..."):
+        file_parser = FileParser(reporter=StreamlitReporter())
+        students_data = file_parser.parse_file(uploaded_file)
+    
+    if not students_data:
+        st.error("❌ Aucun étudiant trouvé dans le fichier. Vérifiez le format.")
+        return None
+    
+    st.success(f"✅ {len(students_data)} étudiants trouvés dans le fichier")
+    
+    # Initialisation du moteur de recommandation
+    rec_engine = RecommendationEngine(
+        st.session_state.api_key,
+        kb_manager,
+        use_cache=st.session_state.use_cache,
+        pack_size=st.session_state.pack_size,
+        structured_output=st.session_state.structured_output
+    )
+    
+    # Regroupement des profils identiques
+    plan = plan_profiles(students_data, deduplicate=st.session_state.deduplicate_profiles)
+    if plan is not None:
+        st.info(f"🧩 {plan.distinct_profiles} profils distincts pour {plan.total_students} étudiants: "
+                f"{plan.calls_saved} appels à l'IA évités ({plan.collapse_ratio:.0%})")
+    
+    # Journal des traitements: reprise d'un fichier déjà traité en partie
+    job_store = None
+    job_id = None
+    if st.session_state.resume_jobs:
+        job_store = get_job_store_resource(Config.JOB_STORE_FILE)
+    if job_store is not None:
+        job_id = upload_hash
+        job_store.start_job(job_id, uploaded_file.name, len(students_data))
+        job_summary = job_store.get_job_summary(job_id)
+        if job_summary['done']:
+            st.info(f"⏯️ Reprise: {min(job_summary['done'], len(students_data))} étudiants déjà traités "
+                    f"lors d'une exécution précédente, seuls les restants sont analysés")
+    
+    if job_manager is not None:
+        # Le moteur appartient désormais au traitement, qui le ferme à la fin
+        job_manager.submit(students_data, rec_engine, uploaded_file.name, key=result_key, owner=get_owner_id(),
+                           plan=plan, job_store=job_store, store_job_id=job_id)
+        return None
+    
+    with rec_engine:
+        
+        # Traitement des recommandations
+        st.header("🎯 Analyse et Recommandations")
+        
+        processed_students = [None] * len(students_data)
+        progress_bar = st.progress(0)
+        completed = 0
+        
+        if st.session_state.live_streaming:
+            processed_students = render_live_recommendations(
+                students_data, rec_engine, progress_bar, job_store=job_store, job_id=job_id
+            )
+        else:
+            with st.spinner(f"🤖 Analyse en cours de {len(students_data)} étudiants..."):
+                for i, item in process_students(students_data, rec_engine, plan=plan,
+                                                job_store=job_store, job_id=job_id):
+                    recommendation = item['recommendation']
+                    if 'error' in recommendation:
+                        st.error(f"❌ Erreur lors de l'analyse de {item['student'].get('Nom', 'N/A')}: {recommendation['error']}")
+                    processed_students[i] = item
+                    
+                    completed += 1
+                    progress_bar.progress(completed / len(students_data))
+        
+        progress_bar.empty()
+        
+        cache_stats = rec_engine.get_engine_stats()['cache']
+        if cache_stats['enabled']:
+            st.caption(f"🗄️ Cache: {cache_stats['hits']} recommandations réutilisées, "
+                       f"{cache_stats['misses']} appels à l'IA")
+    
+    return processed_students
+
+def get_owner_id() -> str:
+    """Identifiant de l'utilisateur (empreinte de sa clé API) pour retrouver ses traitements."""
+    return hashlib.sha256(st.session_state.api_key.encode('utf-8')).hexdigest()[:16]
+
+def get_background_job_manager() -> Optional[JobManager]:
+    """Gestionnaire des traitements en arrière-plan, ou None si l'analyse se fait dans la page."""
+    if st.session_state.background_jobs and not st.session_state.live_streaming:
+        return get_job_manager_resource()
+    return None
+
+def format_duration(seconds: float) -> str:
+    """Durée lisible (ex. « 3 min 05 s »)."""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes} min {seconds:02d} s" if minutes else f"{seconds} s"
+
+def summarize_results(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Tableau récapitulatif des résultats disponibles (suivi d'un traitement en cours).
+    
+    Args:
+        results: Résultats {'student', 'recommendation'}
+        
+    Returns:
+        pd.DataFrame: Une ligne par étudiant
+    """
+    rows = []
+    for item in results:
+        student = item['student']
+        recommendation = item['recommendation']
+        rows.append({
+            'Nom': student.get('Nom', ''),
+            'Prénom': student.get('Prénom', ''),
+            'Filière Actuelle': student.get('Filière Actuelle', ''),
+            'Carrière Envisagée': student.get('Carrière Envisagée', ''),
+            "Niveau d'Adéquation": (f"❌ {recommendation['error']}" if 'error' in recommendation
+                                    else recommendation.get('adequacy_level', ''))
+        })
+    return pd.DataFrame(rows)
+
+@st.fragment(run_every=Config.BACKGROUND_POLL_INTERVAL)
+def render_background_job(job_id: str, result_key: str):
+    """Avancement d'un traitement en arrière-plan, rafraîchi périodiquement sans bloquer la page."""
+    job_manager = get_job_manager_resource()
+    job = job_manager.get(job_id)
+    if job is None:
+        st.warning("⚠️ Traitement introuvable (serveur redémarré ou traitement expiré). Téléversez à nouveau le fichier.")
+        return
+    
+    if job.status == STATUS_DONE:
+        # Résultats complets: mémorisés puis affichés par une exécution complète de la page
+        remember_results(result_key, job.get_results())
+        st.rerun()
+    
+    st.header("🎯 Analyse et Recommandations")
+    if job.is_finished:
+        if job.status == STATUS_FAILED:
+            st.error(f"❌ Traitement en échec: {job.error}")
+        else:
+            st.warning(f"⏹️ Traitement arrêté: {job.completed}/{job.total} étudiants analysés")
+        if st.button("🔄 Relancer l'analyse", key=f"restart_{job_id}"):
+            job_manager.forget(job_id)
+            st.rerun()
+    else:
+        progress_text = f"🤖 {job.completed}/{job.total} étudiants analysés"
+        eta = job.eta_seconds
+        if eta is not None:
+            progress_text += f" - fin estimée dans {format_duration(eta)}"
+        st.progress(job.progress, text=progress_text)
+        st.caption("Le traitement se poursuit sur le serveur, même si vous quittez la page.")
+        if job.errors:
+            st.warning(f"⚠️ {job.errors} erreur(s) d'analyse pour l'instant")
+        if st.button("⏹️ Arrêter le traitement", key=f"cancel_{job_id}"):
+            job_manager.cancel(job_id)
+    
+    results = job.get_results()
+    if results:
+        st.dataframe(summarize_results(results), hide_index=True, use_container_width=True)
+
+@st.fragment(run_every=Config.BACKGROUND_POLL_INTERVAL)
+def render_background_jobs_overview():
+    """Traitements en arrière-plan de l'utilisateur, avec le rapport des fichiers terminés."""
+    jobs = get_job_manager_resource().list_jobs(owner=get_owner_id())
+    if not jobs:
+        return
+    
+    st.subheader("🗂️ Traitements en Arrière-Plan")
+    for job in jobs:
+        started = pd.Timestamp.fromtimestamp(job.submitted_at).strftime('%d/%m %H:%M')
+        st.markdown(f"**{job.file_name}** ({started})")
+        if job.status == STATUS_DONE:
+            if job.key not in st.session_state.results_by_upload:
+                remember_results(job.key, job.get_results())
+            processed_students = st.session_state.results_by_upload[job.key]['processed_students']
+            st.caption(f"✅ Terminé: {job.total} étudiants, {job.errors} erreur(s)")
+            st.download_button(
+                label="💾 Télécharger le Rapport JSON",
+                data=get_export_json(job.key, processed_students),
+                file_name=f"rapport_orientation_{Path(job.file_name).stem}.json",
+                mime="application/json",
+                key=f"download_{job.job_id}",
+                on_click="ignore"
+            )
+        elif job.is_finished:
+            st.caption(f"⏹️ Interrompu: {job.completed}/{job.total} étudiants analysés"
+                       + (f" ({job.error})" if job.error else ""))
+        else:
+            st.progress(job.progress, text=f"{job.completed}/{job.total} étudiants analysés")
+
+# Titres des sections affichés pendant la génération en direct
+SECTION_LABELS = {
+    'analysis': "📊 Analyse",
+    'adequacy_level': "⚖️ Niveau d'Adéquation",
+    'alternative_careers': "🔄 Carrières Alternatives",
+    'personalized_path': "🛤️ Parcours Personnalisé"
+}
+
+def render_live_recommendations(students_data: List[Dict[str, Any]], rec_engine: RecommendationEngine,
+                                progress_bar, job_store: Optional[JobStore] = None,
+                                job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Génère les recommandations une par une en affichant le texte de l'IA dès sa réception."""
+    completed_items = job_store.get_completed(job_id) if job_store is not None and job_id else {}
+    processed_students = []
+    
+    for i, student in enumerate(students_data):
+        item = completed_items.get(i)
+        if item is None or item['student'] != student:
+            student_name = f"{student.get('Nom', 'N/A')} {student.get('Prénom', 'N/A')}"
+            live_slot = st.empty()
+            text = ""
+            ready_sections = []
+            last_render = 0.0
+            recommendation = {'error': "Aucune réponse de l'IA"}
+            
+            for event in rec_engine.generate_recommendation_stream(student):
+                if event['type'] == 'delta':
+                    text += event['text']
+                elif event['type'] == 'section':
+                    ready_sections.append(SECTION_LABELS.get(event['section'], event['section']))
+                elif event['type'] == 'done':
+                    recommendation = event['recommendation']
+                elif event['type'] == 'error':
+                    recommendation = {'error': event['error']}
+                
+                # Limiter la fréquence de rafraîchissement de l'affichage
+                if event['type'] in ('delta', 'section') and time.time() - last_render > 0.1:
+                    status = f" — sections prêtes: {', '.join(ready_sections)}" if ready_sections else ""
+                    live_slot.markdown(f"**🤖 {student_name}**{status}\n\n{text} ▌")
+                    last_render = time.time()
+            
+            if 'error' in recommendation:
+                live_slot.error(f"❌ Erreur lors de l'analyse de {student.get('Nom', 'N/A')}: {recommendation['error']}")
+            else:
+                live_slot.markdown(f"✅ **{student_name}**: recommandation générée")
+            
+            item = {'student': student, 'recommendation': recommendation}
+            if job_store is not None and job_id:
+                job_store.record_result(job_id, i, item, json_default=json_default)
+        
+        processed_students.append(item)
+        progress_bar.progress((i + 1) / len(students_data))
+    
+    return processed_students
+
+def get_export_json(result_key: Optional[str], processed_students: List[Dict[str, Any]]) -> str:
+    """
+    Rapport JSON exporté, sérialisé une seule fois par résultat mémorisé.
+    
+    Args:
+        result_key: Clé des résultats mémorisés (None: pas de mémorisation)
+        processed_students: Résultats {'student', 'recommendation'}
+        
+    Returns:
+        str: Rapport JSON
+    """
+    memoized = st.session_state.results_by_upload.get(result_key) if result_key else None
+    if memoized is not None and memoized['export_json'] is not None:
+        return memoized['export_json']
+    
+    export_json = dumps_export_data(build_export_data(processed_students))
+    if memoized is not None:
+        memoized['export_json'] = export_json
+    return export_json
+
+def display_results(processed_students: List[Dict[str, Any]], result_key: Optional[str] = None):
+    """Affiche les résultats des analyses (result_key: résultats mémorisés, pour l'export)."""
     st.header("📋 Résultats Détaillés")
     
     for i, item in enumerate(processed_students):
@@ -277,19 +679,15 @@ def display_results(processed_students: List[Dict[str, Any]]):
                 </div>
                 """, unsafe_allow_html=True)
     
-    # Bouton d'export (fonctionnalité future)
-    if st.button("📤 Exporter les Résultats (JSON)", key="export_results"):
-        export_data = {
-            'students_analysis': processed_students,
-            'generated_at': pd.Timestamp.now().isoformat()
-        }
-        
-        st.download_button(
-            label="💾 Télécharger le Rapport JSON",
-            data=json.dumps(export_data, ensure_ascii=False, indent=2),
-            file_name=f"rapport_orientation_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json"
-        )
+    # Export: le téléchargement ne relance pas le script (on_click="ignore")
+    st.download_button(
+        label="📤 Exporter les Résultats (JSON)",
+        data=get_export_json(result_key, processed_students),
+        file_name=f"rapport_orientation_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
+        mime="application/json",
+        key="export_results",
+        on_click="ignore"
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
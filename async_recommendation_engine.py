@@ -0,0 +1,438 @@
+import asyncio
+import queue
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Iterable, Iterator, AsyncIterator, Tuple
+import logging
+
+from config import Config
+from knowledge_base_manager import KnowledgeBaseManager
+from profile_planner import ProfilePlan, build_group_student, personalize_recommendation
+from recommendation_engine import RecommendationEngine, _Attempt
+
+try:
+    import httpx  # Optionnel: client HTTP asynchrone
+except ImportError:
+    httpx = None
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fin d'un lot traité par la boucle d'événements interne
+_BATCH_DONE = object()
+
+class AsyncRecommendationEngine(RecommendationEngine):
+    """
+    Moteur de recommandation asynchrone (httpx.AsyncClient).
+    
+    Les appels à l'IA sont des coroutines: un seul thread garde des centaines
+    d'appels en cours, bornés par un asyncio.Semaphore et par l'ordonnanceur
+    partagé (débit, concurrence adaptative, disjoncteur). L'analyse du profil,
+    les prompts, le cache et la structuration des réponses sont ceux de
+    RecommendationEngine.
+    
+    Utilisation dans une boucle d'événements: agenerate_recommendation() et
+    agenerate_recommendations_batch(), puis aclose() (ou « async with »).
+    generate_recommendations_batch() reste synchrone (process_students,
+    traitement par lot) et exécute les coroutines dans une boucle interne.
+    """
+    
+    def __init__(self, api_key: str, knowledge_base_manager: KnowledgeBaseManager,
+                 max_concurrency: int = Config.ASYNC_MAX_CONCURRENCY, **kwargs: Any):
+        if httpx is None:
+            raise ImportError("Le moteur asynchrone requiert httpx (pip install httpx)")
+        super().__init__(api_key, knowledge_base_manager, max_concurrency=max_concurrency, **kwargs)
+        
+        # Sémaphore et client créés au premier appel, dans la boucle d'événements qui les utilise
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Un client par boucle: ses connexions appartiennent à la boucle qui l'a ouvert
+        self._async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+    
+    def _get_async_client(self):
+        """
+        Retourne le client HTTP asynchrone de la boucle d'événements en cours
+        (pool de connexions partagé par tous les appels de cette boucle).
+        
+        Returns:
+            httpx.AsyncClient: Client HTTP configuré
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            headers = self._httpx_headers(dict(self.http_client.headers))
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.max_concurrency)
+            try:
+                client = httpx.AsyncClient(http2=self.use_http2, headers=headers,
+                                           timeout=self.request_timeout, limits=limits)
+            except ImportError:
+                logger.warning("HTTP/2 indisponible (paquet h2 non installé), utilisation de HTTP/1.1")
+                client = httpx.AsyncClient(headers=headers,
+                                           timeout=self.request_timeout, limits=limits)
+            self._async_clients[loop] = client
+        return client
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Retourne le sémaphore du moteur pour la boucle d'événements en cours
+        (un asyncio.Semaphore est lié à la boucle qui l'utilise).
+        
+        Returns:
+            asyncio.Semaphore: Sémaphore bornant les appels simultanés
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def aclose(self):
+        """Ferme les clients HTTP (appel depuis la boucle d'événements qui a utilisé le moteur)."""
+        await self._aclose_async_client()
+        super().close()
+    
+    async def _aclose_async_client(self):
+        """Ferme le client HTTP de la boucle d'événements en cours."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def close(self):
+        """Ferme les clients HTTP et arrête la boucle d'événements interne."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._aclose_async_client(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join()
+            loop.close()
+        super().close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    async def agenerate_recommendation(self, student_data: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Génère une recommandation complète pour un étudiant (version asynchrone).
+        
+        Args:
+            student_data: Données de l'étudiant
+            
+        Returns:
+            Dict[str, Any]: Recommandation structurée
+        """
+        try:
+            deadline = self._new_deadline()
+            student_analysis, prompt = self._build_student_prompt(student_data)
+            
+            # Appeler l'API DeepSeek (ou réutiliser une réponse en cache)
+            ai_response = await self._aget_ai_response(prompt, structured=self.structured_output, deadline=deadline)
+            
+            # Structurer la réponse
+            return self._structure_recommendation(ai_response, student_analysis)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération de recommandation: {str(e)}")
+            return {"error": str(e)}
+    
+    async def agenerate_recommendations_batch(self, students: Iterable[Dict[str, str]],
+                                              max_concurrency: Optional[int] = None,
+                                              plan: Optional[ProfilePlan] = None,
+                                              pack_size: Optional[int] = None) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Génère les recommandations d'un lot d'étudiants, appels simultanés dans la boucle d'événements.
+        
+        Args:
+            students: Données des étudiants (liste ou itérable)
+            max_concurrency: Nombre maximum d'appels simultanés pour ce lot
+            plan: Plan de regroupement des profils (un seul appel par groupe)
+            pack_size: Étudiants (ou profils) envoyés par appel en mode groupé
+            
+        Yields:
+            Tuple[int, Dict[str, Any]]: Indice de l'étudiant et sa recommandation, par ordre d'achèvement
+        """
+        workers = max(1, max_concurrency or self.max_concurrency)
+        pack_size = max(1, pack_size or self.pack_size)
+        
+        if plan is None:
+            async for item in self._arun_concurrently(enumerate(students), workers, pack_size):
+                yield item
+            return
+        
+        # Un appel par profil distinct, puis personnalisation locale pour chaque membre
+        students = list(students)
+        group_tasks = (
+            (group_index, build_group_student(students[group.representative_index], plan.include_region))
+            for group_index, group in enumerate(plan.groups)
+        )
+        async for group_index, group_recommendation in self._arun_concurrently(group_tasks, workers, pack_size):
+            for index in plan.groups[group_index].member_indices:
+                yield index, personalize_recommendation(group_recommendation, students[index])
+    
+    def generate_recommendations_batch(self, students: Iterable[Dict[str, str]],
+                                       max_concurrency: Optional[int] = None,
+                                       plan: Optional[ProfilePlan] = None,
+                                       pack_size: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Version synchrone de agenerate_recommendations_batch(): les appels sont
+        exécutés dans la boucle d'événements interne du moteur.
+        
+        Args:
+            students: Données des étudiants (liste ou itérable)
+            max_concurrency: Nombre maximum d'appels simultanés
+            plan: Plan de regroupement des profils (un seul appel par groupe)
+            pack_size: Étudiants (ou profils) envoyés par appel en mode groupé
+            
+        Yields:
+            Tuple[int, Dict[str, Any]]: Indice de l'étudiant et sa recommandation, par ordre d'achèvement
+        """
+        results = queue.Queue()
+        
+        async def produce():
+            async for item in self.agenerate_recommendations_batch(students, max_concurrency, plan, pack_size):
+                results.put(item)
+        
+        future = asyncio.run_coroutine_threadsafe(produce(), self._get_loop())
+        future.add_done_callback(lambda _: results.put(_BATCH_DONE))
+        try:
+            while True:
+                item = results.get()
+                if item is _BATCH_DONE:
+                    break
+                yield item
+            future.result()
+        finally:
+            # Annuler les appels en cours si le consommateur s'arrête en cours de route
+            future.cancel()
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Boucle d'événements interne (thread dédié), démarrée à la première utilisation."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name="async-recommendation", daemon=True)
+                self._loop_thread.start()
+            return self._loop
+    
+    async def _arun_concurrently(self, tasks: Iterable[Tuple[int, Dict[str, str]]],
+                                 workers: int, pack_size: int = 1) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Exécute agenerate_recommendation (ou le mode groupé par paquets de
+        pack_size étudiants) avec au plus workers tâches en cours.
+        
+        Args:
+            tasks: Couples (identifiant, données étudiant)
+            workers: Nombre maximum de tâches simultanées
+            pack_size: Étudiants par appel (1: un appel par étudiant)
+            
+        Yields:
+            Tuple[int, Dict[str, Any]]: Identifiant de la tâche et recommandation, par ordre d'achèvement
+        """
+        packs = self._iter_packs(tasks, pack_size)
+        pending: Dict[asyncio.Task, List[Tuple[int, Dict[str, str]]]] = {}
+        try:
+            exhausted = False
+            while True:
+                # Tâches créées au fil de l'eau pour ne pas consommer entièrement un itérable très long
+                while not exhausted and len(pending) < workers:
+                    pack = next(packs, None)
+                    if pack is None:
+                        exhausted = True
+                        break
+                    if len(pack) == 1:
+                        coroutine = self.agenerate_recommendation(pack[0][1])
+                    else:
+                        # Le mode groupé (réponse unique puis replis individuels) reste synchrone
+                        coroutine = asyncio.get_running_loop().run_in_executor(
+                            None, self.generate_recommendations_packed, [student for _, student in pack])
+                    pending[asyncio.ensure_future(coroutine)] = pack
+                
+                if not pending:
+                    break
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pack = pending.pop(task)
+                    try:
+                        result = task.result()
+                        recommendations = [result] if len(pack) == 1 else result
+                    except Exception as e:
+                        task_ids = ', '.join(str(task_id) for task_id, _ in pack)
+                        logger.error(f"Erreur lors de l'analyse de l'étudiant {task_ids}: {str(e)}")
+                        recommendations = [{"error": str(e)} for _ in pack]
+                    for (task_id, _), recommendation in zip(pack, recommendations):
+                        yield task_id, recommendation
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _aget_ai_response(self, prompt: str, structured: bool = False, deadline: Optional[float] = None) -> str:
+        """
+        Retourne la réponse de l'IA pour un prompt, en passant par le cache si actif.
+        
+        Args:
+            prompt: Prompt à envoyer
+            structured: True pour demander une réponse JSON (response_format)
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
+            
+        Returns:
+            str: Réponse de l'IA
+        """
+        response_format = self._response_format() if structured else None
+        if not (self.use_cache and self.cache):
+            return (await self._acall_with_hedging(prompt, response_format, deadline))[0]
+        
+        # Le cache SQLite est synchrone: ses accès passent par le pool de threads de la boucle
+        loop = asyncio.get_running_loop()
+        variant = {'output': 'json'} if structured else {}
+        cached_response = await loop.run_in_executor(None, lambda: self._get_cached_response(prompt, **variant))
+        if cached_response is not None:
+            return cached_response
+        
+        # Réponse enregistrée sous le modèle qui l'a produite (secours ou appel en double compris)
+        ai_response, model = await self._acall_with_hedging(prompt, response_format, deadline)
+        cache_key = self._get_cache_key(prompt, model=model, **variant)
+        await loop.run_in_executor(None, self.cache.put, cache_key, ai_response)
+        return ai_response
+    
+    async def _acall_with_hedging(self, prompt: str, response_format: Optional[Dict[str, Any]] = None,
+                                  deadline: Optional[float] = None) -> Tuple[str, str]:
+        """
+        Version asynchrone de _call_with_hedging: l'appel perdant est annulé, requête HTTP comprise.
+        
+        Args:
+            prompt: Prompt à envoyer
+            response_format: Format de réponse imposé (schéma JSON)
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
+            
+        Returns:
+            Tuple[str, str]: Réponse de l'IA et modèle qui l'a produite
+        """
+        hedge_delay = self._hedge_delay(deadline)
+        with self._stats_lock:
+            self._hedge_stats['calls'] += 1
+        started = time.monotonic()
+        
+        if hedge_delay is None:
+            answer = await self._acall_deepseek_api(prompt, response_format=response_format, deadline=deadline)
+            self.latency_tracker.record(time.monotonic() - started)
+            return answer
+        
+        primary = asyncio.ensure_future(self._acall_deepseek_api(prompt, response_format=response_format,
+                                                                 deadline=deadline))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                logger.info(f"Pas de réponse après {hedge_delay:.1f}s: appel en double"
+                            + (f" ({self.hedge_model})" if self.hedge_model else ""))
+                with self._stats_lock:
+                    self._hedge_stats['hedged'] += 1
+                pending.add(asyncio.ensure_future(self._acall_deepseek_api(
+                    prompt, response_format=response_format, deadline=deadline, model=self.hedge_model)))
+            
+            error = None
+            while True:
+                for task in done:
+                    try:
+                        answer = task.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if task is not primary:
+                        with self._stats_lock:
+                            self._hedge_stats['hedge_wins'] += 1
+                    self.latency_tracker.record(time.monotonic() - started)
+                    return answer
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @asynccontextmanager
+    async def _aslot(self, estimated_tokens: int, deadline: Optional[float] = None):
+        """
+        Place d'un appel: sémaphore du moteur, limite de concurrence partagée
+        (et pause éventuelle du disjoncteur) puis délai de débit, attendus sans
+        bloquer la boucle d'événements.
+        
+        Args:
+            estimated_tokens: Tokens estimés de la requête
+            deadline: Échéance de l'appel (time.monotonic), None pour attendre sans limite
+            
+        Yields:
+            float: Instant d'envoi de la requête (time.monotonic)
+        """
+        async with self._get_semaphore():
+            started_at = await self.rate_limiter.acquire_async(estimated_tokens, deadline)
+            try:
+                yield started_at
+            finally:
+                self.rate_limiter.release()
+    
+    async def _acall_deepseek_api(self, prompt: str, max_tokens: Optional[int] = None,
+                                  response_format: Optional[Dict[str, Any]] = None,
+                                  deadline: Optional[float] = None,
+                                  model: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Appelle l'API DeepSeek via OpenRouter (version asynchrone de _call_deepseek_api).
+        
+        Args:
+            prompt: Prompt à envoyer
+            max_tokens: Taille maximale de la réponse (défaut: self.max_tokens)
+            response_format: Format de réponse imposé (schéma JSON)
+            deadline: Échéance (time.monotonic) bornant les tentatives et leurs délais
+            model: Modèle imposé (défaut: choisi par le routeur à chaque tentative)
+            
+        Returns:
+            Tuple[str, str]: Réponse de l'IA et modèle qui l'a produite
+        """
+        data = self._build_request_data(prompt, max_tokens=max_tokens, response_format=response_format)
+        estimated_tokens = self.rate_limiter.estimate_tokens(self.system_prompt + prompt, data["max_tokens"])
+        client = self._get_async_client()
+        tried = set()
+        outcome = _Attempt()
+        attempt = 0
+        
+        # Décisions (modèle, classement de la réponse, délais) partagées avec _call_deepseek_api
+        while True:
+            if not outcome.retry_same_model:
+                data["model"] = model or self._choose_model(prompt, data["max_tokens"], tried)
+            async with self._aslot(estimated_tokens, deadline) as started_at:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    response = await client.post(self.base_url, json=data, timeout=timeout)
+                except httpx.TransportError as e:
+                    outcome = self._attempt_from_error(data, e, started_at, timeout, tried)
+                else:
+                    outcome = self._attempt_from_response(data, response, started_at, estimated_tokens, tried)
+            
+            if outcome.content is not None:
+                return outcome.content, data["model"]
+            if not outcome.retry_same_model:
+                await asyncio.sleep(self._retry_delay(attempt, outcome, deadline))
+                attempt += 1
+    
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du moteur de recommandation.
+        
+        Returns:
+            Dict[str, Any]: Statistiques
+        """
+        stats = super().get_engine_stats()
+        stats['async'] = {'max_concurrency': self.max_concurrency}
+        return stats
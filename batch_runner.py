@@ -0,0 +1,284 @@
+"""
+Traitement par lot en ligne de commande, sans interface Streamlit.
+
+Exemple (traitement nocturne des fichiers de plusieurs établissements):
+
+    python -m batch_runner fichiers_ecoles/ --output-dir resultats/ --concurrency 16
+    
+Chaque fichier d'entrée produit un rapport <nom>_recommandations.json (ou .jsonl)
+dans le répertoire de sortie, au même format que l'export de l'application.
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+import logging
+
+from config import Config
+from file_parser import FileParser
+from job_store import JobStore
+from knowledge_base_manager import KnowledgeBaseManager
+from pipeline import plan_profiles, process_students, build_export_data, dumps_export_data, json_default
+from recommendation_engine import RecommendationEngine
+from async_recommendation_engine import AsyncRecommendationEngine
+from reporters import LoggingReporter
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Codes de sortie
+EXIT_OK = 0
+EXIT_FILE_ERRORS = 1
+EXIT_CONFIG_ERROR = 2
+
+def collect_input_files(inputs: List[str], recursive: bool = False) -> List[Path]:
+    """
+    Liste les fichiers à traiter (fichiers donnés et contenu des répertoires).
+    
+    Args:
+        inputs: Chemins de fichiers ou de répertoires
+        recursive: True pour parcourir aussi les sous-répertoires
+        
+    Returns:
+        List[Path]: Fichiers pris en charge, sans doublons, dans un ordre stable
+    """
+    extensions = {f".{ext}" for ext in Config.SUPPORTED_FILE_TYPES}
+    files = []
+    for raw_path in inputs:
+        path = Path(raw_path)
+        if path.is_dir():
+            candidates = path.rglob('*') if recursive else path.iterdir()
+            # Les fichiers temporaires d'Office (~$...) sont ignorés
+            files.extend(sorted(p for p in candidates
+                                if p.is_file() and p.suffix.lower() in extensions and not p.name.startswith('~$')))
+        elif path.is_file():
+            files.append(path)
+        else:
+            logger.warning(f"Entrée introuvable ignorée: {raw_path}")
+    
+    unique_files = []
+    seen = set()
+    for path in files:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique_files.append(path)
+    return unique_files
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Découpe un flux en blocs de taille fixe (le dernier peut être plus court).
+    
+    Args:
+        items: Flux à découper
+        size: Taille des blocs
+        
+    Yields:
+        List[Any]: Bloc suivant
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def process_file(path: Path, rec_engine: RecommendationEngine, output_dir: Path,
+                 args: argparse.Namespace, job_store: Optional[JobStore] = None) -> Dict[str, Any]:
+    """
+    Traite un fichier d'étudiants de bout en bout et écrit son rapport.
+    
+    Args:
+        path: Fichier d'étudiants
+        rec_engine: Moteur de recommandation partagé entre les fichiers
+        output_dir: Répertoire des rapports
+        args: Options de la ligne de commande
+        job_store: Journal des traitements (reprise d'un fichier déjà traité en partie)
+        
+    Returns:
+        Dict[str, Any]: Bilan du fichier (étudiants, erreurs, rapport écrit)
+    """
+    start_time = time.time()
+    file_parser = FileParser(reporter=LoggingReporter())
+    summary = {'file': str(path), 'students': 0, 'errors': 0, 'output': None}
+    
+    with open(path, 'rb') as input_file:
+        job_id = JobStore.hash_file(input_file) if job_store is not None else None
+        students = file_parser.iter_file(input_file)
+        
+        if args.deduplicate:
+            # Le regroupement des profils porte sur le fichier entier
+            students_data = list(students)
+            plan = plan_profiles(students_data, deduplicate=True, include_region=args.include_region)
+            chunks = iter([students_data] if students_data else [])
+        else:
+            # Sans regroupement, le fichier est lu et traité bloc par bloc, à mémoire bornée
+            plan = None
+            chunks = iter_chunks(students, Config.STREAM_CHUNK_SIZE)
+        
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            logger.warning(f"{path}: aucun étudiant trouvé")
+            return summary
+        
+        extension = 'jsonl' if args.format == 'jsonl' else 'json'
+        output_path = output_dir / f"{path.stem}_recommandations.{extension}"
+        # jsonl: une ligne par étudiant dès son achèvement, un lot interrompu garde ses résultats
+        output_file = open(output_path, 'w', encoding='utf-8') if args.format == 'jsonl' else None
+        processed_students: List[Optional[Dict[str, Any]]] = []
+        completed = 0
+        
+        try:
+            for chunk in itertools.chain([first_chunk], chunks):
+                first_index = summary['students']
+                summary['students'] += len(chunk)
+                logger.info(f"{path}: {len(chunk)} étudiants à analyser")
+                if job_store is not None:
+                    job_store.start_job(job_id, str(path), summary['students'])
+                if output_file is None:
+                    processed_students.extend([None] * len(chunk))
+                
+                for index, item in process_students(chunk, rec_engine, plan, args.concurrency,
+                                                    job_store=job_store, job_id=job_id,
+                                                    first_index=first_index):
+                    if output_file is not None:
+                        output_file.write(json.dumps(dict(item, index=index), ensure_ascii=False,
+                                                     default=json_default) + '\n')
+                    else:
+                        processed_students[index] = item
+                    summary['errors'] += 'error' in item['recommendation']
+                    completed += 1
+                    if completed % 100 == 0:
+                        logger.info(f"{path}: {completed} étudiants traités")
+        finally:
+            if output_file is not None:
+                output_file.close()
+    
+    if output_file is None:
+        output_path.write_text(dumps_export_data(build_export_data(processed_students)), encoding='utf-8')
+    
+    summary['output'] = str(output_path)
+    logger.info(f"{path}: rapport écrit dans {output_path} "
+                f"({summary['errors']} erreur(s), {time.time() - start_time:.1f}s)")
+    return summary
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Options de la ligne de commande."""
+    parser = argparse.ArgumentParser(
+        prog="python -m batch_runner",
+        description="Génère les recommandations d'orientation de fichiers d'étudiants, sans interface."
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help="Fichiers d'étudiants ou répertoires (" + ", ".join(Config.SUPPORTED_FILE_TYPES) + ")")
+    parser.add_argument('--output-dir', default='resultats', help="Répertoire des rapports (défaut: resultats)")
+    parser.add_argument('--kb', default=Config.KNOWLEDGE_BASE_FILE, help="Fichier de la base de connaissances")
+    parser.add_argument('--api-key', default=None,
+                        help="Clé API OpenRouter (défaut: variable d'environnement OPENROUTER_API_KEY)")
+    parser.add_argument('--concurrency', type=int, default=Config.MAX_CONCURRENCY,
+                        help=f"Appels à l'IA simultanés (défaut: {Config.MAX_CONCURRENCY})")
+    parser.add_argument('--pack-size', type=int, default=Config.PACK_SIZE,
+                        help="Étudiants envoyés par appel à l'IA (mode groupé si > 1, défaut: "
+                             f"{Config.PACK_SIZE})")
+    parser.add_argument('--structured-output', action='store_true', default=Config.STRUCTURED_OUTPUT,
+                        help="Demander à l'IA une réponse JSON (sections lues sans découpage heuristique)")
+    parser.add_argument('--deadline', type=float, default=Config.STUDENT_DEADLINE,
+                        help="Budget de temps par étudiant en secondes, nouvelles tentatives comprises "
+                             f"(0: sans limite, défaut: {Config.STUDENT_DEADLINE:.0f})")
+    parser.add_argument('--hedge', action='store_true', default=Config.HEDGE_ENABLED,
+                        help="Doubler les appels dont la réponse tarde au-delà de la latence habituelle (p95)")
+    parser.add_argument('--hedge-model', default=Config.HEDGE_MODEL,
+                        help="Modèle interrogé par les appels en double (défaut: même modèle)")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Appels à l'IA asynchrones (httpx requis): des centaines d'appels simultanés "
+                             "sans un thread par appel, à combiner avec --concurrency")
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help="json: un rapport par fichier; jsonl: une ligne par étudiant, écrite au fil de l'eau")
+    parser.add_argument('--recursive', action='store_true', help="Parcourir les sous-répertoires")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="Ne pas réutiliser les recommandations en cache")
+    parser.add_argument('--no-dedup', dest='deduplicate', action='store_false',
+                        default=Config.DEDUPLICATE_PROFILES, help="Un appel à l'IA par étudiant")
+    parser.add_argument('--no-resume', dest='resume', action='store_false', default=Config.JOB_STORE_ENABLED,
+                        help="Ne pas reprendre les fichiers déjà traités en partie (tout retraiter)")
+    parser.add_argument('--include-region', action='store_true', default=Config.DEDUPLICATE_INCLUDE_REGION,
+                        help="Inclure le lieu de naissance dans le regroupement des profils")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée de la ligne de commande.
+    
+    Args:
+        argv: Arguments (sys.argv[1:] par défaut)
+        
+    Returns:
+        int: Code de sortie
+    """
+    args = build_argument_parser().parse_args(argv)
+    
+    api_key = args.api_key or Config.get_api_key()
+    if not api_key:
+        logger.error("Clé API OpenRouter manquante (--api-key ou OPENROUTER_API_KEY)")
+        return EXIT_CONFIG_ERROR
+    
+    kb_manager = KnowledgeBaseManager()
+    if not kb_manager.load_knowledge_base(args.kb):
+        logger.error(f"Impossible de charger la base de connaissances: {args.kb}")
+        return EXIT_CONFIG_ERROR
+    
+    input_files = collect_input_files(args.inputs, recursive=args.recursive)
+    if not input_files:
+        logger.error("Aucun fichier d'étudiants à traiter")
+        return EXIT_CONFIG_ERROR
+    
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    job_store = None
+    if args.resume:
+        try:
+            job_store = JobStore(Config.JOB_STORE_FILE)
+        except Exception as e:
+            logger.warning(f"Reprise des traitements indisponible: {str(e)}")
+    
+    summaries = []
+    failed_files = []
+    engine_class = AsyncRecommendationEngine if args.use_async else RecommendationEngine
+    try:
+        rec_engine = engine_class(api_key, kb_manager, max_concurrency=args.concurrency,
+                                  use_cache=args.use_cache, pack_size=args.pack_size,
+                                  structured_output=args.structured_output,
+                                  student_deadline=args.deadline, hedging=args.hedge,
+                                  hedge_model=args.hedge_model)
+    except ImportError as e:
+        logger.error(str(e))
+        return EXIT_CONFIG_ERROR
+    
+    with rec_engine:
+        for path in input_files:
+            try:
+                summaries.append(process_file(path, rec_engine, output_dir, args, job_store))
+            except Exception as e:
+                logger.error(f"{path}: échec du traitement: {str(e)}")
+                failed_files.append(str(path))
+        
+        cache_stats = rec_engine.get_engine_stats()['cache']
+    
+    if job_store is not None:
+        job_store.close()
+    
+    total_students = sum(summary['students'] for summary in summaries)
+    total_errors = sum(summary['errors'] for summary in summaries)
+    logger.info(f"Terminé: {len(summaries)} fichier(s), {total_students} étudiants, "
+                f"{total_errors} erreur(s) d'analyse, {len(failed_files)} fichier(s) en échec")
+    if cache_stats['enabled']:
+        logger.info(f"Cache: {cache_stats['hits']} recommandations réutilisées, {cache_stats['misses']} appels à l'IA")
+    
+    return EXIT_FILE_ERRORS if failed_files else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,17 @@ class Config:
     OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
     DEFAULT_MODEL = "deepseek/deepseek-chat"
     
+    # Routage entre modèles: modèles de secours (séparés par des virgules) et plafond de coût par appel
+    FALLBACK_MODELS = [model.strip() for model in os.getenv('OPENROUTER_FALLBACK_MODELS', '').split(',') if model.strip()]
+    MAX_COST_PER_REQUEST = float(os.getenv('OPENROUTER_MAX_COST_PER_REQUEST', '0'))  # Dollars (0: pas de plafond)
+    MODEL_PRICES = {  # Dollars par million de tokens (entrée, sortie), à ajuster selon la grille OpenRouter
+        "deepseek/deepseek-chat": (0.30, 0.85)
+    }
+    ROUTER_EWMA_ALPHA = 0.2  # Poids du dernier appel dans les moyennes de latence et d'échec
+    ROUTER_ERROR_THRESHOLD = 0.5  # Taux d'échec au-delà duquel un modèle est mis à l'écart
+    ROUTER_COOLDOWN = 30  # Durée de la mise à l'écart (secondes)
+    ROUTER_ORDER_PENALTY = 0.25  # Avance de latence exigée par rang pour préférer un modèle de secours
+    
     # Configuration de l'application
     APP_TITLE = "Système d'Aide à l'Orientation Professionnelle IA - Bénin"
     APP_DESCRIPTION = "Guidez vos étudiants vers des carrières adaptées au marché du travail béninois"
@@ -25,10 +36,64 @@ class Config:
     TOP_P = 0.9
     MAX_RETRIES = 3
     RETRY_DELAY = 2
+    MAX_CONCURRENCY = 8  # Appels API simultanés lors du traitement par lot
+    USE_HTTP2 = os.getenv('OPENROUTER_HTTP2', '').lower() in ('1', 'true', 'yes')  # Requiert httpx[http2]
+    ASYNC_MAX_CONCURRENCY = 200  # Appels simultanés du moteur asynchrone (requiert httpx)
+    
+    # Limitation de débit partagée des appels à l'IA (0: pas de budget fixe, ajustement automatique sur les 429)
+    RATE_LIMIT_REQUESTS_PER_MINUTE = float(os.getenv('OPENROUTER_REQUESTS_PER_MINUTE', '0'))
+    RATE_LIMIT_TOKENS_PER_MINUTE = float(os.getenv('OPENROUTER_TOKENS_PER_MINUTE', '0'))
+    RATE_LIMIT_MAX_CONCURRENCY = 256  # Plafond de la concurrence adaptative (moteur asynchrone compris)
+    BACKOFF_MAX_DELAY = 60  # Délai maximum entre deux tentatives (secondes)
+    CIRCUIT_BREAKER_THRESHOLD = 5  # Échecs consécutifs (5xx, réseau) avant la mise en pause des appels
+    CIRCUIT_BREAKER_RESET_TIMEOUT = 30  # Durée de la pause (secondes)
+    
+    # Budget de temps par étudiant, nouvelles tentatives comprises (0: pas de limite)
+    STUDENT_DEADLINE = float(os.getenv('RECOMMENDATION_STUDENT_DEADLINE', '120'))
+    
+    # Appel en double (hedging) quand la réponse tarde au-delà de la latence habituelle
+    HEDGE_ENABLED = os.getenv('RECOMMENDATION_HEDGE', '').lower() in ('1', 'true', 'yes')
+    HEDGE_MODEL = os.getenv('OPENROUTER_HEDGE_MODEL', '')  # Modèle de l'appel en double (vide: même modèle)
+    HEDGE_QUANTILE = 0.95  # Quantile de latence observée au-delà duquel l'appel est doublé
+    HEDGE_MIN_DELAY = 5  # Attente minimale avant un appel en double (secondes)
+    HEDGE_MAX_RATIO = 0.1  # Part maximale des appels doublés
+    LATENCY_WINDOW = 200  # Appels réussis retenus pour le calcul des quantiles
+    LATENCY_MIN_SAMPLES = 20  # Appels réussis nécessaires avant le premier appel en double
+    
+    # Mode groupé: plusieurs étudiants par appel à l'IA (1: un étudiant par appel)
+    PACK_SIZE = int(os.getenv('RECOMMENDATION_PACK_SIZE', '1'))
+    PACKED_MAX_TOKENS = 8000  # Taille maximale de la réponse d'un appel groupé
+    
+    # Réponse de l'IA en JSON (response_format) au lieu du texte libre découpé en sections
+    STRUCTURED_OUTPUT = os.getenv('RECOMMENDATION_STRUCTURED_OUTPUT', '').lower() in ('1', 'true', 'yes')
+    
+    # Cache des recommandations
+    CACHE_ENABLED = True
+    CACHE_FILE = os.getenv('RECOMMENDATION_CACHE_FILE', '.cache/recommendations.sqlite3')
+    CACHE_TTL = 30 * 24 * 3600  # 30 jours
+    CACHE_MAX_ENTRIES = 50000
+    
+    # Journal des traitements par lot (reprise après interruption)
+    JOB_STORE_ENABLED = True
+    JOB_STORE_FILE = os.getenv('JOB_STORE_FILE', '.cache/jobs.sqlite3')
+    STREAM_CHUNK_SIZE = 1000  # Étudiants lus puis traités par bloc en ligne de commande (sans regroupement)
+    
+    # Traitements en arrière-plan (interface non bloquante)
+    BACKGROUND_JOBS_ENABLED = True
+    BACKGROUND_MAX_JOBS = 2  # Fichiers traités simultanément par le serveur
+    BACKGROUND_JOB_RETENTION = 24 * 3600  # Conservation des traitements terminés (secondes)
+    BACKGROUND_POLL_INTERVAL = 2  # Rafraîchissement de l'avancement dans l'interface (secondes)
+    
+    # Regroupement des profils identiques avant l'appel à l'IA
+    DEDUPLICATE_PROFILES = True
+    DEDUPLICATE_INCLUDE_REGION = False
     
     # Paramètres de l'interface
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
-    SUPPORTED_FILE_TYPES = ['xlsx', 'docx']
+    SESSION_RESULTS_MAX = 5  # Fichiers dont les résultats restent mémorisés dans la session
+    # Taille maximale des fichiers lus en flux (configurable, en Mo)
+    MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE_MB', '200')) * 1024 * 1024
+    SUPPORTED_FILE_TYPES = ['xlsx', 'docx', 'csv', 'parquet', 'jsonl']  # Parquet: requiert pyarrow
+    CSV_CHUNK_SIZE = 50000  # Lignes lues par bloc (CSV et Parquet)
     
     # Colonnes requises dans les fichiers d'étudiants
     REQUIRED_STUDENT_COLUMNS = [
@@ -41,7 +106,7 @@ class Config:
         'no_api_key': "🔑 Veuillez configurer votre clé API OpenRouter dans la barre latérale.",
         'no_knowledge_base': "📚 La base de connaissances n'est pas disponible. Vérifiez le fichier knowledge_base_benin.json.",
         'file_too_large': f"📁 Le fichier est trop volumineux. Taille maximale: {MAX_FILE_SIZE // (1024*1024)} MB",
-        'unsupported_format': "📁 Format de fichier non supporté. Utilisez .xlsx ou .docx",
+        'unsupported_format': "📁 Format de fichier non supporté. Utilisez .xlsx, .docx, .csv, .parquet ou .jsonl",
         'api_error': "🤖 Erreur lors de la communication avec l'IA. Vérifiez votre clé API.",
         'parsing_error': "📖 Erreur lors de la lecture du fichier. Vérifiez le format des données."
     }
@@ -63,6 +128,8 @@ class Config:
         """Retourne la configuration du modèle IA."""
         return {
             'model': cls.DEFAULT_MODEL,
+            'fallback_models': cls.FALLBACK_MODELS,
+            'max_cost_per_request': cls.MAX_COST_PER_REQUEST,
             'temperature': cls.DEFAULT_TEMPERATURE,
             'max_tokens': cls.MAX_TOKENS,
             'top_p': cls.TOP_P
@@ -1,26 +1,114 @@
 import pandas as pd
 import docx
+import codecs
+import csv
 import io
-from typing import List, Dict, Any, Optional
-import streamlit as st
+import itertools
+import json
+import re
+import zipfile
+import openpyxl
+from xml.etree import ElementTree
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from config import Config
+from reporters import Reporter, StreamlitReporter
+
+try:
+    import pyarrow.parquet as pq  # Optionnel: nécessaire pour les fichiers Parquet
+except ImportError:
+    pq = None
+
+# Balises WordprocessingML utilisées par la lecture en flux des tableaux
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY, W_TBL, W_TR, W_TC, W_P, W_R = (_W + tag for tag in ('body', 'tbl', 'tr', 'tc', 'p', 'r'))
+W_T, W_TAB, W_PTAB, W_BR, W_CR = (_W + tag for tag in ('t', 'tab', 'ptab', 'br', 'cr'))
+W_TCPR, W_TRPR, W_GRIDSPAN, W_VMERGE, W_HMERGE, W_GRIDBEFORE, W_GRIDAFTER, W_VAL = (
+    _W + tag for tag in ('tcPr', 'trPr', 'gridSpan', 'vMerge', 'hMerge', 'gridBefore', 'gridAfter', 'val')
+)
+
+# Lettres accentuées équivalentes, pour des libellés insensibles aux accents
+_ACCENT_CLASSES = {
+    'a': '[aàâä]', 'c': '[cç]', 'e': '[eéèêë]', 'i': '[iîï]', 'o': '[oôö]', 'u': '[uùûü]'
+}
+
+def _label_regex(label: str) -> str:
+    """
+    Convertit un libellé sans accents en motif regex insensible aux accents.
+    
+    Args:
+        label: Libellé en minuscules sans accents (ex: "date de naissance")
+        
+    Returns:
+        str: Motif regex équivalent
+    """
+    parts = []
+    for char in label:
+        if char == ' ':
+            parts.append(r'\s+')
+        else:
+            parts.append(_ACCENT_CLASSES.get(char, re.escape(char)))
+    return ''.join(parts)
 
 class FileParser:
     """
-    Classe pour parser les fichiers Excel (.xlsx) et Word (.docx) contenant les données des étudiants.
+    Classe pour parser les fichiers Excel (.xlsx), Word (.docx), CSV (.csv), Parquet (.parquet)
+    et JSON Lines (.jsonl) contenant les données des étudiants.
     """
     
-    def __init__(self):
+    # Variantes d'en-têtes acceptées (forme normalisée -> colonne requise)
+    COLUMN_ALIASES = {
+        'name': 'Nom', 'lastname': 'Nom', 'nomdefamille': 'Nom',
+        'prenoms': 'Prénom', 'firstname': 'Prénom',
+        'datenaissance': 'Date de Naissance', 'naissance': 'Date de Naissance',
+        'birthdate': 'Date de Naissance', 'dateofbirth': 'Date de Naissance',
+        'lieunaissance': 'Lieu de Naissance', 'lieu': 'Lieu de Naissance',
+        'birthplace': 'Lieu de Naissance', 'placeofbirth': 'Lieu de Naissance',
+        'filiere': 'Filière Actuelle', 'field': 'Filière Actuelle',
+        'carriere': 'Carrière Envisagée', 'career': 'Carrière Envisagée',
+        'metierenvisage': 'Carrière Envisagée', 'metiersouhaite': 'Carrière Envisagée'
+    }
+    
+    # Libellés reconnus dans le texte libre Word (sans accents -> champ)
+    WORD_TEXT_LABELS = {
+        'nom': 'Nom', 'name': 'Nom',
+        'prenom': 'Prénom', 'firstname': 'Prénom',
+        'date de naissance': 'Date de Naissance', 'naissance': 'Date de Naissance',
+        'ne le': 'Date de Naissance', 'birthdate': 'Date de Naissance',
+        'lieu de naissance': 'Lieu de Naissance', 'lieu': 'Lieu de Naissance',
+        'ne a': 'Lieu de Naissance', 'birthplace': 'Lieu de Naissance',
+        'filiere actuelle': 'Filière Actuelle', 'filiere': 'Filière Actuelle',
+        'field': 'Filière Actuelle',
+        'carriere envisagee': 'Carrière Envisagée', 'carriere': 'Carrière Envisagée',
+        'career': 'Carrière Envisagée'
+    }
+    
+    # Une seule alternation compilée (un groupe nommé par libellé); un libellé
+    # n'est reconnu qu'en début de mot: "nom:" ne correspond pas à "prénom:"
+    WORD_TEXT_FIELDS = {f'f{index}': field for index, field in enumerate(WORD_TEXT_LABELS.values())}
+    WORD_TEXT_PATTERN = re.compile(
+        r'(?<!\w)(?:' + '|'.join(
+            f'(?P<f{index}>{_label_regex(label)})'
+            for index, label in enumerate(WORD_TEXT_LABELS)
+        ) + r')\s*:',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, reporter: Optional[Reporter] = None):
+        # Destination des avertissements et erreurs (interface Streamlit par défaut)
+        self.reporter = reporter or StreamlitReporter()
         self.required_columns = [
             'Nom', 'Prénom', 'Date de Naissance', 
             'Lieu de Naissance', 'Filière Actuelle', 'Carrière Envisagée'
         ]
+        self.last_validation_report: Dict[str, Any] = {}
     
     def parse_file(self, uploaded_file) -> List[Dict[str, Any]]:
         """
         Parse un fichier téléversé et retourne une liste de dictionnaires représentant les étudiants.
         
         Args:
-            uploaded_file: Fichier téléversé via Streamlit
+            uploaded_file: Fichier téléversé via Streamlit ou ouvert en lecture binaire
             
         Returns:
             List[Dict[str, Any]]: Liste des données étudiants
@@ -28,19 +116,165 @@ class FileParser:
         file_extension = uploaded_file.name.split('.')[-1].lower()
         
         try:
+            self._check_file_size(uploaded_file)
             if file_extension == 'xlsx':
                 return self._parse_excel(uploaded_file)
             elif file_extension == 'docx':
                 return self._parse_word(uploaded_file)
+            elif file_extension == 'csv':
+                return list(self._iter_csv(uploaded_file))
+            elif file_extension == 'parquet':
+                return list(self._iter_parquet(uploaded_file))
+            elif file_extension == 'jsonl':
+                return list(self._iter_jsonl(uploaded_file))
             else:
                 raise ValueError(f"Format de fichier non supporté: {file_extension}")
         except Exception as e:
-            st.error(f"Erreur lors du parsing du fichier: {str(e)}")
+            self.reporter.error(f"Erreur lors du parsing du fichier: {str(e)}")
             return []
     
+    def iter_file(self, uploaded_file) -> Iterator[Dict[str, Any]]:
+        """
+        Parse un fichier en flux et produit les étudiants au fur et à mesure de la lecture.
+        
+        Contrairement à parse_file, les erreurs sont propagées à l'appelant.
+        
+        Args:
+            uploaded_file: Fichier téléversé ou ouvert en lecture binaire
+            
+        Yields:
+            Dict[str, Any]: Données d'un étudiant valide
+        """
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        self._check_file_size(uploaded_file)
+        
+        if file_extension == 'xlsx':
+            yield from self._iter_excel(uploaded_file)
+        elif file_extension == 'docx':
+            yield from self._iter_word(uploaded_file)
+        elif file_extension == 'csv':
+            yield from self._iter_csv(uploaded_file)
+        elif file_extension == 'parquet':
+            yield from self._iter_parquet(uploaded_file)
+        elif file_extension == 'jsonl':
+            yield from self._iter_jsonl(uploaded_file)
+        else:
+            raise ValueError(f"Format de fichier non supporté: {file_extension}")
+    
+    def _check_file_size(self, file):
+        """
+        Vérifie que le fichier ne dépasse pas la taille maximale configurée.
+        
+        Args:
+            file: Fichier téléversé ou ouvert en lecture binaire
+        """
+        size = getattr(file, 'size', None)
+        if size is None and hasattr(file, 'seek'):
+            position = file.tell()
+            size = file.seek(0, io.SEEK_END)
+            file.seek(position)
+        
+        if size is not None and size > Config.MAX_FILE_SIZE:
+            raise ValueError(Config.ERROR_MESSAGES['file_too_large'])
+    
+    def _iter_excel(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lit un fichier Excel par blocs de lignes (openpyxl en lecture seule), à mémoire
+        constante; chaque bloc est converti et validé par opérations vectorisées.
+        
+        Args:
+            file: Fichier Excel
+            
+        Yields:
+            Dict[str, Any]: Données d'un étudiant valide
+        """
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        skipped_rows = []
+        total_rows = 0
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            
+            headers = [str(value).strip() if value is not None else '' for value in header]
+            column_indexes, missing_columns = self._resolve_columns(headers)
+            if missing_columns:
+                raise ValueError(f"Colonnes manquantes dans le fichier Excel: {', '.join(missing_columns)}")
+            
+            # Projection: seules les colonnes requises sont copiées dans les blocs
+            positions = [column_indexes[col] for col in self.required_columns]
+            projected_indexes = {col: position for position, col in enumerate(self.required_columns)}
+            while True:
+                chunk = [[row[col_idx] if col_idx < len(row) else None for col_idx in positions]
+                         for row in itertools.islice(rows, Config.CSV_CHUNK_SIZE)]
+                if not chunk:
+                    break
+                # dtype object: chaque cellule est convertie par str(), telle que lue par openpyxl
+                students_data, chunk_skipped = self._students_from_dataframe(
+                    pd.DataFrame(chunk, dtype=object), projected_indexes, first_row_number=total_rows + 2
+                )
+                total_rows += len(chunk)
+                skipped_rows.extend(chunk_skipped)
+                yield from students_data
+        finally:
+            workbook.close()
+            self._report_validation("Fichier Excel", total_rows, skipped_rows)
+    
+    def _resolve_columns(self, columns: List[str]) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Associe chaque colonne requise à la position de la colonne correspondante
+        (comparaison insensible à la casse et aux accents).
+        
+        Args:
+            columns: Liste des colonnes présentes
+            
+        Returns:
+            Tuple[Dict[str, int], List[str]]: Positions des colonnes trouvées et colonnes manquantes
+        """
+        # Table de correspondance construite en une seule passe sur les en-têtes
+        lookup = {self._normalize_column_name(col): col for col in self.required_columns}
+        lookup.update(self.COLUMN_ALIASES)
+        
+        column_indexes = {}
+        for position, col in enumerate(columns):
+            required_col = col if col in self.required_columns else lookup.get(self._normalize_column_name(col))
+            if required_col and (required_col not in column_indexes or col == required_col):
+                column_indexes[required_col] = position
+        
+        missing_columns = [col for col in self.required_columns if col not in column_indexes]
+        return column_indexes, missing_columns
+    
+    def _report_validation(self, source: str, total_rows: int, skipped_rows: List[int]):
+        """
+        Enregistre le rapport de validation et affiche un avertissement unique
+        récapitulant les lignes ignorées.
+        
+        Args:
+            source: Description de la source (fichier Excel, tableau Word...)
+            total_rows: Nombre de lignes lues
+            skipped_rows: Numéros des lignes ignorées
+        """
+        self.last_validation_report = {
+            'source': source,
+            'total_rows': total_rows,
+            'valid_rows': total_rows - len(skipped_rows),
+            'skipped_rows': skipped_rows
+        }
+        if skipped_rows:
+            self.reporter.warning(f"{source}: {len(skipped_rows)} ligne(s) ignorée(s) (Nom ou Filière Actuelle manquant): "
+                       f"{self._format_row_numbers(skipped_rows)}")
+    
+    def _format_row_numbers(self, row_numbers: List[int], limit: int = 20) -> str:
+        """Liste abrégée de numéros de lignes pour les messages d'avertissement."""
+        shown = ', '.join(str(number) for number in row_numbers[:limit])
+        if len(row_numbers) > limit:
+            shown += f"... (+{len(row_numbers) - limit})"
+        return shown
+    
     def _parse_excel(self, file) -> List[Dict[str, Any]]:
         """
-        Parse un fichier Excel.
+        Parse un fichier Excel (openpyxl en lecture seule, par blocs de lignes).
         
         Args:
             file: Fichier Excel
@@ -49,36 +283,224 @@ class FileParser:
             List[Dict[str, Any]]: Données des étudiants
         """
         try:
-            # Lire le fichier Excel
-            df = pd.read_excel(file, engine='openpyxl')
+            return list(self._iter_excel(file))
+        except Exception as e:
+            raise Exception(f"Erreur lors de la lecture du fichier Excel: {str(e)}")
+    
+    def _students_from_dataframe(self, df: pd.DataFrame, column_indexes: Dict[str, int],
+                                 first_row_number: int = 2) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Convertit un DataFrame en données étudiants par opérations vectorisées sur les colonnes.
+        
+        Args:
+            df: Données lues
+            column_indexes: Position de chaque colonne requise dans le DataFrame
+            first_row_number: Numéro (dans le fichier) de la première ligne de données
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], List[int]]: Étudiants valides et numéros des lignes ignorées
+        """
+        selected = df.iloc[:, [column_indexes[col] for col in self.required_columns]]
+        selected.columns = self.required_columns
+        
+        # Convertir en chaînes, les valeurs manquantes devenant des chaînes vides
+        # (les dates gardent le format de str(Timestamp))
+        values = selected.apply(
+            lambda column: column.dt.strftime('%Y-%m-%d %H:%M:%S')
+            if pd.api.types.is_datetime64_any_dtype(column) else column.astype(str)
+        ).where(selected.notna(), "")
+        
+        # Valider que chaque étudiant a au moins un nom et une filière
+        valid = (values['Nom'].str.strip() != "") & (values['Filière Actuelle'].str.strip() != "")
+        blank = (values == "").all(axis=1)
+        
+        # Les lignes entièrement vides sont ignorées sans avertissement
+        positions = pd.RangeIndex(first_row_number, first_row_number + len(values))
+        skipped_rows = positions[(~valid & ~blank).to_numpy()].tolist()
+        
+        return values[valid].to_dict('records'), skipped_rows
+    
+    def _iter_csv(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lit un fichier CSV par blocs (encodage et séparateur détectés), en ne
+        chargeant que les colonnes requises.
+        
+        Args:
+            file: Fichier CSV
             
-            # Nettoyer les noms de colonnes (supprimer les espaces en début/fin)
-            df.columns = df.columns.str.strip()
+        Yields:
+            Dict[str, Any]: Données d'un étudiant valide
+        """
+        encoding, delimiter = self._sniff_csv_format(file)
+        read_options = {
+            'sep': delimiter,
+            'encoding': encoding,
+            'dtype': str,
+            # Seules les cellules vides sont des valeurs manquantes ("NA" reste un texte)
+            'keep_default_na': False,
+            'na_values': ['']
+        }
+        
+        file.seek(0)
+        headers = [str(col).strip() for col in pd.read_csv(file, nrows=0, **read_options).columns]
+        column_indexes, missing_columns = self._resolve_columns(headers)
+        if missing_columns:
+            raise ValueError(f"Colonnes manquantes dans le fichier CSV: {', '.join(missing_columns)}")
+        
+        # Projection: seules les colonnes requises sont analysées
+        usecols = sorted(set(column_indexes.values()))
+        projected_indexes = {col: usecols.index(col_idx) for col, col_idx in column_indexes.items()}
+        
+        skipped_rows = []
+        total_rows = 0
+        file.seek(0)
+        try:
+            chunks = pd.read_csv(file, usecols=usecols, chunksize=Config.CSV_CHUNK_SIZE, **read_options)
+            for chunk in chunks:
+                students_data, chunk_skipped = self._students_from_dataframe(
+                    chunk, projected_indexes, first_row_number=total_rows + 2
+                )
+                total_rows += len(chunk)
+                skipped_rows.extend(chunk_skipped)
+                yield from students_data
+        finally:
+            self._report_validation("Fichier CSV", total_rows, skipped_rows)
+    
+    def _sniff_csv_format(self, file, sample_size: int = 64 * 1024) -> Tuple[str, str]:
+        """
+        Détecte l'encodage et le séparateur d'un fichier CSV à partir de son début.
+        
+        Args:
+            file: Fichier CSV
+            sample_size: Nombre d'octets analysés
             
-            # Vérifier la présence des colonnes requises
-            missing_columns = self._check_required_columns(df.columns.tolist())
-            if missing_columns:
-                raise ValueError(f"Colonnes manquantes dans le fichier Excel: {', '.join(missing_columns)}")
+        Returns:
+            Tuple[str, str]: Encodage et séparateur
+        """
+        file.seek(0)
+        sample = file.read(sample_size)
+        if isinstance(sample, str):
+            text, encoding = sample, 'utf-8'
+        else:
+            if sample.startswith(codecs.BOM_UTF8):
+                encoding = 'utf-8-sig'
+            elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                encoding = 'utf-16'
+            else:
+                encoding = 'utf-8'
             
-            # Convertir en liste de dictionnaires
-            students_data = []
-            for index, row in df.iterrows():
+            try:
+                # Décodage incrémental: un caractère coupé en fin d'échantillon n'est pas une erreur
+                text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            except UnicodeDecodeError:
+                # Exports Excel / Windows en français
+                encoding = 'cp1252'
+                try:
+                    text = sample.decode(encoding)
+                except UnicodeDecodeError:
+                    encoding = 'latin-1'
+                    text = sample.decode(encoding)
+        
+        # Les lignes complètes suffisent pour détecter le séparateur
+        lines = text.splitlines()
+        if len(sample) == sample_size and len(lines) > 1:
+            lines = lines[:-1]
+        try:
+            delimiter = csv.Sniffer().sniff('\n'.join(lines), delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ','
+        
+        return encoding, delimiter
+    
+    def _iter_parquet(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lit un fichier Parquet par lots (pyarrow), en ne lisant que les colonnes requises.
+        
+        Args:
+            file: Fichier Parquet
+            
+        Yields:
+            Dict[str, Any]: Données d'un étudiant valide
+        """
+        if pq is None:
+            raise ValueError("La lecture des fichiers Parquet nécessite pyarrow (pip install pyarrow)")
+        
+        parquet_file = pq.ParquetFile(file)
+        names = parquet_file.schema_arrow.names
+        column_indexes, missing_columns = self._resolve_columns([str(name).strip() for name in names])
+        if missing_columns:
+            raise ValueError(f"Colonnes manquantes dans le fichier Parquet: {', '.join(missing_columns)}")
+        
+        # Projection: seules les colonnes requises sont lues sur le disque
+        columns = [names[column_indexes[col]] for col in self.required_columns]
+        projected_indexes = {col: position for position, col in enumerate(self.required_columns)}
+        
+        skipped_rows = []
+        total_rows = 0
+        try:
+            for batch in parquet_file.iter_batches(batch_size=Config.CSV_CHUNK_SIZE, columns=columns):
+                students_data, batch_skipped = self._students_from_dataframe(
+                    batch.to_pandas(), projected_indexes, first_row_number=total_rows + 1
+                )
+                total_rows += batch.num_rows
+                skipped_rows.extend(batch_skipped)
+                yield from students_data
+        finally:
+            self._report_validation("Fichier Parquet", total_rows, skipped_rows)
+    
+    def _iter_jsonl(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lit un fichier JSON Lines (un objet étudiant par ligne) en flux.
+        
+        Args:
+            file: Fichier JSONL
+            
+        Yields:
+            Dict[str, Any]: Données d'un étudiant valide
+        """
+        # Correspondance clés -> colonnes requises, mise en cache par jeu de clés
+        resolved_keys: Dict[Tuple[str, ...], Dict[str, int]] = {}
+        skipped_rows = []
+        total_rows = 0
+        file.seek(0)
+        try:
+            for line_number, line in enumerate(file, start=1):
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+                if not line.strip():
+                    continue
+                
+                total_rows += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    skipped_rows.append(line_number)
+                    continue
+                if not isinstance(record, dict):
+                    skipped_rows.append(line_number)
+                    continue
+                
+                keys = tuple(record)
+                column_indexes = resolved_keys.get(keys)
+                if column_indexes is None:
+                    column_indexes, _ = self._resolve_columns([str(key).strip() for key in keys])
+                    resolved_keys[keys] = column_indexes
+                
+                values = list(record.values())
                 student_data = {}
                 for col in self.required_columns:
-                    value = row[col]
-                    # Convertir les valeurs NaN en chaînes vides
-                    student_data[col] = str(value) if pd.notna(value) else ""
+                    col_idx = column_indexes.get(col)
+                    value = values[col_idx] if col_idx is not None else None
+                    # Convertir les valeurs absentes en chaînes vides
+                    student_data[col] = str(value) if value is not None else ""
                 
                 # Valider que l'étudiant a au moins un nom et une filière
-                if student_data['Nom'].strip() and student_data['Filière Actuelle'].strip():
-                    students_data.append(student_data)
+                if self._is_student_complete(student_data):
+                    yield student_data
                 else:
-                    st.warning(f"Ligne {index + 2} ignorée: Nom ou Filière Actuelle manquant")
-            
-            return students_data
-            
-        except Exception as e:
-            raise Exception(f"Erreur lors de la lecture du fichier Excel: {str(e)}")
+                    skipped_rows.append(line_number)
+        finally:
+            self._report_validation("Fichier JSONL", total_rows, skipped_rows)
     
     def _parse_word(self, file) -> List[Dict[str, Any]]:
         """
@@ -92,146 +514,226 @@ class FileParser:
             List[Dict[str, Any]]: Données des étudiants
         """
         try:
-            # Lire le document Word
-            doc = docx.Document(file)
-            students_data = []
+            return list(self._iter_word(file))
+        except Exception as e:
+            raise Exception(f"Erreur lors de la lecture du fichier Word: {str(e)}")
+    
+    def _iter_word(self, file) -> Iterator[Dict[str, Any]]:
+        """
+        Lit un fichier Word: les tableaux d'abord, sinon le texte libre en flux.
+        
+        Les tableaux sont lus directement dans word/document.xml; python-docx n'est
+        chargé que pour les tableaux à disposition complexe ou pour le texte libre.
+        
+        Args:
+            file: Fichier Word
             
-            # Essayer d'abord de lire les tableaux
-            if doc.tables:
-                students_data = self._parse_word_tables(doc.tables)
+        Yields:
+            Dict[str, Any]: Données d'un étudiant
+        """
+        doc = None
+        students_found = False
+        
+        for table_index, rows in self._iter_docx_tables(file):
+            if rows is None:
+                # Cellules fusionnées ou tableaux imbriqués: grille calculée par python-docx
+                if doc is None:
+                    file.seek(0)
+                    doc = docx.Document(file)
+                rows = self._table_rows(doc.tables[table_index])
             
-            # Si aucun tableau ou données vides, essayer de parser le texte
-            if not students_data:
-                students_data = self._parse_word_text(doc)
+            for student_data in self._students_from_table_rows(rows, table_index + 1):
+                students_found = True
+                yield student_data
+        
+        if students_found:
+            return
+        
+        # Si aucun tableau ou données vides, parser le texte
+        if doc is None:
+            file.seek(0)
+            doc = docx.Document(file)
+        yield from self._parse_word_text(doc)
+    
+    def _iter_docx_tables(self, file) -> Iterator[Tuple[int, Optional[List[List[str]]]]]:
+        """
+        Lit en flux les tableaux de premier niveau de word/document.xml (iterparse),
+        en libérant les éléments XML au fur et à mesure.
+        
+        Args:
+            file: Fichier Word
             
-            return students_data
+        Yields:
+            Tuple[int, Optional[List[List[str]]]]: Position du tableau (comme dans
+            python-docx) et textes de ses lignes, ou None si la disposition est complexe
+        """
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive, archive.open('word/document.xml') as xml_file:
+            stack = []
+            table_index = 0
+            table_depth = 0
+            in_body = False
+            complex_layout = False
+            rows: List[List[str]] = []
+            row: List[str] = []
             
-        except Exception as e:
-            raise Exception(f"Erreur lors de la lecture du fichier Word: {str(e)}")
+            for event, elem in ElementTree.iterparse(xml_file, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == W_TBL:
+                        table_depth += 1
+                        if table_depth == 1:
+                            # python-docx n'expose que les tableaux enfants directs du corps
+                            in_body = bool(stack) and stack[-1].tag == W_BODY
+                            complex_layout = False
+                            rows = []
+                        else:
+                            complex_layout = True
+                    stack.append(elem)
+                    continue
+                
+                stack.pop()
+                parent = stack[-1] if stack else None
+                
+                if elem.tag == W_TBL:
+                    table_depth -= 1
+                    if table_depth == 0 and in_body:
+                        yield table_index, (None if complex_layout else rows)
+                        table_index += 1
+                elif table_depth == 1 and elem.tag == W_TC:
+                    complex_layout = complex_layout or self._is_merged_cell(elem)
+                    row.append(self._cell_text(elem))
+                elif table_depth == 1 and elem.tag == W_TR:
+                    complex_layout = complex_layout or self._has_grid_offset(elem)
+                    rows.append(row)
+                    row = []
+                    parent.remove(elem)
+                
+                # Libérer les éléments de premier niveau une fois traités
+                if parent is not None and parent.tag == W_BODY:
+                    parent.remove(elem)
     
-    def _parse_word_tables(self, tables) -> List[Dict[str, Any]]:
+    def _cell_text(self, cell) -> str:
         """
-        Parse les tableaux dans un document Word.
+        Texte d'une cellule <w:tc>, comme python-docx (un paragraphe par ligne).
         
         Args:
-            tables: Liste des tableaux du document
+            cell: Élément XML de la cellule
             
         Returns:
-            List[Dict[str, Any]]: Données des étudiants
+            str: Texte de la cellule sans espaces superflus
         """
-        students_data = []
+        paragraphs = []
+        for paragraph in cell.iterfind(W_P):
+            parts = []
+            for run in paragraph.iter(W_R):
+                for node in run:
+                    if node.tag == W_T:
+                        parts.append(node.text or '')
+                    elif node.tag in (W_TAB, W_PTAB):
+                        parts.append('\t')
+                    elif node.tag in (W_BR, W_CR):
+                        parts.append('\n')
+            paragraphs.append(''.join(parts))
+        return '\n'.join(paragraphs).strip()
+    
+    def _is_merged_cell(self, cell) -> bool:
+        """True si la cellule est fusionnée horizontalement ou verticalement."""
+        properties = cell.find(W_TCPR)
+        if properties is None:
+            return False
+        grid_span = properties.find(W_GRIDSPAN)
+        if grid_span is not None and grid_span.get(W_VAL, '1') != '1':
+            return True
+        return properties.find(W_VMERGE) is not None or properties.find(W_HMERGE) is not None
+    
+    def _has_grid_offset(self, row) -> bool:
+        """True si la ligne saute des colonnes de la grille (gridBefore / gridAfter)."""
+        properties = row.find(W_TRPR)
+        return properties is not None and (
+            properties.find(W_GRIDBEFORE) is not None or properties.find(W_GRIDAFTER) is not None
+        )
+    
+    def _table_rows(self, table) -> List[List[str]]:
+        """
+        Textes des cellules d'un tableau python-docx, ligne par ligne.
         
-        for table in tables:
-            if len(table.rows) < 2:  # Besoin d'au moins une ligne d'en-tête et une ligne de données
-                continue
+        Args:
+            table: Tableau python-docx
             
-            # Extraire les en-têtes (première ligne)
-            headers = []
-            header_row = table.rows[0]
-            for cell in header_row.cells:
-                headers.append(cell.text.strip())
+        Returns:
+            List[List[str]]: Textes des cellules
+        """
+        return [[cell.text.strip() for cell in row.cells] for row in table.rows]
+    
+    def _students_from_table_rows(self, rows: List[List[str]], table_number: int) -> List[Dict[str, Any]]:
+        """
+        Construit les étudiants à partir des lignes d'un tableau (en-têtes en première ligne).
+        
+        Args:
+            rows: Textes des cellules, ligne par ligne
+            table_number: Numéro du tableau dans le document (pour les messages)
             
-            # Vérifier si ce tableau contient les colonnes requises
-            missing_columns = self._check_required_columns(headers)
-            if missing_columns:
-                st.warning(f"Tableau ignoré - colonnes manquantes: {', '.join(missing_columns)}")
-                continue
+        Returns:
+            List[Dict[str, Any]]: Données des étudiants valides
+        """
+        if len(rows) < 2:  # Besoin d'au moins une ligne d'en-tête et une ligne de données
+            return []
+        
+        # Vérifier si ce tableau contient les colonnes requises
+        column_indexes, missing_columns = self._resolve_columns(rows[0])
+        if missing_columns:
+            self.reporter.warning(f"Tableau ignoré - colonnes manquantes: {', '.join(missing_columns)}")
+            return []
+        
+        students_data = []
+        skipped_rows = []
+        for row_idx, row in enumerate(rows[1:], start=2):
+            student_data = {col: row[col_idx] if col_idx < len(row) else ""
+                            for col, col_idx in column_indexes.items()}
             
-            # Extraire les données
-            for row_idx, row in enumerate(table.rows[1:], start=2):
-                student_data = {}
-                for col_idx, cell in enumerate(row.cells):
-                    if col_idx < len(headers):
-                        header = headers[col_idx]
-                        if header in self.required_columns:
-                            student_data[header] = cell.text.strip()
-                
-                # Valider que l'étudiant a au moins un nom et une filière
-                if (student_data.get('Nom', '').strip() and 
-                    student_data.get('Filière Actuelle', '').strip()):
-                    # S'assurer que toutes les colonnes requises sont présentes
-                    for col in self.required_columns:
-                        if col not in student_data:
-                            student_data[col] = ""
-                    students_data.append(student_data)
-                else:
-                    st.warning(f"Ligne {row_idx} du tableau ignorée: Nom ou Filière Actuelle manquant")
+            # Valider que l'étudiant a au moins un nom et une filière
+            if self._is_student_complete(student_data):
+                students_data.append(student_data)
+            else:
+                skipped_rows.append(row_idx)
         
+        self._report_validation(f"Tableau Word {table_number}", len(rows) - 1, skipped_rows)
         return students_data
     
-    def _parse_word_text(self, doc) -> List[Dict[str, Any]]:
+    def _parse_word_text(self, doc) -> Iterator[Dict[str, Any]]:
         """
-        Parse le texte libre d'un document Word.
-        Recherche des patterns comme "Nom: John Doe" etc.
+        Parse le texte libre d'un document Word en flux.
+        Recherche des libellés comme "Nom: John Doe", plusieurs par paragraphe possibles.
+        
+        Chaque paragraphe est classé en un seul passage de WORD_TEXT_PATTERN; la valeur
+        d'un champ s'étend jusqu'au libellé suivant ou à la fin du paragraphe.
         
         Args:
             doc: Document Word
             
-        Returns:
-            List[Dict[str, Any]]: Données des étudiants
+        Yields:
+            Dict[str, Any]: Données d'un étudiant, dès qu'il est complet
         """
-        students_data = []
         current_student = {}
         
-        # Patterns de recherche pour les champs
-        field_patterns = {
-            'Nom': ['nom:', 'nom :', 'name:'],
-            'Prénom': ['prénom:', 'prénom :', 'prenom:', 'firstname:'],
-            'Date de Naissance': ['date de naissance:', 'naissance:', 'né le:', 'birthdate:'],
-            'Lieu de Naissance': ['lieu de naissance:', 'lieu:', 'né à:', 'birthplace:'],
-            'Filière Actuelle': ['filière:', 'filiere:', 'filière actuelle:', 'field:'],
-            'Carrière Envisagée': ['carrière:', 'carriere:', 'carrière envisagée:', 'career:']
-        }
-        
         for paragraph in doc.paragraphs:
-            text = paragraph.text.strip().lower()
+            text = paragraph.text.strip()
             
             if not text:
                 # Paragraphe vide - potentiellement fin d'un étudiant
                 if self._is_student_complete(current_student):
-                    students_data.append(current_student.copy())
+                    yield current_student
                     current_student = {}
                 continue
             
-            # Rechercher les champs dans le texte
-            for field, patterns in field_patterns.items():
-                for pattern in patterns:
-                    if pattern in text:
-                        # Extraire la valeur après le pattern
-                        start_idx = text.find(pattern) + len(pattern)
-                        value = paragraph.text[start_idx:].strip()
-                        current_student[field] = value
-                        break
+            matches = list(self.WORD_TEXT_PATTERN.finditer(text))
+            for match, next_match in zip(matches, matches[1:] + [None]):
+                end = next_match.start() if next_match else len(text)
+                current_student[self.WORD_TEXT_FIELDS[match.lastgroup]] = text[match.end():end].strip()
         
         # Ajouter le dernier étudiant s'il est complet
         if self._is_student_complete(current_student):
-            students_data.append(current_student)
-        
-        return students_data
-    
-    def _check_required_columns(self, columns: List[str]) -> List[str]:
-        """
-        Vérifie la présence des colonnes requises.
-        
-        Args:
-            columns: Liste des colonnes présentes
-            
-        Returns:
-            List[str]: Liste des colonnes manquantes
-        """
-        missing_columns = []
-        for required_col in self.required_columns:
-            if required_col not in columns:
-                # Essayer de trouver des variations (insensible à la casse, avec/sans accents)
-                found = False
-                for col in columns:
-                    if self._normalize_column_name(col) == self._normalize_column_name(required_col):
-                        found = True
-                        break
-                if not found:
-                    missing_columns.append(required_col)
-        
-        return missing_columns
+            yield current_student
     
     def _normalize_column_name(self, name: str) -> str:
         """
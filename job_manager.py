@@ -0,0 +1,207 @@
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+import logging
+
+from config import Config
+from job_store import JobStore
+from pipeline import process_students
+from profile_planner import ProfilePlan
+from recommendation_engine import RecommendationEngine
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# États d'un traitement en arrière-plan
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+@dataclass
+class BackgroundJob:
+    """Traitement d'un fichier d'étudiants exécuté en arrière-plan."""
+    job_id: str
+    key: str
+    owner: str
+    file_name: str
+    total: int
+    status: str = STATUS_QUEUED
+    results: List[Optional[Dict[str, Any]]] = field(default_factory=list)
+    completed: int = 0
+    errors: int = 0
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Instants des derniers résultats (estimation du temps restant)
+    recent_completions: deque = field(default_factory=lambda: deque(maxlen=50), repr=False)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+    
+    @property
+    def progress(self) -> float:
+        """Part des étudiants traités (0 à 1)."""
+        if not self.total:
+            return 1.0
+        return self.completed / self.total
+    
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Temps restant estimé d'après le débit des derniers résultats (les
+        résultats repris du journal, renvoyés d'un coup au départ, sortent
+        rapidement de la fenêtre).
+        """
+        if self.is_finished or len(self.recent_completions) < 2:
+            return None
+        span = self.recent_completions[-1] - self.recent_completions[0]
+        if span <= 0:
+            return None
+        rate = (len(self.recent_completions) - 1) / span
+        return (self.total - self.completed) / rate
+    
+    def get_results(self) -> List[Dict[str, Any]]:
+        """Résultats disponibles, dans l'ordre du fichier."""
+        return [item for item in list(self.results) if item is not None]
+
+class JobManager:
+    """
+    Exécute les traitements de fichiers sur un pool de threads propre au
+    processus serveur: l'interface reçoit un identifiant et consulte
+    l'avancement, le traitement continue si l'onglet est fermé.
+    """
+    
+    def __init__(self, max_jobs: int = Config.BACKGROUND_MAX_JOBS,
+                 retention_seconds: float = Config.BACKGROUND_JOB_RETENTION):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix="background-job")
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, students_data: List[Dict[str, str]], rec_engine: RecommendationEngine,
+               file_name: str, key: str = '', owner: str = '',
+               plan: Optional[ProfilePlan] = None,
+               job_store: Optional[JobStore] = None,
+               store_job_id: Optional[str] = None) -> str:
+        """
+        Lance le traitement d'un fichier en arrière-plan.
+        
+        Args:
+            students_data: Données des étudiants
+            rec_engine: Moteur de recommandation (fermé à la fin du traitement)
+            file_name: Nom du fichier d'étudiants
+            key: Clé des résultats (même fichier et mêmes options)
+            owner: Identifiant de l'utilisateur qui a lancé le traitement
+            plan: Plan de regroupement des profils
+            job_store: Journal des traitements (reprise après interruption)
+            store_job_id: Identifiant du traitement dans le journal
+            
+        Returns:
+            str: Identifiant du traitement en arrière-plan
+        """
+        self._prune()
+        job = BackgroundJob(job_id=uuid.uuid4().hex, key=key, owner=owner, file_name=file_name,
+                            total=len(students_data), results=[None] * len(students_data))
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job, students_data, rec_engine, plan, job_store, store_job_id)
+        logger.info(f"Traitement en arrière-plan {job.job_id[:8]} soumis: {file_name} ({job.total} étudiants)")
+        return job.job_id
+    
+    def _run(self, job: BackgroundJob, students_data: List[Dict[str, str]], rec_engine: RecommendationEngine,
+             plan: Optional[ProfilePlan], job_store: Optional[JobStore], store_job_id: Optional[str]):
+        """Exécute un traitement (thread du pool)."""
+        job.status = STATUS_RUNNING
+        job.started_at = time.time()
+        try:
+            with rec_engine, closing(process_students(students_data, rec_engine, plan=plan,
+                                                      job_store=job_store, job_id=store_job_id)) as items:
+                for index, item in items:
+                    job.results[index] = item
+                    job.errors += 'error' in item['recommendation']
+                    job.completed += 1
+                    job.recent_completions.append(time.time())
+                    if job.cancel_event.is_set():
+                        break
+            job.status = STATUS_CANCELLED if job.cancel_event.is_set() else STATUS_DONE
+            
+        except Exception as e:
+            logger.error(f"Traitement en arrière-plan {job.job_id[:8]} en échec: {str(e)}")
+            job.error = str(e)
+            job.status = STATUS_FAILED
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"Traitement en arrière-plan {job.job_id[:8]} terminé ({job.status}): "
+                        f"{job.completed}/{job.total} étudiants, {job.errors} erreur(s)")
+    
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        """Retourne un traitement, ou None s'il est inconnu (ou expiré)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def find(self, key: str, owner: str = '') -> Optional[BackgroundJob]:
+        """
+        Retourne le dernier traitement lancé pour une clé de résultats.
+        
+        Args:
+            key: Clé des résultats
+            owner: Identifiant de l'utilisateur
+            
+        Returns:
+            Optional[BackgroundJob]: Traitement le plus récent, ou None
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.key == key and job.owner == owner]
+        return max(jobs, key=lambda job: job.submitted_at, default=None)
+    
+    def list_jobs(self, owner: Optional[str] = None) -> List[BackgroundJob]:
+        """
+        Liste les traitements, du plus récent au plus ancien.
+        
+        Args:
+            owner: Ne garder que les traitements de cet utilisateur (tous si None)
+            
+        Returns:
+            List[BackgroundJob]: Traitements
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if owner is None or job.owner == owner]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+    
+    def cancel(self, job_id: str):
+        """Demande l'arrêt d'un traitement (les résultats déjà obtenus sont conservés)."""
+        job = self.get(job_id)
+        if job is not None and not job.is_finished:
+            job.cancel_event.set()
+    
+    def forget(self, job_id: str):
+        """Oublie un traitement (arrêté au préalable s'il est en cours)."""
+        self.cancel(job_id)
+        with self._lock:
+            self._jobs.pop(job_id, None)
+    
+    def _prune(self):
+        """Oublie les traitements terminés depuis plus longtemps que la durée de conservation."""
+        limit = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.is_finished and job.finished_at and job.finished_at < limit]
+            for job_id in expired:
+                del self._jobs[job_id]
+    
+    def shutdown(self):
+        """Arrête les traitements en cours et le pool de threads."""
+        for job in self.list_jobs():
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Statuts d'un étudiant dans un traitement
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+
+class JobStore:
+    """
+    Journal persistant (SQLite) des traitements par lot, pour reprendre un lot interrompu.
+    
+    Un traitement est identifié par l'empreinte du fichier d'étudiants; chaque
+    étudiant (numéro de ligne dans le fichier analysé) est enregistré dès que sa
+    recommandation est prête. À la reprise, seuls les étudiants absents ou en
+    erreur sont traités à nouveau.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            # WAL: l'interface et les traitements en ligne de commande peuvent partager le fichier
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, "
+                "file_name TEXT, "
+                "total_students INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_results ("
+                "job_id TEXT NOT NULL, "
+                "row_id INTEGER NOT NULL, "
+                "status TEXT NOT NULL, "
+                "student TEXT NOT NULL, "
+                "recommendation TEXT NOT NULL, "
+                "updated_at REAL NOT NULL, "
+                "PRIMARY KEY (job_id, row_id))"
+            )
+    
+    @staticmethod
+    def hash_file(file, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Calcule l'empreinte du contenu d'un fichier (identifiant du traitement).
+        
+        Args:
+            file: Fichier téléversé ou ouvert en lecture binaire
+            chunk_size: Taille des blocs lus
+            
+        Returns:
+            str: Empreinte SHA-256 hexadécimale
+        """
+        digest = hashlib.sha256()
+        position = file.tell()
+        file.seek(0)
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+        file.seek(position)
+        return digest.hexdigest()
+    
+    def start_job(self, job_id: str, file_name: str, total_students: int):
+        """
+        Enregistre (ou reprend) un traitement.
+        
+        Args:
+            job_id: Identifiant du traitement (empreinte du fichier)
+            file_name: Nom du fichier d'étudiants
+            total_students: Nombre d'étudiants du fichier
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, file_name, total_students, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET file_name = excluded.file_name, "
+                "total_students = excluded.total_students, updated_at = excluded.updated_at",
+                (job_id, file_name, total_students, now, now)
+            )
+    
+    def get_completed(self, job_id: str, first_row: int = 0,
+                      end_row: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Récupère les résultats réussis d'un traitement.
+        
+        Args:
+            job_id: Identifiant du traitement
+            first_row: Premier numéro de ligne retenu
+            end_row: Numéro de ligne de fin, exclu (None: jusqu'à la dernière ligne)
+            
+        Returns:
+            Dict[int, Dict[str, Any]]: Résultats {'student', 'recommendation'} par numéro de ligne
+        """
+        query = ("SELECT row_id, student, recommendation FROM job_results "
+                 "WHERE job_id = ? AND status = ? AND row_id >= ?")
+        params = [job_id, STATUS_DONE, first_row]
+        if end_row is not None:
+            query += " AND row_id < ?"
+            params.append(end_row)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        
+        completed = {}
+        for row_id, student, recommendation in rows:
+            try:
+                completed[row_id] = {
+                    'student': json.loads(student),
+                    'recommendation': json.loads(recommendation)
+                }
+            except json.JSONDecodeError:
+                logger.warning(f"Résultat illisible ignoré (traitement {job_id[:12]}, ligne {row_id})")
+        return completed
+    
+    def record_result(self, job_id: str, row_id: int, item: Dict[str, Any], json_default=None):
+        """
+        Enregistre le résultat d'un étudiant dès qu'il est disponible.
+        
+        Args:
+            job_id: Identifiant du traitement
+            row_id: Numéro de l'étudiant dans le fichier analysé
+            item: Résultat {'student', 'recommendation'}
+            json_default: Sérialisation des objets non JSON (voir pipeline.json_default)
+        """
+        recommendation = item['recommendation']
+        status = STATUS_ERROR if 'error' in recommendation else STATUS_DONE
+        now = time.time()
+        try:
+            student_json = json.dumps(item['student'], ensure_ascii=False, default=json_default)
+            recommendation_json = json.dumps(recommendation, ensure_ascii=False, default=json_default)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO job_results "
+                    "(job_id, row_id, status, student, recommendation, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, row_id, status, student_json, recommendation_json, now)
+                )
+                self._conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+            
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Enregistrement du résultat impossible (ligne {row_id}): {str(e)}")
+    
+    def get_job_summary(self, job_id: str) -> Dict[str, Any]:
+        """
+        Résume l'avancement d'un traitement.
+        
+        Args:
+            job_id: Identifiant du traitement
+            
+        Returns:
+            Dict[str, Any]: Nombre d'étudiants, de réussites et d'erreurs enregistrées
+        """
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT file_name, total_students, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_results WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        
+        if job is None:
+            return {'job_id': job_id, 'exists': False}
+        
+        file_name, total_students, created_at, updated_at = job
+        done = counts.get(STATUS_DONE, 0)
+        return {
+            'job_id': job_id,
+            'exists': True,
+            'file_name': file_name,
+            'total_students': total_students,
+            'done': done,
+            'errors': counts.get(STATUS_ERROR, 0),
+            'remaining': max(0, total_students - done),
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+    
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Liste les traitements enregistrés, du plus récent au plus ancien.
+        
+        Returns:
+            List[Dict[str, Any]]: Résumés des traitements
+        """
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM jobs ORDER BY updated_at DESC"
+            ).fetchall()]
+        return [self.get_job_summary(job_id) for job_id in job_ids]
+    
+    def delete_job(self, job_id: str):
+        """Supprime un traitement et ses résultats (pour repartir de zéro)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+    
+    def close(self):
+        """Ferme la connexion à la base des traitements."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,114 @@
+import json
+import re
+from typing import Any, Optional, List
+
+# Bloc de code Markdown (```json ... ```) autour de la réponse de l'IA
+_CODE_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+_CLOSERS = {'[': ']', '{': '}'}
+
+def parse_json_response(text: str) -> Any:
+    """
+    Lit le JSON d'une réponse de l'IA, en tolérant le texte autour (bloc de
+    code, phrase d'introduction) et une réponse tronquée (max_tokens atteint).
+    
+    Args:
+        text: Réponse brute de l'IA
+        
+    Returns:
+        Any: Valeur JSON (objet ou tableau)
+        
+    Raises:
+        ValueError: Si aucun JSON exploitable n'est trouvé
+    """
+    fence = _CODE_FENCE_PATTERN.search(text)
+    if fence:
+        text = fence.group(1)
+    
+    starts = [position for position in (text.find('{'), text.find('[')) if position != -1]
+    if not starts:
+        raise ValueError("Aucun JSON dans la réponse de l'IA")
+    text = text[min(starts):]
+    
+    try:
+        # raw_decode ignore le texte éventuel après la valeur JSON
+        value, _ = json.JSONDecoder().raw_decode(text)
+        return value
+    except json.JSONDecodeError:
+        pass
+    
+    repaired = repair_truncated_json(text)
+    if repaired is None:
+        raise ValueError("JSON illisible dans la réponse de l'IA")
+    return json.loads(repaired)
+
+def repair_truncated_json(text: str) -> Optional[str]:
+    """
+    Complète un JSON tronqué (chaîne et conteneurs non fermés).
+    
+    Args:
+        text: JSON commençant par '{' ou '['
+        
+    Returns:
+        Optional[str]: JSON réparé, ou None si aucune réparation n'aboutit
+    """
+    for candidate in _repair_candidates(text):
+        try:
+            json.loads(candidate)
+            return candidate
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def _repair_candidates(text: str) -> List[str]:
+    """
+    Réparations possibles d'un JSON tronqué, de la plus complète à la plus sûre:
+    1. fermer la chaîne et les conteneurs ouverts (garde le texte partiel);
+    2. couper après la dernière valeur complète et fermer les conteneurs.
+    """
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    # Dernier point où toutes les valeurs précédentes sont complètes
+    safe_end = None
+    safe_stack: List[str] = []
+    
+    for position, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in ']}':
+            if not stack:
+                return [text[:position]]
+            stack.pop()
+            if not stack:
+                return [text[:position + 1]]
+            safe_end, safe_stack = position + 1, list(stack)
+        elif char == ',':
+            safe_end, safe_stack = position, list(stack)
+    
+    candidates = []
+    
+    closed = text[:-1] if escape else text
+    if in_string:
+        closed += '"'
+    closed = closed.rstrip()
+    if closed.endswith(':'):
+        closed += ' null'
+    closed = closed.rstrip(',')
+    candidates.append(closed + ''.join(_CLOSERS[opener] for opener in reversed(stack)))
+    
+    if safe_end is not None:
+        candidates.append(text[:safe_end].rstrip().rstrip(',')
+                          + ''.join(_CLOSERS[opener] for opener in reversed(safe_stack)))
+    return candidates
@@ -0,0 +1,272 @@
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from text_utils import normalize_text
+
+def _trigrams(text: str, padded: bool = True) -> FrozenSet[str]:
+    """
+    Calcule l'ensemble des trigrammes de caractères d'un texte normalisé.
+    
+    Args:
+        text: Texte normalisé
+        padded: True pour encadrer le texte d'espaces (marque les débuts et fins de mots)
+        
+    Returns:
+        FrozenSet[str]: Trigrammes du texte
+    """
+    if padded:
+        text = f" {text} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+class NameIndex:
+    """
+    Index inversé (mots et trigrammes) sur des noms normalisés sans accents.
+    
+    Permet des recherches exactes, par sous-chaîne et approximatives classées
+    par score, sans parcourir toutes les entrées.
+    """
+    
+    def __init__(self, min_token_length: int = 3):
+        self.min_token_length = min_token_length
+        self._names: List[str] = []
+        self._values: List[Any] = []
+        self._name_tokens: List[FrozenSet[str]] = []
+        self._name_trigrams: List[FrozenSet[str]] = []
+        self._exact: Dict[str, int] = {}
+        self._token_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._trigram_postings: Dict[str, Set[int]] = defaultdict(set)
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def _tokens(self, normalized: str) -> FrozenSet[str]:
+        """Mots significatifs d'un nom normalisé (les mots trop courts sont ignorés)."""
+        return frozenset(t for t in normalized.split() if len(t) >= self.min_token_length)
+    
+    def add(self, name: str, value: Any) -> int:
+        """
+        Ajoute une entrée à l'index.
+        
+        Args:
+            name: Nom indexé
+            value: Valeur associée (métier, secteur, formation...)
+            
+        Returns:
+            int: Identifiant de l'entrée
+        """
+        normalized = normalize_text(name)
+        entry_id = len(self._values)
+        tokens = self._tokens(normalized)
+        trigrams = _trigrams(normalized)
+        
+        self._names.append(normalized)
+        self._values.append(value)
+        self._name_tokens.append(tokens)
+        self._name_trigrams.append(trigrams)
+        self._exact.setdefault(normalized, entry_id)
+        for token in tokens:
+            self._token_postings[token].add(entry_id)
+        for trigram in trigrams:
+            self._trigram_postings[trigram].add(entry_id)
+        
+        return entry_id
+    
+    def get_exact(self, name: str) -> Optional[Any]:
+        """
+        Recherche une entrée dont le nom normalisé est identique.
+        
+        Args:
+            name: Nom recherché
+            
+        Returns:
+            Optional[Any]: Valeur trouvée ou None
+        """
+        entry_id = self._exact.get(normalize_text(name))
+        return self._values[entry_id] if entry_id is not None else None
+    
+    def find_containing(self, query: str) -> List[Any]:
+        """
+        Retourne les entrées dont le nom normalisé contient la requête.
+        
+        Args:
+            query: Texte recherché
+            
+        Returns:
+            List[Any]: Valeurs correspondantes, dans l'ordre d'insertion
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+        
+        # Toute sous-chaîne partage tous ses trigrammes avec le nom qui la contient
+        query_trigrams = _trigrams(normalized, padded=False)
+        if query_trigrams:
+            postings = sorted((self._trigram_postings.get(t, set()) for t in query_trigrams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = range(len(self._values))
+        
+        return [self._values[i] for i in sorted(candidates) if normalized in self._names[i]]
+    
+    def search(self, query: str, max_results: int = 5, min_score: float = 0.0) -> List[Tuple[Any, float]]:
+        """
+        Recherche approximative classée par score de similarité (0 à 1).
+        
+        Les candidats sont d'abord ceux qui partagent un mot avec la requête;
+        à défaut (fautes de frappe, pluriels), ceux qui partagent des trigrammes.
+        
+        Args:
+            query: Texte recherché
+            max_results: Nombre maximum de résultats
+            min_score: Score minimum pour retenir un candidat
+            
+        Returns:
+            List[Tuple[Any, float]]: Valeurs et scores, du meilleur au moins bon
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+        
+        exact_id = self._exact.get(normalized)
+        query_tokens = self._tokens(normalized) or frozenset(normalized.split())
+        query_trigrams = _trigrams(normalized)
+        
+        candidates: Set[int] = set()
+        for token in query_tokens:
+            candidates.update(self._token_postings.get(token, ()))
+        if not candidates:
+            for trigram in query_trigrams:
+                candidates.update(self._trigram_postings.get(trigram, ()))
+        if exact_id is not None:
+            candidates.add(exact_id)
+        
+        scored = []
+        for entry_id in candidates:
+            name = self._names[entry_id]
+            if entry_id == exact_id:
+                score = 1.0
+            else:
+                name_tokens = self._name_tokens[entry_id]
+                name_trigrams = self._name_trigrams[entry_id]
+                token_union = query_tokens | name_tokens
+                token_score = len(query_tokens & name_tokens) / len(token_union) if token_union else 0.0
+                trigram_score = (2 * len(query_trigrams & name_trigrams)
+                                 / (len(query_trigrams) + len(name_trigrams)))
+                containment = 1.0 if (normalized in name or name in normalized) else 0.0
+                score = 0.4 * token_score + 0.4 * trigram_score + 0.2 * containment
+            
+            if score >= min_score:
+                scored.append((score, entry_id))
+        
+        # Ordre déterministe: score, puis nom le plus court, puis ordre d'insertion
+        scored.sort(key=lambda item: (-item[0], len(self._names[item[1]]), item[1]))
+        return [(self._values[entry_id], round(score, 4)) for score, entry_id in scored[:max_results]]
+
+class SimilarityIndex:
+    """
+    Index de similarité entre métiers basé sur des vecteurs creux de compétences.
+    
+    Chaque compétence (par son nom, stable d'un processus à l'autre contrairement
+    aux identifiants de vocabulaire) et chaque secteur pointe vers les métiers
+    qui les possèdent; le score d'un voisin est le produit scalaire
+    pondéré de ces vecteurs. Les meilleurs voisins de chaque métier sont mis en
+    cache et invalidés incrémentalement lors de l'ajout d'un métier.
+    """
+    
+    SECTEUR_WEIGHT = 3.0
+    TECHNIQUE_WEIGHT = 1.0
+    TRANSVERSALE_WEIGHT = 0.5
+    
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._metiers: List[Any] = []
+        self._ids_by_name: Dict[str, int] = {}
+        self._technique_postings: Dict[str, List[int]] = defaultdict(list)
+        self._transversale_postings: Dict[str, List[int]] = defaultdict(list)
+        self._secteur_postings: Dict[str, List[int]] = defaultdict(list)
+        self._top_k_cache: Dict[int, List[Tuple[int, float]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._metiers)
+    
+    def add(self, metier: Any) -> int:
+        """
+        Ajoute un métier et invalide le cache des métiers qui partagent une
+        compétence ou un secteur avec lui.
+        
+        Args:
+            metier: Métier à indexer
+            
+        Returns:
+            int: Identifiant du métier dans l'index
+        """
+        metier_id = len(self._metiers)
+        self._metiers.append(metier)
+        self._ids_by_name.setdefault(metier.nom_metier, metier_id)
+        
+        touched: Set[int] = set()
+        for postings, key in self._features(metier):
+            touched.update(postings.get(key, ()))
+            postings[key].append(metier_id)
+        
+        for neighbour_id in touched:
+            self._top_k_cache.pop(neighbour_id, None)
+        
+        return metier_id
+    
+    def _features(self, metier: Any) -> List[Tuple[Dict[Any, List[int]], Any]]:
+        """Couples (liste inversée, clé) décrivant le vecteur creux d'un métier."""
+        features = [(self._technique_postings, c) for c in set(metier.competences_requises_techniques)]
+        features += [(self._transversale_postings, c) for c in set(metier.competences_requises_transversales)]
+        features.append((self._secteur_postings, metier.secteur_activite.lower()))
+        return features
+    
+    def _score_neighbours(self, metier: Any) -> List[Tuple[int, float]]:
+        """
+        Calcule les scores de tous les métiers partageant au moins une caractéristique.
+        
+        Args:
+            metier: Métier de référence
+            
+        Returns:
+            List[Tuple[int, float]]: Identifiants et scores, triés par score décroissant
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for c in set(metier.competences_requises_techniques):
+            for neighbour_id in self._technique_postings.get(c, ()):
+                scores[neighbour_id] += self.TECHNIQUE_WEIGHT
+        for c in set(metier.competences_requises_transversales):
+            for neighbour_id in self._transversale_postings.get(c, ()):
+                scores[neighbour_id] += self.TRANSVERSALE_WEIGHT
+        for neighbour_id in self._secteur_postings.get(metier.secteur_activite.lower(), ()):
+            scores[neighbour_id] += self.SECTEUR_WEIGHT
+        
+        ranked = [(neighbour_id, score) for neighbour_id, score in scores.items()
+                  if self._metiers[neighbour_id].nom_metier != metier.nom_metier]
+        # À score égal, l'ordre d'insertion est conservé
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+    
+    def find_similar(self, metier: Any, max_results: int = 3) -> List[Any]:
+        """
+        Retourne les métiers les plus similaires à un métier de référence.
+        
+        Args:
+            metier: Métier de référence
+            max_results: Nombre maximum de résultats
+            
+        Returns:
+            List[Any]: Métiers similaires, du plus proche au moins proche
+        """
+        metier_id = self._ids_by_name.get(metier.nom_metier)
+        indexed = metier_id is not None and self._metiers[metier_id] is metier
+        
+        if not indexed or max_results > self.top_k:
+            ranked = self._score_neighbours(metier)
+        else:
+            ranked = self._top_k_cache.get(metier_id)
+            if ranked is None:
+                ranked = self._score_neighbours(metier)[:self.top_k]
+                self._top_k_cache[metier_id] = ranked
+        
+        return [self._metiers[neighbour_id] for neighbour_id, _ in ranked[:max_results]]
@@ -1,66 +1,289 @@
+import copyreg
 import json
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import FrozenInstanceError
 from pathlib import Path
 import logging
 
+from kb_index import NameIndex, SimilarityIndex
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class Metier:
+class Vocabulary:
+    """
+    Table de chaînes partagée: chaque chaîne distincte est stockée une seule fois
+    et référencée par un identifiant entier.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._strings)
+    
+    def intern(self, value: str) -> int:
+        """
+        Retourne l'identifiant d'une chaîne, en l'ajoutant si nécessaire.
+        
+        Args:
+            value: Chaîne à référencer
+            
+        Returns:
+            int: Identifiant de la chaîne
+        """
+        value_id = self._ids.get(value)
+        if value_id is None:
+            with self._lock:
+                value_id = self._ids.get(value)
+                if value_id is None:
+                    value_id = len(self._strings)
+                    self._strings.append(sys.intern(value))
+                    self._ids[self._strings[value_id]] = value_id
+        return value_id
+    
+    def intern_all(self, values: List[str]) -> Tuple[int, ...]:
+        """Identifiants d'une liste de chaînes."""
+        return tuple(self.intern(value) for value in values or ())
+    
+    def lookup_all(self, value_ids: Tuple[int, ...]) -> List[str]:
+        """Chaînes correspondant à une liste d'identifiants."""
+        strings = self._strings
+        return [strings[value_id] for value_id in value_ids]
+
+# Vocabulaires partagés par toutes les bases de connaissances du processus
+COMPETENCE_VOCABULARY = Vocabulary()
+FORMATION_VOCABULARY = Vocabulary()
+METIER_VOCABULARY = Vocabulary()
+INSTITUTION_VOCABULARY = Vocabulary()
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Interne une chaîne courte et fréquente (secteur, niveau de demande...)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class _Record:
+    """
+    Base des enregistrements de la base de connaissances: immuables, sans
+    __dict__ (__slots__), comparables et sérialisables comme des dataclasses.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    # Emplacements contenant des identifiants (un seul ou un tuple) et leur vocabulaire
+    _vocabulary_slots: Dict[str, Vocabulary] = {}
+    
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+    
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+    
+    def _key(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{self.__class__.__name__}({fields})"
+    
+    def __reduce__(self):
+        # Restauré sans __init__ (__setstate__); les identifiants, propres aux
+        # vocabulaires du processus, sont sérialisés sous forme de chaînes
+        state = {}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            vocabulary = self._vocabulary_slots.get(slot)
+            if vocabulary is not None:
+                value = (vocabulary.lookup_all(value) if isinstance(value, tuple)
+                         else vocabulary.lookup_all((value,))[0])
+            state[slot] = value
+        return (copyreg.__newobj__, (self.__class__,), state)
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        for slot, value in state.items():
+            vocabulary = self._vocabulary_slots.get(slot)
+            if vocabulary is not None:
+                value = vocabulary.intern(value) if isinstance(value, str) else vocabulary.intern_all(value)
+            object.__setattr__(self, slot, value)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sous forme de dictionnaire (format du fichier JSON)."""
+        return {name: getattr(self, name) for name in self._fields}
+
+class Metier(_Record):
     """Classe représentant un métier/carrière."""
-    nom_metier: str
-    description: str
-    secteur_activite: str
-    competences_requises_techniques: List[str]
-    competences_requises_transversales: List[str]
-    formations_typiques: List[str]
-    niveau_demande_marche: str  # "élevé", "moyen", "faible"
-    perspectives_croissance: bool
-    pertinence_realites_africaines_benin: str
+    __slots__ = ('nom_metier', 'description', 'secteur_activite', 'competences_techniques_ids',
+                 'competences_transversales_ids', 'formations_ids', 'niveau_demande_marche',
+                 'perspectives_croissance', 'pertinence_realites_africaines_benin')
+    _fields = ('nom_metier', 'description', 'secteur_activite', 'competences_requises_techniques',
+               'competences_requises_transversales', 'formations_typiques', 'niveau_demande_marche',
+               'perspectives_croissance', 'pertinence_realites_africaines_benin')
+    _vocabulary_slots = {'competences_techniques_ids': COMPETENCE_VOCABULARY,
+                         'competences_transversales_ids': COMPETENCE_VOCABULARY,
+                         'formations_ids': FORMATION_VOCABULARY}
+    
+    def __init__(self, nom_metier: str, description: str, secteur_activite: str,
+                 competences_requises_techniques: List[str],
+                 competences_requises_transversales: List[str],
+                 formations_typiques: List[str],
+                 niveau_demande_marche: str,  # "élevé", "moyen", "faible"
+                 perspectives_croissance: bool,
+                 pertinence_realites_africaines_benin: str):
+        init = object.__setattr__
+        init(self, 'nom_metier', _intern(nom_metier))
+        init(self, 'description', description)
+        init(self, 'secteur_activite', _intern(secteur_activite))
+        init(self, 'competences_techniques_ids', COMPETENCE_VOCABULARY.intern_all(competences_requises_techniques))
+        init(self, 'competences_transversales_ids', COMPETENCE_VOCABULARY.intern_all(competences_requises_transversales))
+        init(self, 'formations_ids', FORMATION_VOCABULARY.intern_all(formations_typiques))
+        init(self, 'niveau_demande_marche', _intern(niveau_demande_marche))
+        init(self, 'perspectives_croissance', perspectives_croissance)
+        init(self, 'pertinence_realites_africaines_benin', pertinence_realites_africaines_benin)
+    
+    @property
+    def competences_requises_techniques(self) -> List[str]:
+        return COMPETENCE_VOCABULARY.lookup_all(self.competences_techniques_ids)
+    
+    @property
+    def competences_requises_transversales(self) -> List[str]:
+        return COMPETENCE_VOCABULARY.lookup_all(self.competences_transversales_ids)
+    
+    @property
+    def formations_typiques(self) -> List[str]:
+        return FORMATION_VOCABULARY.lookup_all(self.formations_ids)
 
-@dataclass
-class Secteur:
+class Secteur(_Record):
     """Classe représentant un secteur d'activité."""
-    nom_secteur: str
-    description: str
-    metiers_associes: List[str]
+    __slots__ = ('nom_secteur', 'description', 'metiers_associes_ids')
+    _fields = ('nom_secteur', 'description', 'metiers_associes')
+    _vocabulary_slots = {'metiers_associes_ids': METIER_VOCABULARY}
+    
+    def __init__(self, nom_secteur: str, description: str, metiers_associes: List[str]):
+        init = object.__setattr__
+        init(self, 'nom_secteur', _intern(nom_secteur))
+        init(self, 'description', description)
+        init(self, 'metiers_associes_ids', METIER_VOCABULARY.intern_all(metiers_associes))
+    
+    @property
+    def metiers_associes(self) -> List[str]:
+        return METIER_VOCABULARY.lookup_all(self.metiers_associes_ids)
 
-@dataclass
-class Competence:
+class Competence(_Record):
     """Classe représentant une compétence."""
-    nom_competence: str
-    type_competence: str  # "technique", "transversale", "numérique"
-    description: Optional[str] = ""
+    __slots__ = ('competence_id', 'type_competence', 'description')
+    _fields = ('nom_competence', 'type_competence', 'description')
+    _vocabulary_slots = {'competence_id': COMPETENCE_VOCABULARY}
+    
+    def __init__(self, nom_competence: str,
+                 type_competence: str,  # "technique", "transversale", "numérique"
+                 description: Optional[str] = ""):
+        init = object.__setattr__
+        init(self, 'competence_id', COMPETENCE_VOCABULARY.intern(nom_competence))
+        init(self, 'type_competence', _intern(type_competence))
+        init(self, 'description', description)
+    
+    @property
+    def nom_competence(self) -> str:
+        return COMPETENCE_VOCABULARY.lookup_all((self.competence_id,))[0]
 
-@dataclass
-class Formation:
+class Formation(_Record):
     """Classe représentant une formation."""
-    nom_formation: str
-    description: str
-    metiers_prepares: List[str]
-    institutions_references: List[str]
+    __slots__ = ('formation_id', 'description', 'metiers_prepares_ids', 'institutions_ids')
+    _fields = ('nom_formation', 'description', 'metiers_prepares', 'institutions_references')
+    _vocabulary_slots = {'formation_id': FORMATION_VOCABULARY, 'metiers_prepares_ids': METIER_VOCABULARY,
+                         'institutions_ids': INSTITUTION_VOCABULARY}
+    
+    def __init__(self, nom_formation: str, description: str,
+                 metiers_prepares: List[str], institutions_references: List[str]):
+        init = object.__setattr__
+        init(self, 'formation_id', FORMATION_VOCABULARY.intern(nom_formation))
+        init(self, 'description', description)
+        init(self, 'metiers_prepares_ids', METIER_VOCABULARY.intern_all(metiers_prepares))
+        init(self, 'institutions_ids', INSTITUTION_VOCABULARY.intern_all(institutions_references))
+    
+    @property
+    def nom_formation(self) -> str:
+        return FORMATION_VOCABULARY.lookup_all((self.formation_id,))[0]
+    
+    @property
+    def metiers_prepares(self) -> List[str]:
+        return METIER_VOCABULARY.lookup_all(self.metiers_prepares_ids)
+    
+    @property
+    def institutions_references(self) -> List[str]:
+        return INSTITUTION_VOCABULARY.lookup_all(self.institutions_ids)
 
 class KnowledgeBaseManager:
     """
     Gestionnaire de la base de connaissances sur le marché du travail béninois.
     """
     
+    # Score minimum pour qu'une recherche approximative soit retenue
+    FUZZY_MIN_SCORE = 0.15
+    
+    # Instantané compilé (données + index prêts à l'emploi)
+    SNAPSHOT_MAGIC = b"KBSNAP\n"
+    SNAPSHOT_FORMAT_VERSION = 3
+    SNAPSHOT_SUFFIX = ".kbsnap"
+    _SNAPSHOT_ATTRIBUTES = ['metiers', 'secteurs', 'competences', 'formations',
+                            'metier_index', 'similarity_index', 'secteur_index',
+                            'formation_metier_index']
+    
     def __init__(self):
         self.metiers: Dict[str, Metier] = {}
         self.secteurs: Dict[str, Secteur] = {}
         self.competences: Dict[str, Competence] = {}
         self.formations: Dict[str, Formation] = {}
         self.is_loaded = False
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """
+        Construit les index inversés (mots et trigrammes, sans accents) utilisés
+        par les recherches de métiers, de secteurs et de formations.
+        """
+        self.metier_index = NameIndex()
+        self.similarity_index = SimilarityIndex()
+        for metier in self.metiers.values():
+            self.metier_index.add(metier.nom_metier, metier)
+            self.similarity_index.add(metier)
+        
+        self.secteur_index = NameIndex()
+        for secteur in self.secteurs.values():
+            self.secteur_index.add(secteur.nom_secteur, secteur)
+        
+        # Une entrée par métier préparé, associée à la formation correspondante
+        self.formation_metier_index = NameIndex()
+        for formation in self.formations.values():
+            for metier_prepare in formation.metiers_prepares:
+                self.formation_metier_index.add(metier_prepare, formation)
     
-    def load_knowledge_base(self, file_path: str) -> bool:
+    def load_knowledge_base(self, file_path: str, use_snapshot: bool = True) -> bool:
         """
         Charge la base de connaissances depuis un fichier JSON.
         
+        Si un instantané compilé à jour existe à côté du fichier JSON, il est
+        chargé directement; sinon le JSON est analysé. L'instantané n'est jamais
+        écrit ici (déploiements en lecture seule): il est compilé par
+        « python knowledge_base_manager.py chemin.json ».
+        
         Args:
             file_path: Chemin vers le fichier JSON
+            use_snapshot: Utiliser l'instantané compilé s'il est à jour
             
         Returns:
             bool: True si le chargement est réussi
@@ -70,6 +293,9 @@ class KnowledgeBaseManager:
                 logger.error(f"Fichier de base de connaissances non trouvé: {file_path}")
                 return False
             
+            if use_snapshot and self.load_snapshot(self.get_snapshot_path(file_path), file_path):
+                return True
+            
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
@@ -97,6 +323,7 @@ class KnowledgeBaseManager:
                     formation = Formation(**form_data)
                     self.formations[formation.nom_formation.lower()] = formation
             
+            self._build_indexes()
             self.is_loaded = True
             logger.info(f"Base de connaissances chargée: {len(self.metiers)} métiers, "
                        f"{len(self.secteurs)} secteurs, {len(self.competences)} compétences, "
@@ -108,6 +335,124 @@ class KnowledgeBaseManager:
             logger.error(f"Erreur lors du chargement de la base de connaissances: {str(e)}")
             return False
     
+    @classmethod
+    def get_snapshot_path(cls, file_path: str) -> str:
+        """
+        Retourne le chemin de l'instantané compilé associé à un fichier JSON.
+        
+        Args:
+            file_path: Chemin vers le fichier JSON
+            
+        Returns:
+            str: Chemin de l'instantané
+        """
+        return str(Path(file_path).with_suffix(cls.SNAPSHOT_SUFFIX))
+    
+    @staticmethod
+    def _source_fingerprint(file_path: str) -> Dict[str, int]:
+        """Empreinte (date de modification, taille) du fichier JSON source."""
+        stat = os.stat(file_path)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    
+    def save_snapshot(self, snapshot_path: str, source_path: str) -> bool:
+        """
+        Écrit un instantané compilé (pickle protocole 5) des données et des index.
+        
+        Le fichier commence par une ligne d'en-tête JSON (version du format et
+        empreinte du JSON source) qui permet de vérifier sa fraîcheur sans le décoder.
+        
+        Args:
+            snapshot_path: Chemin de l'instantané à écrire
+            source_path: Chemin du fichier JSON source
+            
+        Returns:
+            bool: True si l'écriture est réussie
+        """
+        try:
+            header = {
+                'format_version': self.SNAPSHOT_FORMAT_VERSION,
+                'source': self._source_fingerprint(source_path)
+            }
+            state = {name: getattr(self, name) for name in self._SNAPSHOT_ATTRIBUTES}
+            
+            # Écriture atomique: les lecteurs ne voient jamais un fichier partiel
+            tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.SNAPSHOT_MAGIC)
+                f.write(json.dumps(header).encode('utf-8') + b"\n")
+                pickle.dump(state, f, protocol=5)
+            os.replace(tmp_path, snapshot_path)
+            
+            logger.info(f"Instantané de la base de connaissances écrit: {snapshot_path}")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire l'instantané de la base de connaissances: {str(e)}")
+            return False
+    
+    def load_snapshot(self, snapshot_path: str, source_path: Optional[str] = None) -> bool:
+        """
+        Charge un instantané compilé s'il est valide et à jour.
+        
+        Args:
+            snapshot_path: Chemin de l'instantané
+            source_path: Chemin du JSON source (None pour ne pas vérifier la fraîcheur)
+            
+        Returns:
+            bool: True si l'instantané a été chargé
+        """
+        if not Path(snapshot_path).exists():
+            return False
+        
+        try:
+            with open(snapshot_path, 'rb') as f:
+                if f.readline() != self.SNAPSHOT_MAGIC:
+                    logger.warning(f"Instantané invalide ignoré: {snapshot_path}")
+                    return False
+                
+                # L'en-tête est vérifié avant de décoder le reste du fichier
+                header = json.loads(f.readline())
+                
+                if header.get('format_version') != self.SNAPSHOT_FORMAT_VERSION:
+                    logger.info("Instantané d'une version de format différente: ignoré (à recompiler)")
+                    return False
+                if source_path and header.get('source') != self._source_fingerprint(source_path):
+                    logger.info("Instantané plus ancien que le fichier JSON: ignoré (à recompiler)")
+                    return False
+                
+                state = pickle.load(f)
+            
+            for name in self._SNAPSHOT_ATTRIBUTES:
+                setattr(self, name, state[name])
+            self.is_loaded = True
+            
+            logger.info(f"Base de connaissances chargée depuis l'instantané: {len(self.metiers)} métiers, "
+                       f"{len(self.secteurs)} secteurs, {len(self.competences)} compétences, "
+                       f"{len(self.formations)} formations")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Impossible de charger l'instantané de la base de connaissances: {str(e)}")
+            return False
+    
+    def add_metier(self, metier: Metier):
+        """
+        Ajoute un métier à la base de connaissances et met à jour les index.
+        
+        Args:
+            metier: Métier à ajouter
+        """
+        key = metier.nom_metier.lower()
+        replacing = key in self.metiers
+        self.metiers[key] = metier
+        
+        if replacing:
+            # Un métier remplacé invalide ses anciennes entrées: reconstruction complète
+            self._build_indexes()
+        else:
+            self.metier_index.add(metier.nom_metier, metier)
+            self.similarity_index.add(metier)
+    
     def find_metier(self, nom_metier: str) -> Optional[Metier]:
         """
         Recherche un métier par nom (recherche flexible).
@@ -127,18 +472,26 @@ class KnowledgeBaseManager:
         if nom_recherche in self.metiers:
             return self.metiers[nom_recherche]
         
-        # Recherche partielle
-        for nom, metier in self.metiers.items():
-            if nom_recherche in nom or nom in nom_recherche:
-                return metier
+        # Recherche approximative via l'index (meilleur candidat)
+        candidates = self.find_metier_candidates(nom_metier, max_results=1)
+        return candidates[0][0] if candidates else None
+    
+    def find_metier_candidates(self, nom_metier: str, max_results: int = 5) -> List[Tuple[Metier, float]]:
+        """
+        Recherche les métiers les plus proches d'un nom, classés par score.
         
-        # Recherche par mots-clés
-        mots_recherche = nom_recherche.split()
-        for nom, metier in self.metiers.items():
-            if any(mot in nom for mot in mots_recherche):
-                return metier
+        Args:
+            nom_metier: Nom du métier à rechercher
+            max_results: Nombre maximum de candidats
+            
+        Returns:
+            List[Tuple[Metier, float]]: Métiers et scores de similarité (0 à 1)
+        """
+        if not nom_metier:
+            return []
         
-        return None
+        return self.metier_index.search(nom_metier, max_results=max_results,
+                                        min_score=self.FUZZY_MIN_SCORE)
     
     def find_secteur(self, nom_secteur: str) -> Optional[Secteur]:
         """
@@ -159,12 +512,10 @@ class KnowledgeBaseManager:
         if nom_recherche in self.secteurs:
             return self.secteurs[nom_recherche]
         
-        # Recherche partielle
-        for nom, secteur in self.secteurs.items():
-            if nom_recherche in nom or nom in nom_recherche:
-                return secteur
-        
-        return None
+        # Recherche approximative via l'index
+        candidates = self.secteur_index.search(nom_secteur, max_results=1,
+                                               min_score=self.FUZZY_MIN_SCORE)
+        return candidates[0][0] if candidates else None
     
     def get_metiers_by_secteur(self, nom_secteur: str) -> List[Metier]:
         """
@@ -219,35 +570,7 @@ class KnowledgeBaseManager:
         Returns:
             List[Metier]: Liste des métiers similaires
         """
-        metiers_similaires = []
-        
-        for metier in self.metiers.values():
-            if metier.nom_metier == metier_reference.nom_metier:
-                continue
-            
-            score_similarite = 0
-            
-            # Score basé sur le secteur
-            if metier.secteur_activite.lower() == metier_reference.secteur_activite.lower():
-                score_similarite += 3
-            
-            # Score basé sur les compétences techniques communes
-            competences_communes = set(metier.competences_requises_techniques) & \
-                                 set(metier_reference.competences_requises_techniques)
-            score_similarite += len(competences_communes)
-            
-            # Score basé sur les compétences transversales communes
-            competences_trans_communes = set(metier.competences_requises_transversales) & \
-                                       set(metier_reference.competences_requises_transversales)
-            score_similarite += len(competences_trans_communes) * 0.5
-            
-            if score_similarite > 0:
-                metiers_similaires.append((metier, score_similarite))
-        
-        # Trier par score de similarité décroissant
-        metiers_similaires.sort(key=lambda x: x[1], reverse=True)
-        
-        return [metier for metier, _ in metiers_similaires[:max_results]]
+        return self.similarity_index.find_similar(metier_reference, max_results=max_results)
     
     def get_formations_for_metier(self, nom_metier: str) -> List[Formation]:
         """
@@ -260,10 +583,12 @@ class KnowledgeBaseManager:
             List[Formation]: Liste des formations pertinentes
         """
         formations_pertinentes = []
+        formations_vues = set()
         
-        for formation in self.formations.values():
-            if any(nom_metier.lower() in metier_prepare.lower() 
-                   for metier_prepare in formation.metiers_prepares):
+        # Formations dont un métier préparé contient le nom recherché
+        for formation in self.formation_metier_index.find_containing(nom_metier):
+            if id(formation) not in formations_vues:
+                formations_vues.add(id(formation))
                 formations_pertinentes.append(formation)
         
         return formations_pertinentes
@@ -436,4 +761,93 @@ class KnowledgeBaseManager:
             if not secteur.metiers_associes:
                 validation_report['warnings'].append(f"Secteur '{nom}' sans métiers associés")
         
-        return validation_report 
\ No newline at end of file
+        return validation_report 
+
+class SharedKnowledgeBase:
+    """
+    Base de connaissances partagée en lecture seule par toutes les sessions du processus.
+    
+    Le fichier source est surveillé (date de modification et taille); lorsqu'il
+    change, une nouvelle instance est chargée puis substituée atomiquement à
+    l'ancienne. Les recommandations en cours conservent la référence qu'elles
+    ont obtenue et ne sont jamais bloquées par un rechargement.
+    """
+    
+    def __init__(self, file_path: str, check_interval: float = 2.0):
+        self.file_path = file_path
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self._kb_manager: Optional[KnowledgeBaseManager] = None
+        self._fingerprint: Optional[Dict[str, int]] = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+    
+    def get(self) -> Optional[KnowledgeBaseManager]:
+        """
+        Retourne la base de connaissances courante, rechargée si le fichier a changé.
+        
+        Returns:
+            Optional[KnowledgeBaseManager]: Base chargée ou None si indisponible
+        """
+        if self._kb_manager is None or time.monotonic() - self._last_check >= self.check_interval:
+            # Un seul rechargement à la fois; les autres lecteurs gardent la version courante
+            blocking = self._kb_manager is None
+            if self._reload_lock.acquire(blocking=blocking):
+                try:
+                    self._reload_if_changed()
+                finally:
+                    self._reload_lock.release()
+        
+        return self._kb_manager
+    
+    def _reload_if_changed(self):
+        """Recharge la base si l'empreinte du fichier source a changé."""
+        self._last_check = time.monotonic()
+        
+        try:
+            fingerprint = KnowledgeBaseManager._source_fingerprint(self.file_path)
+        except OSError:
+            logger.error(f"Fichier de base de connaissances non trouvé: {self.file_path}")
+            return
+        
+        if self._kb_manager is not None and fingerprint == self._fingerprint:
+            return
+        
+        kb_manager = KnowledgeBaseManager()
+        if not kb_manager.load_knowledge_base(self.file_path):
+            logger.warning("Rechargement de la base de connaissances échoué: conservation de la version courante")
+            return
+        
+        # Substitution atomique de la référence
+        self._kb_manager = kb_manager
+        self._fingerprint = fingerprint
+        self.version = f"{fingerprint['mtime_ns']}-{fingerprint['size']}"
+        logger.info(f"Base de connaissances partagée (re)chargée, version {self.version}")
+
+_shared_knowledge_bases: Dict[str, SharedKnowledgeBase] = {}
+_shared_knowledge_bases_lock = threading.Lock()
+
+def get_shared_knowledge_base(file_path: str) -> SharedKnowledgeBase:
+    """
+    Retourne l'instance partagée (unique par processus) associée à un fichier.
+    
+    Args:
+        file_path: Chemin vers le fichier JSON
+        
+    Returns:
+        SharedKnowledgeBase: Base de connaissances partagée
+    """
+    key = os.path.abspath(file_path)
+    with _shared_knowledge_bases_lock:
+        if key not in _shared_knowledge_bases:
+            _shared_knowledge_bases[key] = SharedKnowledgeBase(file_path)
+        return _shared_knowledge_bases[key]
+
+if __name__ == "__main__":
+    # Compilation de l'instantané: python knowledge_base_manager.py [chemin.json]
+    kb_file = sys.argv[1] if len(sys.argv) > 1 else "knowledge_base_benin.json"
+    kb_manager = KnowledgeBaseManager()
+    if not kb_manager.load_knowledge_base(kb_file, use_snapshot=False):
+        sys.exit(1)
+    if not kb_manager.save_snapshot(KnowledgeBaseManager.get_snapshot_path(kb_file), kb_file):
+        sys.exit(1)
@@ -0,0 +1,210 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import logging
+
+from config import Config
+from rate_limiter import is_retryable_status
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ModelStats:
+    """Santé et performances observées d'un modèle."""
+    name: str
+    position: int
+    input_price: Optional[float] = None
+    output_price: Optional[float] = None
+    latency_ewma: Optional[float] = None
+    error_ewma: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    used_tokens: int = 0
+    cooldown_until: float = 0.0
+    
+    def estimate_cost(self, prompt_tokens: int, max_tokens: int) -> Optional[float]:
+        """Coût maximal d'un appel en dollars, ou None si le prix du modèle est inconnu."""
+        if self.input_price is None or self.output_price is None:
+            return None
+        return (prompt_tokens * self.input_price + max_tokens * self.output_price) / 1_000_000
+
+class ModelRouter:
+    """
+    Choisit le modèle de chaque appel parmi une liste ordonnée (le premier est
+    le modèle principal).
+    
+    Pour chaque modèle, la latence des appels réussis et le taux d'échec
+    (5xx, 429, erreurs réseau) sont suivis en moyenne mobile exponentielle.
+    Un modèle dont le taux d'échec dépasse le seuil est mis à l'écart pendant
+    ROUTER_COOLDOWN secondes, puis réessayé. Parmi les modèles disponibles et
+    sous le plafond de coût, le plus rapide est choisi; un modèle placé plus
+    loin dans la liste doit être nettement plus rapide pour être préféré.
+    """
+    
+    def __init__(self, models: List[str],
+                 prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_cost_per_request: float = Config.MAX_COST_PER_REQUEST,
+                 alpha: float = Config.ROUTER_EWMA_ALPHA,
+                 error_threshold: float = Config.ROUTER_ERROR_THRESHOLD,
+                 cooldown: float = Config.ROUTER_COOLDOWN,
+                 order_penalty: float = Config.ROUTER_ORDER_PENALTY):
+        if not models:
+            raise ValueError("Au moins un modèle est nécessaire")
+        prices = Config.MODEL_PRICES if prices is None else prices
+        self.models: Dict[str, ModelStats] = {}
+        for name in models:
+            if name not in self.models:
+                input_price, output_price = prices.get(name, (None, None))
+                self.models[name] = ModelStats(name, len(self.models), input_price, output_price)
+        self.max_cost_per_request = max_cost_per_request
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.order_penalty = order_penalty
+        self._lock = threading.Lock()
+        
+        if max_cost_per_request > 0:
+            unpriced = [name for name, stats in self.models.items() if stats.input_price is None]
+            if unpriced:
+                logger.warning(f"Prix inconnu (plafond de coût non appliqué): {', '.join(unpriced)}")
+    
+    @property
+    def primary_model(self) -> str:
+        return next(iter(self.models))
+    
+    @property
+    def can_fail_over(self) -> bool:
+        """True si un autre modèle peut prendre le relais d'un modèle en panne."""
+        return len(self.models) > 1
+    
+    def choose(self, prompt_tokens: int = 0, max_tokens: int = 0, exclude: Iterable[str] = ()) -> str:
+        """
+        Choisit le modèle d'un appel.
+        
+        Args:
+            prompt_tokens: Tokens estimés du prompt
+            max_tokens: Taille maximale de la réponse
+            exclude: Modèles déjà en échec pour cet appel (évités s'il reste une autre possibilité)
+            
+        Returns:
+            str: Nom du modèle
+            
+        Raises:
+            ValueError: Si aucun modèle ne respecte le plafond de coût
+        """
+        exclude = set(exclude)
+        with self._lock:
+            now = time.monotonic()
+            affordable = [stats for stats in self.models.values()
+                          if self._within_budget(stats, prompt_tokens, max_tokens)]
+            if not affordable:
+                raise ValueError(f"Aucun modèle sous le plafond de coût ({self.max_cost_per_request}$ par appel)")
+            candidates = [stats for stats in affordable if stats.name not in exclude] or affordable
+            
+            available = [stats for stats in candidates if stats.cooldown_until <= now]
+            if not available:
+                # Tous à l'écart: celui dont la mise à l'écart se termine le plus tôt
+                return min(candidates, key=lambda stats: stats.cooldown_until).name
+            return min(available, key=self._rank).name
+    
+    def _within_budget(self, stats: ModelStats, prompt_tokens: int, max_tokens: int) -> bool:
+        if self.max_cost_per_request <= 0:
+            return True
+        cost = stats.estimate_cost(prompt_tokens, max_tokens)
+        return cost is None or cost <= self.max_cost_per_request
+    
+    def _rank(self, stats: ModelStats) -> Tuple[bool, float, int]:
+        """Modèles de latence connue d'abord, du plus rapide au plus lent (pénalité selon le rang), puis dans l'ordre."""
+        if stats.latency_ewma is None:
+            return True, 0.0, stats.position
+        return False, stats.latency_ewma * (1 + self.order_penalty * stats.position), stats.position
+    
+    def record_success(self, model: str, latency: float, used_tokens: Optional[int] = None):
+        """
+        Enregistre un appel réussi.
+        
+        Args:
+            model: Modèle interrogé
+            latency: Durée de l'appel en secondes
+            used_tokens: Tokens consommés (champ usage de la réponse)
+        """
+        with self._lock:
+            stats = self.models.get(model)
+            if stats is None:
+                return
+            stats.requests += 1
+            stats.used_tokens += used_tokens or 0
+            stats.latency_ewma = latency if stats.latency_ewma is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.latency_ewma)
+            stats.error_ewma *= 1 - self.alpha
+            if stats.cooldown_until and stats.error_ewma < self.error_threshold:
+                stats.cooldown_until = 0.0
+                logger.info(f"Modèle {model} de nouveau disponible")
+    
+    def record_failure(self, model: str, status_code: Optional[int] = None):
+        """
+        Enregistre un échec d'appel (surcharge, erreur serveur ou réseau; les
+        autres refus, comme une clé invalide, ne concernent pas le modèle).
+        
+        Args:
+            model: Modèle interrogé
+            status_code: Code HTTP de la réponse, ou None pour une erreur réseau
+        """
+        if status_code is not None and not is_retryable_status(status_code):
+            return
+        with self._lock:
+            stats = self.models.get(model)
+            if stats is None:
+                return
+            stats.requests += 1
+            stats.failures += 1
+            stats.error_ewma = self.alpha + (1 - self.alpha) * stats.error_ewma
+            if stats.error_ewma >= self.error_threshold:
+                if stats.cooldown_until <= time.monotonic() and self.can_fail_over:
+                    logger.warning(f"Modèle {model} dégradé (taux d'échec {stats.error_ewma:.0%}): "
+                                   f"mis à l'écart {self.cooldown:.0f}s")
+                stats.cooldown_until = time.monotonic() + self.cooldown
+    
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Retourne l'état des modèles, dans l'ordre de préférence.
+        
+        Returns:
+            List[Dict[str, Any]]: Latence, taux d'échec, disponibilité et consommation par modèle
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'model': stats.name,
+                    'available': stats.cooldown_until <= now,
+                    'latency_ewma': round(stats.latency_ewma, 3) if stats.latency_ewma is not None else None,
+                    'error_rate': round(stats.error_ewma, 3),
+                    'requests': stats.requests,
+                    'failures': stats.failures,
+                    'used_tokens': stats.used_tokens
+                }
+                for stats in self.models.values()
+            ]
+
+# Un seul routeur par processus: la santé des modèles est partagée par toutes les sessions
+_shared_model_router: Optional[ModelRouter] = None
+_shared_lock = threading.Lock()
+
+def get_shared_model_router() -> ModelRouter:
+    """
+    Retourne le routeur partagé du processus, construit depuis Config.get_model_config().
+    
+    Returns:
+        ModelRouter: Routeur partagé
+    """
+    global _shared_model_router
+    with _shared_lock:
+        if _shared_model_router is None:
+            model_config = Config.get_model_config()
+            _shared_model_router = ModelRouter([model_config['model']] + model_config['fallback_models'],
+                                               max_cost_per_request=model_config['max_cost_per_request'])
+        return _shared_model_router
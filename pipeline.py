@@ -0,0 +1,144 @@
+import dataclasses
+import json
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+import logging
+
+import pandas as pd
+
+from config import Config
+from job_store import JobStore
+from profile_planner import ProfilePlan, ProfilePlanner
+from recommendation_engine import RecommendationEngine
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def plan_profiles(students_data: List[Dict[str, str]], deduplicate: bool = Config.DEDUPLICATE_PROFILES,
+                  include_region: bool = Config.DEDUPLICATE_INCLUDE_REGION) -> Optional[ProfilePlan]:
+    """
+    Construit le plan de regroupement des profils si le regroupement est activé.
+    
+    Args:
+        students_data: Données des étudiants
+        deduplicate: True pour un seul appel à l'IA par profil distinct
+        include_region: True si le lieu de naissance fait partie du profil
+        
+    Returns:
+        Optional[ProfilePlan]: Plan de regroupement, ou None si désactivé
+    """
+    if not deduplicate:
+        return None
+    return ProfilePlanner(include_region=include_region).plan(students_data)
+
+def process_students(students_data: List[Dict[str, str]], rec_engine: RecommendationEngine,
+                     plan: Optional[ProfilePlan] = None,
+                     max_concurrency: Optional[int] = None,
+                     job_store: Optional[JobStore] = None,
+                     job_id: Optional[str] = None,
+                     first_index: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Analyse les étudiants et génère leurs recommandations (analyse du profil,
+    appel à l'IA, structuration), dans l'ordre d'achèvement.
+    
+    Avec un journal des traitements, chaque résultat est enregistré dès qu'il est
+    prêt; les étudiants déjà traités lors d'une exécution précédente sont renvoyés
+    en premier sans nouvel appel à l'IA, et seuls les autres (absents ou en erreur)
+    sont traités.
+    
+    Un fichier volumineux peut être traité par blocs successifs: first_index
+    situe alors le bloc dans le fichier (indices renvoyés et lignes du journal).
+    
+    Args:
+        students_data: Données des étudiants
+        rec_engine: Moteur de recommandation
+        plan: Plan de regroupement des profils
+        max_concurrency: Nombre maximum d'appels simultanés
+        job_store: Journal des traitements (reprise après interruption)
+        job_id: Identifiant du traitement dans le journal (empreinte du fichier)
+        first_index: Indice, dans le fichier, du premier étudiant de students_data
+        
+    Yields:
+        Tuple[int, Dict[str, Any]]: Indice de l'étudiant et résultat {'student', 'recommendation'}
+    """
+    pending_indices = list(range(first_index, first_index + len(students_data)))
+    
+    if job_store is not None and job_id:
+        completed = job_store.get_completed(job_id, first_index, first_index + len(students_data))
+        pending_indices = []
+        for index, student in enumerate(students_data, start=first_index):
+            item = completed.get(index)
+            # Un résultat n'est repris que s'il correspond toujours au même étudiant
+            if item is not None and item['student'] == student:
+                yield index, item
+            else:
+                pending_indices.append(index)
+        
+        if len(pending_indices) < len(students_data):
+            logger.info(f"Reprise du traitement {job_id[:12]}: {len(students_data) - len(pending_indices)} "
+                        f"étudiants déjà traités, {len(pending_indices)} restants")
+    
+    if not pending_indices:
+        return
+    
+    pending_students = [students_data[index - first_index] for index in pending_indices]
+    if plan is not None and len(pending_students) < len(students_data):
+        # Le regroupement ne porte plus que sur les étudiants restants
+        plan = ProfilePlanner(include_region=plan.include_region).plan(pending_students)
+    
+    for position, recommendation in rec_engine.generate_recommendations_batch(
+            pending_students, max_concurrency=max_concurrency, plan=plan):
+        index = pending_indices[position]
+        item = {
+            'student': students_data[index - first_index],
+            'recommendation': recommendation
+        }
+        if job_store is not None and job_id:
+            job_store.record_result(job_id, index, item, json_default=json_default)
+        yield index, item
+
+def json_default(value: Any) -> Any:
+    """
+    Sérialise les objets non JSON des résultats (métiers, formations... de la
+    base de connaissances) pour json.dump(s).
+    
+    Args:
+        value: Objet à sérialiser
+        
+    Returns:
+        Any: Représentation compatible JSON
+    """
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+def build_export_data(processed_students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Construit le rapport exporté (même format que l'export de l'application).
+    
+    Args:
+        processed_students: Résultats {'student', 'recommendation'} des étudiants
+        
+    Returns:
+        Dict[str, Any]: Rapport d'analyse
+    """
+    return {
+        'students_analysis': processed_students,
+        'generated_at': pd.Timestamp.now().isoformat()
+    }
+
+def dumps_export_data(export_data: Dict[str, Any]) -> str:
+    """
+    Sérialise un rapport en JSON lisible.
+    
+    Args:
+        export_data: Rapport d'analyse
+        
+    Returns:
+        str: Rapport JSON
+    """
+    return json.dumps(export_data, ensure_ascii=False, indent=2, default=json_default)
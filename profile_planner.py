@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Tuple
+import logging
+
+from text_utils import normalize_text
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marqueurs substitués aux champs personnels dans le prompt d'un groupe
+NOM_PLACEHOLDER = "[NOM]"
+PRENOM_PLACEHOLDER = "[PRÉNOM]"
+LIEU_PLACEHOLDER = "[LIEU DE NAISSANCE]"
+
+# Champs textuels de la recommandation à personnaliser
+PERSONALIZED_FIELDS = ['full_recommendation', 'analysis', 'adequacy_level',
+                       'alternative_careers', 'personalized_path']
+
+@dataclass
+class ProfileGroup:
+    """Groupe d'étudiants partageant le même profil d'orientation."""
+    key: Tuple[str, ...]
+    representative_index: int
+    member_indices: List[int] = field(default_factory=list)
+
+@dataclass
+class ProfilePlan:
+    """Plan d'exécution: un appel à l'IA par profil distinct."""
+    groups: List[ProfileGroup]
+    total_students: int
+    include_region: bool = False
+    
+    @property
+    def distinct_profiles(self) -> int:
+        return len(self.groups)
+    
+    @property
+    def calls_saved(self) -> int:
+        return self.total_students - self.distinct_profiles
+    
+    @property
+    def collapse_ratio(self) -> float:
+        """Part des appels à l'IA évités grâce au regroupement (0 à 1)."""
+        if not self.total_students:
+            return 0.0
+        return self.calls_saved / self.total_students
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Résume le plan pour l'affichage ou la journalisation.
+        
+        Returns:
+            Dict[str, Any]: Nombre d'étudiants, de profils et taux de regroupement
+        """
+        return {
+            'total_students': self.total_students,
+            'distinct_profiles': self.distinct_profiles,
+            'calls_saved': self.calls_saved,
+            'collapse_ratio': self.collapse_ratio,
+            'include_region': self.include_region
+        }
+
+class ProfilePlanner:
+    """
+    Regroupe les étudiants par profil normalisé (filière, carrière envisagée et,
+    optionnellement, lieu de naissance) avant l'appel à l'IA.
+    """
+    
+    def __init__(self, include_region: bool = False):
+        self.include_region = include_region
+    
+    def profile_key(self, student_data: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Calcule la clé de profil d'un étudiant (sans accents ni casse).
+        
+        Args:
+            student_data: Données de l'étudiant
+            
+        Returns:
+            Tuple[str, ...]: Clé de regroupement
+        """
+        key = (
+            normalize_text(student_data.get('Filière Actuelle', '')),
+            normalize_text(student_data.get('Carrière Envisagée', ''))
+        )
+        if self.include_region:
+            key += (normalize_text(student_data.get('Lieu de Naissance', '')),)
+        return key
+    
+    def plan(self, students: List[Dict[str, str]]) -> ProfilePlan:
+        """
+        Construit le plan de regroupement d'une liste d'étudiants.
+        
+        Args:
+            students: Données des étudiants
+            
+        Returns:
+            ProfilePlan: Groupes de profils, dans l'ordre de première apparition
+        """
+        groups: Dict[Tuple[str, ...], ProfileGroup] = {}
+        for index, student in enumerate(students):
+            key = self.profile_key(student)
+            group = groups.get(key)
+            if group is None:
+                group = ProfileGroup(key=key, representative_index=index)
+                groups[key] = group
+            group.member_indices.append(index)
+        
+        plan = ProfilePlan(
+            groups=list(groups.values()),
+            total_students=len(students),
+            include_region=self.include_region
+        )
+        logger.info(f"Plan de regroupement: {plan.total_students} étudiants, "
+                    f"{plan.distinct_profiles} profils distincts "
+                    f"({plan.collapse_ratio:.0%} d'appels évités)")
+        return plan
+
+def build_group_student(student_data: Dict[str, str], include_region: bool = False) -> Dict[str, str]:
+    """
+    Construit les données anonymisées envoyées à l'IA pour un groupe de profils.
+    
+    Args:
+        student_data: Données de l'étudiant représentant le groupe
+        include_region: True si le lieu de naissance fait partie du profil
+        
+    Returns:
+        Dict[str, str]: Données avec les champs personnels remplacés par des marqueurs
+    """
+    group_student = dict(student_data)
+    group_student['Nom'] = NOM_PLACEHOLDER
+    group_student['Prénom'] = PRENOM_PLACEHOLDER
+    if not include_region:
+        group_student['Lieu de Naissance'] = LIEU_PLACEHOLDER
+    return group_student
+
+def personalize_recommendation(recommendation: Dict[str, Any], student_data: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Adapte la recommandation d'un groupe à un étudiant en remplaçant les marqueurs.
+    
+    Args:
+        recommendation: Recommandation générée pour le groupe
+        student_data: Données de l'étudiant
+        
+    Returns:
+        Dict[str, Any]: Copie personnalisée de la recommandation
+    """
+    replacements = {
+        NOM_PLACEHOLDER: student_data.get('Nom', '') or 'N/A',
+        PRENOM_PLACEHOLDER: student_data.get('Prénom', '') or 'N/A',
+        LIEU_PLACEHOLDER: student_data.get('Lieu de Naissance', '') or 'N/A'
+    }
+    
+    personalized = dict(recommendation)
+    for field_name in PERSONALIZED_FIELDS:
+        value = personalized.get(field_name)
+        if isinstance(value, str):
+            for placeholder, replacement in replacements.items():
+                value = value.replace(placeholder, replacement)
+            personalized[field_name] = value
+    
+    if isinstance(personalized.get('metadata'), dict):
+        personalized['metadata'] = dict(personalized['metadata'], shared_profile=True)
+    
+    return personalized
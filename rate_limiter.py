@@ -0,0 +1,519 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from config import Config
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Le fournisseur reste indisponible au-delà de l'échéance de l'appel: il est refusé sans être envoyé."""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interprète l'en-tête Retry-After (secondes ou date HTTP).
+    
+    Args:
+        value: Valeur de l'en-tête
+        
+    Returns:
+        Optional[float]: Délai d'attente en secondes, ou None si absent ou illisible
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable_status(status_code: int) -> bool:
+    """
+    Indique si une réponse HTTP en erreur justifie une nouvelle tentative.
+    
+    Args:
+        status_code: Code HTTP de la réponse
+        
+    Returns:
+        bool: True pour les surcharges et erreurs serveur (408, 409, 425, 429, 5xx)
+    """
+    return status_code >= 500 or status_code in (408, 409, 425, 429)
+
+class TokenBucket:
+    """
+    Seau à jetons réapprovisionné en continu (débit par minute).
+    
+    Les réservations peuvent rendre le solde négatif: chaque appelant obtient
+    immédiatement le délai à respecter avant d'envoyer sa requête, ce qui étale
+    les envois sans bloquer sous le verrou.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def reserve(self, amount: float, now: Optional[float] = None) -> float:
+        """
+        Réserve des jetons.
+        
+        Args:
+            amount: Nombre de jetons consommés
+            now: Instant courant (time.monotonic)
+            
+        Returns:
+            float: Délai en secondes avant que la réservation soit couverte
+        """
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def adjust(self, amount: float):
+        """Corrige une réservation (positif: consommation supplémentaire, négatif: restitution)."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+class CircuitBreaker:
+    """
+    Disjoncteur: après `failure_threshold` échecs consécutifs, les appels sont
+    suspendus pendant `reset_timeout` secondes, puis un appel de test est autorisé.
+    Les autres appels attendent son résultat; un test resté sans réponse au bout
+    de `probe_timeout` secondes (appel annulé) est remplacé par un nouveau.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float, probe_timeout: Optional[float] = None):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout if probe_timeout is not None else reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+    
+    def admit(self, now: float) -> float:
+        """
+        Autorise l'envoi d'un appel, ou indique combien de temps attendre.
+        
+        Args:
+            now: Instant courant (time.monotonic)
+            
+        Returns:
+            float: 0 si l'appel peut être envoyé (il devient l'appel de test après
+            une pause), sinon le délai en secondes avant de redemander
+        """
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.reset_timeout - now
+            if remaining > 0:
+                return remaining
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                remaining = self._probe_started_at + self.probe_timeout - now
+                if remaining > 0:
+                    return remaining
+            self._probe_in_flight = True
+            self._probe_started_at = now
+        return 0.0
+    
+    def release_probe(self):
+        """Libère l'appel de test sans conclure (service joignable mais réponse non probante)."""
+        self._probe_in_flight = False
+    
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self, now: float):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Disjoncteur ouvert après {self.consecutive_failures} échec(s) consécutif(s), "
+                               f"pause de {self.reset_timeout:.0f}s")
+            self.state = self.OPEN
+            self.opened_at = now
+
+def _wake(waiter: asyncio.Future):
+    """Complète la future d'une coroutine en attente (dans sa boucle d'événements)."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+class RateLimiter:
+    """
+    Ordonnanceur partagé des appels à l'API.
+    
+    Combine:
+    - deux seaux à jetons (requêtes par minute et tokens par minute);
+    - une limite de concurrence adaptative AIMD: +1 appel simultané par
+      « fenêtre » de succès, division par deux sur 429 / 5xx;
+    - un disjoncteur sur les pannes répétées (5xx, erreurs réseau);
+    - un délai de nouvelle tentative exponentiel avec gigue, qui respecte Retry-After.
+    
+    Pendant une pause du disjoncteur, les appels attendent sa réouverture
+    plutôt que d'échouer; ils ne sont refusés que si l'attente dépasse leur
+    échéance.
+    
+    acquire()/release() sont destinés aux threads; acquire_async() en est la
+    version pour les coroutines, réveillée à chaque libération de place sans
+    bloquer la boucle d'événements.
+    """
+    
+    # Codes HTTP signalant une surcharge du fournisseur
+    THROTTLE_STATUS_CODES = (429, 503)
+    
+    def __init__(self, requests_per_minute: float = Config.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = Config.RATE_LIMIT_TOKENS_PER_MINUTE,
+                 initial_concurrency: int = Config.MAX_CONCURRENCY,
+                 max_concurrency: int = Config.RATE_LIMIT_MAX_CONCURRENCY,
+                 min_concurrency: int = 1,
+                 backoff_base: float = Config.RETRY_DELAY,
+                 backoff_max: float = Config.BACKOFF_MAX_DELAY,
+                 failure_threshold: int = Config.CIRCUIT_BREAKER_THRESHOLD,
+                 reset_timeout: float = Config.CIRCUIT_BREAKER_RESET_TIMEOUT):
+        # Un débit nul ou négatif désactive le seau correspondant
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.concurrency_limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        
+        self.in_flight = 0
+        self.total_requests = 0
+        self.throttled = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        # Coroutines en attente d'une place: (boucle d'événements, future à compléter)
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+    
+    def estimate_tokens(self, text: str, max_tokens: int) -> int:
+        """
+        Estime les tokens d'une requête (environ 4 caractères par token, plus la réponse maximale).
+        
+        Args:
+            text: Texte envoyé (prompt système et utilisateur)
+            max_tokens: Taille maximale de la réponse
+            
+        Returns:
+            int: Estimation du nombre de tokens
+        """
+        return len(text) // 4 + max_tokens
+    
+    def reserve(self, estimated_tokens: int = 0) -> float:
+        """
+        Réserve le débit d'une requête, sans bloquer.
+        
+        Args:
+            estimated_tokens: Tokens estimés de la requête
+            
+        Returns:
+            float: Délai en secondes à attendre avant d'envoyer la requête
+        """
+        with self._condition:
+            now = time.monotonic()
+            delay = 0.0
+            if self.request_bucket is not None:
+                delay = max(delay, self.request_bucket.reserve(1, now))
+            if self.token_bucket is not None and estimated_tokens:
+                delay = max(delay, self.token_bucket.reserve(estimated_tokens, now))
+            self.total_requests += 1
+            self.total_wait += delay
+            return delay
+    
+    def _try_admit(self, deadline: Optional[float]) -> Tuple[bool, Optional[float]]:
+        """
+        Prend une place si la limite de concurrence et le disjoncteur le
+        permettent (appelé sous le verrou).
+        
+        Args:
+            deadline: Échéance de l'appel (time.monotonic), None pour aucune
+            
+        Returns:
+            Tuple[bool, Optional[float]]: Place prise, sinon attente maximale avant
+            de réessayer (None: jusqu'à la libération d'une place)
+            
+        Raises:
+            CircuitOpenError: Si le disjoncteur reste en pause au-delà de l'échéance
+            TimeoutError: Si l'échéance est atteinte sans place libre
+        """
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            raise TimeoutError("Aucune place d'appel libérée avant l'échéance")
+        if self.in_flight >= int(self.concurrency_limit):
+            return False, None if deadline is None else deadline - now
+        
+        wait = self.breaker.admit(now)
+        if wait > 0:
+            if deadline is not None and now + wait > deadline:
+                raise CircuitOpenError(f"Service IA momentanément indisponible, nouvel essai dans {wait:.0f}s "
+                                       f"(au-delà de l'échéance)")
+            return False, wait
+        self.in_flight += 1
+        return True, None
+    
+    def acquire(self, estimated_tokens: int = 0, deadline: Optional[float] = None) -> float:
+        """
+        Attend une place dans la limite de concurrence et la fin d'une éventuelle
+        pause du disjoncteur, puis le délai de débit.
+        
+        Args:
+            estimated_tokens: Tokens estimés de la requête
+            deadline: Échéance de l'appel (time.monotonic), None pour attendre sans limite
+            
+        Returns:
+            float: Instant d'envoi de la requête (time.monotonic), à transmettre à record_failure()
+            
+        Raises:
+            CircuitOpenError: Si le disjoncteur reste en pause au-delà de l'échéance
+            TimeoutError: Si l'échéance est atteinte sans place libre
+        """
+        with self._condition:
+            while True:
+                acquired, wait = self._try_admit(deadline)
+                if acquired:
+                    break
+                self._condition.wait(wait)
+        delay = self.reserve(estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return time.monotonic()
+    
+    async def acquire_async(self, estimated_tokens: int = 0, deadline: Optional[float] = None) -> float:
+        """
+        Version asynchrone de acquire(): l'attente d'une place, de la fin d'une
+        pause du disjoncteur et du délai de débit ne bloque pas la boucle d'événements.
+        
+        Args:
+            estimated_tokens: Tokens estimés de la requête
+            deadline: Échéance de l'appel (time.monotonic), None pour attendre sans limite
+            
+        Returns:
+            float: Instant d'envoi de la requête (time.monotonic), à transmettre à record_failure()
+            
+        Raises:
+            CircuitOpenError: Si le disjoncteur reste en pause au-delà de l'échéance
+            TimeoutError: Si l'échéance est atteinte sans place libre
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                acquired, wait = self._try_admit(deadline)
+                if acquired:
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            # Réveil à la libération d'une place ou au changement d'état du disjoncteur
+            await asyncio.wait([waiter], timeout=wait)
+        
+        try:
+            delay = self.reserve(estimated_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            # Appel annulé pendant l'attente du débit: la place est rendue
+            self.release()
+            raise
+        return time.monotonic()
+    
+    def release(self):
+        """Libère la place occupée par une requête terminée."""
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._notify_waiters()
+    
+    def _notify_waiters(self):
+        """Réveille les threads et les coroutines en attente (appelé sous le verrou)."""
+        # Tous les appelants: certains attendent une place, d'autres le disjoncteur
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, waiter)
+    
+    @contextmanager
+    def slot(self, estimated_tokens: int = 0, deadline: Optional[float] = None):
+        """Contexte acquire()/release() autour d'une requête (fournit l'instant d'envoi)."""
+        started_at = self.acquire(estimated_tokens, deadline)
+        try:
+            yield started_at
+        finally:
+            self.release()
+    
+    def record_success(self, estimated_tokens: int = 0, used_tokens: Optional[int] = None):
+        """
+        Enregistre une réponse réussie: augmentation additive de la concurrence.
+        
+        Args:
+            estimated_tokens: Tokens réservés pour la requête
+            used_tokens: Tokens réellement consommés (champ usage de la réponse)
+        """
+        with self._condition:
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                # Fin de la pause: les appels en attente peuvent partir
+                self._notify_waiters()
+            self.breaker.record_success()
+            if self.token_bucket is not None and used_tokens is not None:
+                self.token_bucket.adjust(used_tokens - estimated_tokens)
+            # +1 par fenêtre complète de succès, seulement si la limite est réellement atteinte
+            if self.in_flight >= int(self.concurrency_limit) - 1:
+                previous = int(self.concurrency_limit)
+                self.concurrency_limit = min(self.max_concurrency,
+                                             self.concurrency_limit + 1.0 / self.concurrency_limit)
+                if int(self.concurrency_limit) > previous:
+                    self._notify_waiters()
+    
+    def record_failure(self, status_code: Optional[int] = None, started_at: Optional[float] = None,
+                       trip_breaker: bool = True):
+        """
+        Enregistre un échec: diminution multiplicative de la concurrence sur
+        surcharge (429 / 5xx) et comptage pour le disjoncteur (5xx / réseau).
+        
+        Args:
+            status_code: Code HTTP de la réponse, ou None pour une erreur réseau
+            started_at: Instant d'envoi de la requête (valeur retournée par acquire())
+            trip_breaker: False si un autre modèle peut prendre le relais (la panne d'un
+                modèle ne doit pas suspendre tous les appels)
+        """
+        with self._condition:
+            now = time.monotonic()
+            self.failures += 1
+            server_error = status_code is None or status_code >= 500
+            if status_code in self.THROTTLE_STATUS_CODES or server_error:
+                if status_code == 429:
+                    self.throttled += 1
+                # Une seule diminution par rafale: les requêtes envoyées avant la
+                # dernière diminution ne reflètent pas encore la nouvelle limite
+                if started_at is None or started_at >= self._last_decrease:
+                    self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                    self._last_decrease = now
+                    logger.info(f"Limite de concurrence réduite à {int(self.concurrency_limit)} "
+                                f"(réponse {status_code or 'erreur réseau'})")
+            if server_error and trip_breaker:
+                self.breaker.record_failure(now)
+            else:
+                # Un refus pour surcharge prouve que le service répond: ne pas laisser un test en suspens
+                self.breaker.release_probe()
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                # Nouvelle pause ou nouveau test possible: les appels en attente réévaluent leur délai
+                self._notify_waiters()
+    
+    def release_probe(self):
+        """
+        Libère l'appel de test éventuel d'une requête qui n'a rien prouvé sur l'état
+        du service (elle sera renvoyée), pour que les appels en attente ne patientent
+        pas jusqu'à l'expiration du test.
+        """
+        with self._condition:
+            self.breaker.release_probe()
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                self._notify_waiters()
+    
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Délai avant une nouvelle tentative: exponentiel avec gigue complète,
+        jamais inférieur au Retry-After du fournisseur.
+        
+        Args:
+            attempt: Numéro de la tentative échouée (0 pour la première)
+            retry_after: Délai demandé par le fournisseur (secondes)
+            
+        Returns:
+            float: Délai en secondes
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne l'état de l'ordonnanceur.
+        
+        Returns:
+            Dict[str, Any]: Concurrence, refus, état du disjoncteur et attentes cumulées
+        """
+        with self._condition:
+            return {
+                'concurrency_limit': int(self.concurrency_limit),
+                'in_flight': self.in_flight,
+                'total_requests': self.total_requests,
+                'throttled': self.throttled,
+                'failures': self.failures,
+                'circuit_state': self.breaker.state,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'requests_per_minute': self.request_bucket.rate * 60 if self.request_bucket else None,
+                'tokens_per_minute': self.token_bucket.rate * 60 if self.token_bucket else None
+            }
+
+class LatencyTracker:
+    """Latences des derniers appels réussis (fenêtre glissante), pour estimer leurs quantiles."""
+    
+    def __init__(self, window: int = Config.LATENCY_WINDOW, min_samples: int = Config.LATENCY_MIN_SAMPLES):
+        self.min_samples = max(1, min_samples)
+        self._samples = deque(maxlen=max(self.min_samples, window))
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """Enregistre la durée d'un appel réussi."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Retourne un quantile des latences observées.
+        
+        Args:
+            quantile: Quantile entre 0 et 1 (ex. 0.95)
+            
+        Returns:
+            Optional[float]: Latence en secondes, ou None tant que les appels observés sont trop peu nombreux
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+# Un seul ordonnanceur par processus: toutes les sessions partagent le débit du fournisseur
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Retourne l'ordonnanceur partagé du processus (créé au premier appel).
+    
+    Returns:
+        RateLimiter: Ordonnanceur partagé
+    """
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
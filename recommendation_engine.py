@@ -1,26 +1,231 @@
 import json
 import requests
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 import logging
-from knowledge_base_manager import KnowledgeBaseManager, Metier
+from contextlib import contextmanager
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from knowledge_base_manager import KnowledgeBaseManager
+from config import Config
+from response_cache import ResponseCache
+from profile_planner import ProfilePlan, build_group_student, personalize_recommendation
+from section_parser import SectionParser, format_sections
+from json_utils import parse_json_response
+from rate_limiter import RateLimiter, LatencyTracker, get_shared_rate_limiter, is_retryable_status, parse_retry_after
+from model_router import ModelRouter, get_shared_model_router
+import queue
+import threading
 import time
 
+try:
+    import httpx  # Optionnel: nécessaire pour HTTP/2
+except ImportError:
+    httpx = None
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fin d'une réponse en flux lue par le thread de réception
+_STREAM_END = object()
+
+class DeadlineExceededError(Exception):
+    """Le budget de temps accordé à un étudiant est épuisé (plus de nouvelle tentative)."""
+
+@dataclass
+class _Attempt:
+    """Issue d'une tentative d'appel à l'API (partagée par les moteurs synchrone et asynchrone)."""
+    content: Optional[str] = None  # Réponse de l'IA, si la tentative a réussi
+    error_msg: str = ''
+    retry_after: Optional[float] = None
+    retry_same_model: bool = False  # Nouvel essai immédiat sur le même modèle (hors tentatives comptées)
+
+def _rejects_response_format(error_text: str) -> bool:
+    """
+    Indique si une erreur 400 de l'API porte sur la sortie structurée (response_format).
+    
+    Args:
+        error_text: Corps de la réponse en erreur
+        
+    Returns:
+        bool: True si le message d'erreur met en cause response_format
+    """
+    error_text = error_text.lower()
+    return any(marker in error_text for marker in ('response_format', 'json_schema', 'structured output'))
+
 class RecommendationEngine:
     """
     Moteur de recommandation utilisant l'API DeepSeek via OpenRouter.
     """
     
-    def __init__(self, api_key: str, knowledge_base_manager: KnowledgeBaseManager):
+    # Consignes du prompt communes à tous les étudiants
+    SECTION_INSTRUCTIONS = """1. ÉVALUATION DU CHOIX INITIAL (2-3 phrases)
+   - Évalue l'adéquation entre la filière actuelle et la carrière envisagée
+   - Mentionne les opportunités et défis potentiels
+
+2. NIVEAU D'ADÉQUATION (1-2 phrases)
+   - Donne une évaluation claire: Excellente/Bonne/Moyenne/Faible adéquation
+   - Justifie brièvement
+
+3. CARRIÈRES ALTERNATIVES (si pertinent, 2-3 suggestions max)
+   - Suggère des alternatives uniquement si l'adéquation est moyenne/faible
+   - Privilégie les métiers à forte demande mentionnés ci-dessus
+
+4. PARCOURS PERSONNALISÉ (5-6 points concrets)
+   - Formations complémentaires spécifiques
+   - Compétences clés à développer (avec emphase sur le numérique si pertinent)
+   - Certifications utiles
+   - Conseils pour l'insertion professionnelle au Bénin
+   - Opportunités d'entrepreneuriat si applicable
+   - Étapes chronologiques recommandées"""
+    
+    CONTEXT_INSTRUCTIONS = """Adapte tes recommandations au contexte béninois: marché local, économie numérique émergente, secteurs porteurs comme l'agro-industrie, le tourisme, et l'économie verte.
+Sois concret, pratique et encourageant."""
+    
+    JSON_FIELDS_INSTRUCTIONS = """- "analysis": section 1, "adequacy_level": section 2, "alternative_careers": section 3 (chaîne vide si non pertinent)
+- "personalized_path": section 4, un point par ligne commençant par "- \""""
+    
+    # Schéma JSON d'une recommandation (sortie structurée, response_format)
+    RECOMMENDATION_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "analysis": {"type": "string", "description": "Évaluation du choix initial (2-3 phrases)"},
+            "adequacy_level": {"type": "string", "description": "Excellente/Bonne/Moyenne/Faible adéquation, avec justification"},
+            "alternative_careers": {"type": "string", "description": "Carrières alternatives, chaîne vide si non pertinent"},
+            "personalized_path": {"type": "string", "description": "5-6 points concrets, un par ligne commençant par '- '"}
+        },
+        "required": ["analysis", "adequacy_level", "alternative_careers", "personalized_path"],
+        "additionalProperties": False
+    }
+    
+    
+    def __init__(self, api_key: str, knowledge_base_manager: KnowledgeBaseManager,
+                 max_concurrency: int = Config.MAX_CONCURRENCY,
+                 use_http2: bool = Config.USE_HTTP2,
+                 use_cache: bool = Config.CACHE_ENABLED,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 pack_size: int = Config.PACK_SIZE,
+                 structured_output: bool = Config.STRUCTURED_OUTPUT,
+                 student_deadline: float = Config.STUDENT_DEADLINE,
+                 hedging: bool = Config.HEDGE_ENABLED,
+                 hedge_model: str = Config.HEDGE_MODEL,
+                 model_router: Optional[ModelRouter] = None):
+        model_config = Config.get_model_config()
         self.api_key = api_key
         self.kb_manager = knowledge_base_manager
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.model = "deepseek/deepseek-chat"
+        self.base_url = Config.OPENROUTER_BASE_URL
         self.max_retries = 3
-        self.retry_delay = 2
+        self.request_timeout = 60
+        self.temperature = model_config['temperature']
+        self.max_tokens = model_config['max_tokens']
+        self.top_p = model_config['top_p']
+        self.system_prompt = "Tu es un expert en orientation professionnelle spécialisé dans le marché du travail africain, particulièrement au Bénin. Tu fournis des conseils pratiques et adaptés au contexte local."
+        self.max_concurrency = max(1, max_concurrency)
+        self.pack_size = max(1, pack_size)
+        self.packed_max_tokens = Config.PACKED_MAX_TOKENS
+        self.structured_output = structured_output
+        # Désactivé si le modèle ou le fournisseur refuse response_format (le prompt demande toujours du JSON)
+        self.response_format_supported = True
+        self.use_http2 = use_http2
+        # Budget de temps par étudiant, toutes tentatives comprises (0: pas de limite)
+        self.student_deadline = student_deadline
+        self.hedging = hedging
+        self.hedge_model = hedge_model or None
+        self.latency_tracker = LatencyTracker()
+        # Threads des appels doublés (créés à la demande par le pool)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2,
+                                                  thread_name_prefix="recommendation-hedge")
+        
+        # Client HTTP persistant partagé par tous les appels (keep-alive, pool de connexions)
+        self.http_client = self._create_http_client()
+        self._transport_errors = (requests.exceptions.RequestException,)
+        self._timeout_errors = (requests.exceptions.Timeout,)
+        if httpx is not None:
+            self._transport_errors += (httpx.TransportError,)
+            self._timeout_errors += (httpx.TimeoutException,)
+        
+        # Débit, concurrence et nouvelles tentatives partagés par tous les moteurs du processus
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        # Choix du modèle de chaque appel (modèle principal, modèles de secours), partagé lui aussi
+        self.model_router = model_router or get_shared_model_router()
+        self.model = self.model_router.primary_model
+        
+        # Cache persistant des réponses (désactivable via use_cache)
+        self.use_cache = use_cache
+        self.cache = cache
+        if self.cache is None and use_cache:
+            try:
+                self.cache = ResponseCache(Config.CACHE_FILE, Config.CACHE_TTL, Config.CACHE_MAX_ENTRIES)
+            except Exception as e:
+                logger.warning(f"Cache des recommandations indisponible: {str(e)}")
+        
+        # Statistiques du mode groupé (appels, étudiants traités, replis individuels)
+        self._packing_stats = {'packed_calls': 0, 'packed_students': 0, 'fallbacks': 0}
+        # Statistiques de la sortie structurée (réponses JSON valides, replis sur le découpage du texte)
+        self._structured_stats = {'json_parsed': 0, 'text_fallbacks': 0}
+        # Statistiques des appels en double (appels individuels, appels doublés, doublons arrivés premiers)
+        self._hedge_stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0}
+        self._stats_lock = threading.Lock()
+    
+    def _create_http_client(self):
+        """
+        Crée le client HTTP réutilisé pour tous les appels à l'API.
+        
+        Utilise httpx en HTTP/2 si demandé et disponible, sinon une session
+        requests dont le pool de connexions est dimensionné sur la concurrence.
+        
+        Returns:
+            requests.Session ou httpx.Client: Client HTTP configuré
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://streamlit.io",
+            "X-Title": "Système Orientation Professionnelle Bénin"
+        }
+        
+        if self.use_http2:
+            if httpx is None:
+                logger.warning("HTTP/2 indisponible (httpx non installé), utilisation de HTTP/1.1")
+            else:
+                try:
+                    return httpx.Client(
+                        http2=True,
+                        headers=self._httpx_headers(headers),
+                        timeout=self.request_timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_concurrency,
+                            max_keepalive_connections=self.max_concurrency
+                        )
+                    )
+                except ImportError:
+                    logger.warning("HTTP/2 indisponible (paquet h2 non installé), utilisation de HTTP/1.1")
+        
+        session = requests.Session()
+        session.headers.update(headers)
+        # Une seule origine est contactée: un pool, autant de connexions que d'appels simultanés
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    @staticmethod
+    def _httpx_headers(headers: Dict[str, str]) -> Dict[str, bytes]:
+        """En-têtes encodés en latin-1 comme le fait requests (httpx n'accepte que l'ASCII pour les chaînes)."""
+        return {name: value.encode('latin-1') for name, value in headers.items()}
+    
+    def close(self):
+        """Ferme le client HTTP et libère les connexions du pool."""
+        self._hedge_executor.shutdown(wait=False)
+        self.http_client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def generate_recommendation(self, student_data: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -33,14 +238,13 @@ class RecommendationEngine:
             Dict[str, Any]: Recommandation structurée
         """
         try:
-            # Analyser le profil de l'étudiant
-            student_analysis = self._analyze_student_profile(student_data)
+            deadline = self._new_deadline()
             
-            # Générer le prompt pour DeepSeek
-            prompt = self._build_deepseek_prompt(student_data, student_analysis)
+            # Analyser le profil de l'étudiant et générer le prompt pour DeepSeek
+            student_analysis, prompt = self._build_student_prompt(student_data)
             
-            # Appeler l'API DeepSeek
-            ai_response = self._call_deepseek_api(prompt)
+            # Appeler l'API DeepSeek (ou réutiliser une réponse en cache)
+            ai_response = self._get_ai_response(prompt, structured=self.structured_output, deadline=deadline)
             
             # Structurer la réponse
             recommendation = self._structure_recommendation(ai_response, student_analysis)
@@ -51,6 +255,239 @@ class RecommendationEngine:
             logger.error(f"Erreur lors de la génération de recommandation: {str(e)}")
             return {"error": str(e)}
     
+    def generate_recommendation_stream(self, student_data: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """
+        Génère une recommandation en flux, pour un affichage au fil de l'eau.
+        
+        Événements produits:
+        - {'type': 'delta', 'text': ...}: nouveau morceau de texte de l'IA
+        - {'type': 'section', 'section': ..., 'content': ...}: section terminée
+        - {'type': 'done', 'recommendation': ...}: recommandation structurée finale
+        - {'type': 'error', 'error': ...}: échec (dernier événement)
+        
+        Args:
+            student_data: Données de l'étudiant
+            
+        Yields:
+            Dict[str, Any]: Événements de génération
+        """
+        try:
+            deadline = self._new_deadline()
+            student_analysis = self._analyze_student_profile(student_data)
+            prompt = self._build_deepseek_prompt(student_data, student_analysis)
+            
+            # Une réponse en cache est restituée d'un seul bloc
+            cached_response = None
+            if self.use_cache and self.cache:
+                cached_response = self._get_cached_response(prompt)
+            route = {}
+            chunks = [cached_response] if cached_response is not None else self._stream_deepseek_api(prompt, route, deadline)
+            
+            # Les sections sont découpées au fur et à mesure de la réception
+            parser = SectionParser()
+            for text in chunks:
+                completed_sections = parser.feed(text)
+                yield {'type': 'delta', 'text': text}
+                for section in completed_sections:
+                    yield {'type': 'section', 'section': section, 'content': parser.sections[section]}
+            
+            last_section = parser.current_section
+            sections = parser.finish()
+            if last_section and sections[last_section]:
+                yield {'type': 'section', 'section': last_section, 'content': sections[last_section]}
+            
+            ai_response = parser.text
+            if self.use_cache and self.cache and cached_response is None:
+                self.cache.put(self._get_cache_key(prompt, model=route['model']), ai_response)
+            
+            recommendation = self._structure_recommendation(ai_response, student_analysis, sections)
+            yield {'type': 'done', 'recommendation': recommendation}
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération de recommandation en flux: {str(e)}")
+            yield {'type': 'error', 'error': str(e)}
+    
+    def generate_recommendations_batch(self, students: Iterable[Dict[str, str]],
+                                       max_concurrency: Optional[int] = None,
+                                       plan: Optional[ProfilePlan] = None,
+                                       pack_size: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Génère les recommandations d'un lot d'étudiants en parallèle.
+        
+        Les appels à l'API sont répartis sur un pool de threads borné; les
+        résultats sont renvoyés dans leur ordre d'achèvement, accompagnés de
+        l'indice de l'étudiant dans le lot d'origine.
+        
+        Args:
+            students: Données des étudiants (liste ou itérable)
+            max_concurrency: Nombre maximum d'appels simultanés
+            plan: Plan de regroupement des profils (un seul appel par groupe)
+            pack_size: Étudiants (ou profils) envoyés par appel en mode groupé
+            
+        Yields:
+            Tuple[int, Dict[str, Any]]: Indice de l'étudiant et sa recommandation
+        """
+        workers = max(1, max_concurrency or self.max_concurrency)
+        pack_size = max(1, pack_size or self.pack_size)
+        
+        if plan is None:
+            yield from self._run_concurrently(enumerate(students), workers, pack_size)
+            return
+        
+        # Un appel par profil distinct, puis personnalisation locale pour chaque membre
+        students = list(students)
+        group_tasks = (
+            (group_index, build_group_student(students[group.representative_index], plan.include_region))
+            for group_index, group in enumerate(plan.groups)
+        )
+        for group_index, group_recommendation in self._run_concurrently(group_tasks, workers, pack_size):
+            for index in plan.groups[group_index].member_indices:
+                yield index, personalize_recommendation(group_recommendation, students[index])
+    
+    def _run_concurrently(self, tasks: Iterable[Tuple[int, Dict[str, str]]],
+                          workers: int, pack_size: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Exécute generate_recommendation (ou generate_recommendations_packed par
+        paquets de pack_size étudiants) sur un pool de threads borné.
+        
+        Args:
+            tasks: Couples (identifiant, données étudiant)
+            workers: Nombre maximum d'appels simultanés
+            pack_size: Étudiants par appel (1: un appel par étudiant)
+            
+        Yields:
+            Tuple[int, Dict[str, Any]]: Identifiant de la tâche et recommandation, par ordre d'achèvement
+        """
+        # Limiter le nombre de tâches en attente pour ne pas consommer
+        # entièrement un itérable potentiellement très long
+        max_pending = workers * 2
+        packs = self._iter_packs(tasks, pack_size)
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recommendation")
+        pending = {}
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        pack = next(packs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if len(pack) == 1:
+                        future = executor.submit(self.generate_recommendation, pack[0][1])
+                    else:
+                        future = executor.submit(self.generate_recommendations_packed, [student for _, student in pack])
+                    pending[future] = pack
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pack = pending.pop(future)
+                    try:
+                        result = future.result()
+                        recommendations = [result] if len(pack) == 1 else result
+                    except Exception as e:
+                        task_ids = ', '.join(str(task_id) for task_id, _ in pack)
+                        logger.error(f"Erreur lors de l'analyse de l'étudiant {task_ids}: {str(e)}")
+                        recommendations = [{"error": str(e)} for _ in pack]
+                    for (task_id, _), recommendation in zip(pack, recommendations):
+                        yield task_id, recommendation
+        finally:
+            # Annuler les appels non démarrés si le consommateur s'arrête en cours de route
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _iter_packs(tasks: Iterable[Tuple[int, Dict[str, str]]],
+                    pack_size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        """Découpe les tâches en paquets de pack_size (le dernier peut être incomplet)."""
+        pack = []
+        for task in tasks:
+            pack.append(task)
+            if len(pack) >= pack_size:
+                yield pack
+                pack = []
+        if pack:
+            yield pack
+    
+    def generate_recommendations_packed(self, students_data: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Génère les recommandations de plusieurs étudiants en un seul appel à l'IA (mode groupé).
+        
+        Le contexte commun (secteurs porteurs, consignes) n'est envoyé qu'une fois
+        et l'IA répond par un tableau JSON d'un élément par étudiant. Chaque
+        élément est validé; les étudiants dont l'élément est absent ou invalide
+        (ou tous, si la réponse est illisible) sont traités par un appel individuel.
+        
+        Args:
+            students_data: Données des étudiants du paquet
+            
+        Returns:
+            List[Dict[str, Any]]: Recommandations, dans l'ordre des étudiants
+        """
+        recommendations: List[Optional[Dict[str, Any]]] = [None] * len(students_data)
+        analyses = {}
+        prompts = {}
+        pending = []
+        
+        for index, student_data in enumerate(students_data):
+            try:
+                analysis = self._analyze_student_profile(student_data)
+            except Exception as e:
+                logger.error(f"Erreur lors de la génération de recommandation: {str(e)}")
+                recommendations[index] = {"error": str(e)}
+                continue
+            analyses[index] = analysis
+            
+            # Réponses groupées en cache, clé distincte de celle des appels individuels
+            if self.use_cache and self.cache:
+                prompts[index] = self._build_deepseek_prompt(student_data, analysis)
+                cached_response = self._get_cached_response(prompts[index], output='packed')
+                if cached_response is not None:
+                    try:
+                        sections = self._sections_from_json(json.loads(cached_response))
+                    except ValueError:
+                        sections = None
+                    if sections is not None:
+                        recommendations[index] = self._structure_recommendation(format_sections(sections),
+                                                                                analysis, sections)
+                        continue
+            pending.append(index)
+        
+        if len(pending) > 1:
+            try:
+                items, model = self._call_packed_api([students_data[index] for index in pending],
+                                                     [analyses[index] for index in pending])
+            except Exception as e:
+                logger.warning(f"Mode groupé: réponse inexploitable ({str(e)}), "
+                               f"traitement individuel de {len(pending)} étudiants")
+                items, model = {}, None
+            
+            for position, index in enumerate(pending):
+                sections = items.get(position)
+                if sections is None:
+                    continue
+                recommendations[index] = self._structure_recommendation(format_sections(sections),
+                                                                        analyses[index], sections)
+                if index in prompts:
+                    self.cache.put(self._get_cache_key(prompts[index], model=model, output='packed'),
+                                   json.dumps(sections, ensure_ascii=False))
+            
+            with self._stats_lock:
+                self._packing_stats['packed_calls'] += 1
+                self._packing_stats['packed_students'] += len(items)
+                self._packing_stats['fallbacks'] += len(pending) - len(items)
+        
+        # Repli: un appel individuel pour chaque étudiant restant
+        for index, recommendation in enumerate(recommendations):
+            if recommendation is None:
+                recommendations[index] = self.generate_recommendation(students_data[index])
+        return recommendations
+    
     def _analyze_student_profile(self, student_data: Dict[str, str]) -> Dict[str, Any]:
         """
         Analyse le profil de l'étudiant avec la base de connaissances.
@@ -93,6 +530,21 @@ class RecommendationEngine:
         
         return analysis
     
+    def _build_student_prompt(self, student_data: Dict[str, str]) -> Tuple[Dict[str, Any], str]:
+        """
+        Analyse le profil d'un étudiant et construit le prompt de son appel individuel.
+        
+        Args:
+            student_data: Données de l'étudiant
+            
+        Returns:
+            Tuple[Dict[str, Any], str]: Analyse préliminaire et prompt (JSON si la sortie structurée est active)
+        """
+        student_analysis = self._analyze_student_profile(student_data)
+        if self.structured_output:
+            return student_analysis, self._build_structured_prompt(student_data, student_analysis)
+        return student_analysis, self._build_deepseek_prompt(student_data, student_analysis)
+    
     def _build_deepseek_prompt(self, student_data: Dict[str, str], analysis: Dict[str, Any]) -> str:
         """
         Construit le prompt pour l'API DeepSeek.
@@ -104,10 +556,36 @@ class RecommendationEngine:
         Returns:
             str: Prompt structuré
         """
-        prompt = f"""Tu es un conseiller en orientation professionnelle spécialisé dans le marché du travail béninois. 
+        prompt = """Tu es un conseiller en orientation professionnelle spécialisé dans le marché du travail béninois. 
 Analyse le profil de cet étudiant et fournis des recommandations détaillées.
 
-PROFIL ÉTUDIANT:
+"""
+        prompt += self._build_student_context(student_data, analysis)
+        prompt += self._build_secteurs_context(analysis)
+        prompt += f"""
+
+INSTRUCTIONS:
+Fournis une analyse structurée en 4 sections:
+
+{self.SECTION_INSTRUCTIONS}
+
+{self.CONTEXT_INSTRUCTIONS}
+"""
+        
+        return prompt
+    
+    def _build_student_context(self, student_data: Dict[str, str], analysis: Dict[str, Any]) -> str:
+        """
+        Partie du prompt propre à un étudiant (profil, métier envisagé, compatibilité, alternatives).
+        
+        Args:
+            student_data: Données de l'étudiant
+            analysis: Analyse préliminaire
+            
+        Returns:
+            str: Contexte de l'étudiant
+        """
+        prompt = f"""PROFIL ÉTUDIANT:
 - Nom: {student_data.get('Nom', 'N/A')} {student_data.get('Prénom', 'N/A')}
 - Filière actuelle: {student_data.get('Filière Actuelle', 'N/A')}
 - Carrière envisagée: {student_data.get('Carrière Envisagée', 'N/A')}
@@ -147,115 +625,763 @@ ANALYSE DE COMPATIBILITÉ:
             for alt_metier in analysis['alternative_careers']:
                 prompt += f"- {alt_metier.nom_metier}: {alt_metier.description[:100]}... (Demande: {alt_metier.niveau_demande_marche})\n"
         
-        # Ajouter les secteurs porteurs
+        return prompt
+    
+    def _build_secteurs_context(self, analysis: Dict[str, Any]) -> str:
+        """
+        Partie du prompt sur les secteurs porteurs (identique pour tous les étudiants).
+        
+        Args:
+            analysis: Analyse préliminaire
+            
+        Returns:
+            str: Contexte des secteurs porteurs
+        """
+        prompt = ""
         if analysis['secteur_recommendations']:
             prompt += "\nSECTEURS PORTEURS AU BÉNIN:\n"
             for secteur in analysis['secteur_recommendations']:
                 prompt += f"- {secteur.nom_secteur}: {secteur.description[:100]}...\n"
         
-        prompt += """
+        return prompt
+    
+    def _build_structured_prompt(self, student_data: Dict[str, str], analysis: Dict[str, Any]) -> str:
+        """
+        Construit le prompt de la sortie structurée: prompt habituel suivi du format JSON attendu.
+        
+        Args:
+            student_data: Données de l'étudiant
+            analysis: Analyse préliminaire
+            
+        Returns:
+            str: Prompt structuré
+        """
+        return self._build_deepseek_prompt(student_data, analysis) + f"""
+FORMAT DE RÉPONSE:
+Réponds uniquement par un objet JSON, sans texte autour:
+{{"analysis": "...", "adequacy_level": "...", "alternative_careers": "...", "personalized_path": "..."}}
+{self.JSON_FIELDS_INSTRUCTIONS}
+"""
+    
+    def _response_format(self, packed: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Paramètre response_format de la sortie structurée.
+        
+        Args:
+            packed: True pour un appel groupé (tableau "etudiants" d'objets)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Schéma JSON demandé, ou None si la sortie structurée est inactive
+        """
+        if not (self.structured_output and self.response_format_supported):
+            return None
+        
+        schema = self.RECOMMENDATION_SCHEMA
+        name = "recommandation_orientation"
+        if packed:
+            item_schema = dict(schema,
+                               properties=dict(schema["properties"], etudiant={"type": "integer"}),
+                               required=["etudiant"] + schema["required"])
+            schema = {
+                "type": "object",
+                "properties": {"etudiants": {"type": "array", "items": item_schema}},
+                "required": ["etudiants"],
+                "additionalProperties": False
+            }
+            name = "recommandations_orientation"
+        return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+    
+    def _parse_structured_response(self, ai_response: str) -> Optional[Dict[str, str]]:
+        """
+        Lit une réponse JSON de l'IA (réparée si tronquée) et valide ses sections.
+        
+        Args:
+            ai_response: Réponse brute de l'IA
+            
+        Returns:
+            Optional[Dict[str, str]]: Sections, ou None si la réponse n'est pas un JSON valide
+        """
+        try:
+            sections = self._sections_from_json(parse_json_response(ai_response))
+        except ValueError:
+            sections = None
+        
+        with self._stats_lock:
+            self._structured_stats['json_parsed' if sections is not None else 'text_fallbacks'] += 1
+        return sections
+    
+    def _build_packed_prompt(self, students_data: List[Dict[str, str]], analyses: List[Dict[str, Any]]) -> str:
+        """
+        Construit le prompt d'un appel groupé: contexte commun une seule fois,
+        puis le contexte de chaque étudiant, et une réponse JSON demandée.
+        
+        Args:
+            students_data: Données des étudiants du paquet
+            analyses: Analyses préliminaires, dans le même ordre
+            
+        Returns:
+            str: Prompt structuré
+        """
+        count = len(students_data)
+        prompt = f"""Tu es un conseiller en orientation professionnelle spécialisé dans le marché du travail béninois. 
+Analyse le profil de chacun des {count} étudiants ci-dessous et fournis des recommandations détaillées pour chacun.
+"""
+        # Les secteurs porteurs ne dépendent que de la base de connaissances
+        prompt += self._build_secteurs_context(analyses[0])
+        
+        for number, (student_data, analysis) in enumerate(zip(students_data, analyses), start=1):
+            prompt += f"\n=== ÉTUDIANT {number} ===\n"
+            prompt += self._build_student_context(student_data, analysis)
+        
+        prompt += f"""
 
 INSTRUCTIONS:
-Fournis une analyse structurée en 4 sections:
-
-1. ÉVALUATION DU CHOIX INITIAL (2-3 phrases)
-   - Évalue l'adéquation entre la filière actuelle et la carrière envisagée
-   - Mentionne les opportunités et défis potentiels
-
-2. NIVEAU D'ADÉQUATION (1-2 phrases)
-   - Donne une évaluation claire: Excellente/Bonne/Moyenne/Faible adéquation
-   - Justifie brièvement
+Pour chaque étudiant, fournis une analyse structurée en 4 sections:
 
-3. CARRIÈRES ALTERNATIVES (si pertinent, 2-3 suggestions max)
-   - Suggère des alternatives uniquement si l'adéquation est moyenne/faible
-   - Privilégie les métiers à forte demande mentionnés ci-dessus
+{self.SECTION_INSTRUCTIONS}
 
-4. PARCOURS PERSONNALISÉ (5-6 points concrets)
-   - Formations complémentaires spécifiques
-   - Compétences clés à développer (avec emphase sur le numérique si pertinent)
-   - Certifications utiles
-   - Conseils pour l'insertion professionnelle au Bénin
-   - Opportunités d'entrepreneuriat si applicable
-   - Étapes chronologiques recommandées
+{self.CONTEXT_INSTRUCTIONS}
 
-Adapte tes recommandations au contexte béninois: marché local, économie numérique émergente, secteurs porteurs comme l'agro-industrie, le tourisme, et l'économie verte.
-Sois concret, pratique et encourageant.
+FORMAT DE RÉPONSE:
+"""
+        items = '[{"etudiant": 1, "analysis": "...", "adequacy_level": "...", "alternative_careers": "...", "personalized_path": "..."}]'
+        if self._response_format(packed=True):
+            prompt += f"""Réponds uniquement par un objet JSON dont "etudiants" contient {count} objets, un par étudiant et dans le même ordre:
+{{"etudiants": {items}}}
+"""
+        else:
+            prompt += f"""Réponds uniquement par un tableau JSON de {count} objets, un par étudiant et dans le même ordre, sans texte autour:
+{items}
+"""
+        prompt += f"""- "etudiant": numéro de l'étudiant
+{self.JSON_FIELDS_INSTRUCTIONS}
 """
         
         return prompt
     
-    def _call_deepseek_api(self, prompt: str) -> str:
+    def _call_packed_api(self, students_data: List[Dict[str, str]],
+                         analyses: List[Dict[str, Any]]) -> Tuple[Dict[int, Dict[str, str]], str]:
         """
-        Appelle l'API DeepSeek via OpenRouter.
+        Envoie un appel groupé et découpe la réponse par étudiant.
+        
+        Args:
+            students_data: Données des étudiants du paquet
+            analyses: Analyses préliminaires, dans le même ordre
+            
+        Returns:
+            Tuple[Dict[int, Dict[str, str]], str]: Sections validées par position dans le paquet
+            (les éléments absents ou invalides sont omis) et modèle qui a répondu
+        """
+        prompt = self._build_packed_prompt(students_data, analyses)
+        max_tokens = min(self.max_tokens * len(students_data), self.packed_max_tokens)
+        content, model = self._call_deepseek_api(prompt, max_tokens=max_tokens,
+                                                 response_format=self._response_format(packed=True),
+                                                 deadline=self._new_deadline())
+        items = parse_json_response(content)
+        
+        if isinstance(items, dict):
+            # Tableau enveloppé dans un objet ({"etudiants": [...]})
+            items = next((value for value in items.values() if isinstance(value, list)), [items])
+        if not isinstance(items, list):
+            raise ValueError("tableau JSON attendu")
+        
+        results = {}
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            number = item.get('etudiant')
+            if isinstance(number, int) and 1 <= number <= len(students_data):
+                position = number - 1
+            sections = self._sections_from_json(item)
+            if sections is not None and position < len(students_data) and position not in results:
+                results[position] = sections
+        
+        if len(results) < len(students_data):
+            logger.warning(f"Mode groupé: {len(students_data) - len(results)} élément(s) "
+                           f"sur {len(students_data)} absent(s) ou invalide(s)")
+        return results, model
+    
+    def _sections_from_json(self, item: Any) -> Optional[Dict[str, str]]:
+        """
+        Valide les sections d'une réponse JSON de l'IA.
+        
+        Args:
+            item: Objet JSON d'un étudiant
+            
+        Returns:
+            Optional[Dict[str, str]]: Sections (listes converties en lignes "- ..."),
+            ou None si l'analyse ou le parcours personnalisé manque
+        """
+        if not isinstance(item, dict):
+            return None
+        
+        sections = {}
+        for section_key in ('analysis', 'adequacy_level', 'alternative_careers', 'personalized_path'):
+            value = item.get(section_key)
+            if isinstance(value, list):
+                value = '\n'.join(f"- {str(entry).strip()}" for entry in value if str(entry).strip())
+            elif value is None:
+                value = ''
+            elif not isinstance(value, str):
+                value = str(value)
+            sections[section_key] = value.strip()
+        
+        if not sections['analysis'] or not sections['personalized_path']:
+            return None
+        return sections
+    
+    def _get_cache_key(self, prompt: str, model: Optional[str] = None, **variant: Any) -> str:
+        """
+        Calcule la clé de cache d'un prompt pour un modèle et les paramètres courants.
+        
+        Args:
+            prompt: Prompt final envoyé à l'IA
+            model: Modèle qui a produit la réponse (défaut: modèle principal)
+            **variant: Format de réponse demandé, s'il diffère du texte libre (ex. output='packed')
+            
+        Returns:
+            str: Clé de cache
+        """
+        return ResponseCache.make_key(
+            prompt=prompt,
+            system_prompt=self.system_prompt,
+            model=model or self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            top_p=self.top_p,
+            **variant
+        )
+    
+    def _cache_models(self) -> List[str]:
+        """Modèles susceptibles d'avoir produit une réponse en cache, dans l'ordre de préférence."""
+        models = list(self.model_router.models)
+        if self.hedge_model and self.hedge_model not in models:
+            models.append(self.hedge_model)
+        return models
+    
+    def _get_cached_response(self, prompt: str, **variant: Any) -> Optional[str]:
+        """
+        Cherche en cache la réponse d'un prompt, quel que soit le modèle qui l'a produite.
+        
+        Args:
+            prompt: Prompt final envoyé à l'IA
+            **variant: Format de réponse demandé (voir _get_cache_key)
+            
+        Returns:
+            Optional[str]: Réponse du modèle le mieux placé, ou None si absente du cache
+        """
+        # Une seule lecture (un seul succès ou échec) dans les statistiques du cache
+        return self.cache.get_first(self._get_cache_key(prompt, model=model, **variant)
+                                    for model in self._cache_models())
+    
+    def _get_ai_response(self, prompt: str, structured: bool = False, deadline: Optional[float] = None) -> str:
+        """
+        Retourne la réponse de l'IA pour un prompt, en passant par le cache si actif.
         
         Args:
             prompt: Prompt à envoyer
+            structured: True pour demander une réponse JSON (response_format)
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
             
         Returns:
             str: Réponse de l'IA
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://streamlit.io",
-            "X-Title": "Système Orientation Professionnelle Bénin"
-        }
+        response_format = self._response_format() if structured else None
+        if not (self.use_cache and self.cache):
+            return self._call_with_hedging(prompt, response_format, deadline)[0]
         
+        variant = {'output': 'json'} if structured else {}
+        cached_response = self._get_cached_response(prompt, **variant)
+        if cached_response is not None:
+            return cached_response
+        
+        # Réponse enregistrée sous le modèle qui l'a produite (secours ou appel en double compris)
+        ai_response, model = self._call_with_hedging(prompt, response_format, deadline)
+        self.cache.put(self._get_cache_key(prompt, model=model, **variant), ai_response)
+        return ai_response
+    
+    def _new_deadline(self) -> Optional[float]:
+        """Échéance d'un nouvel étudiant (time.monotonic), ou None sans budget de temps."""
+        if self.student_deadline and self.student_deadline > 0:
+            return time.monotonic() + self.student_deadline
+        return None
+    
+    def _attempt_timeout(self, deadline: Optional[float]) -> float:
+        """
+        Délai accordé à une tentative: request_timeout, borné par le budget restant.
+        
+        Args:
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
+            
+        Returns:
+            float: Délai en secondes
+            
+        Raises:
+            DeadlineExceededError: Si le budget est épuisé
+        """
+        if deadline is None:
+            return self.request_timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Délai de traitement dépassé ({self.student_deadline:.0f}s)")
+        return min(self.request_timeout, remaining)
+    
+    def _hedge_delay(self, deadline: Optional[float]) -> Optional[float]:
+        """
+        Attente avant un appel en double: latence observée au quantile HEDGE_QUANTILE.
+        
+        Args:
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
+            
+        Returns:
+            Optional[float]: Délai en secondes, ou None pour ne pas doubler l'appel (désactivé,
+            latence encore inconnue, part maximale d'appels doublés atteinte, budget insuffisant)
+        """
+        if not self.hedging:
+            return None
+        latency = self.latency_tracker.percentile(Config.HEDGE_QUANTILE)
+        if latency is None:
+            return None
+        with self._stats_lock:
+            if self._hedge_stats['hedged'] >= Config.HEDGE_MAX_RATIO * self._hedge_stats['calls']:
+                return None
+        delay = max(Config.HEDGE_MIN_DELAY, latency)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+    
+    def _call_with_hedging(self, prompt: str, response_format: Optional[Dict[str, Any]] = None,
+                           deadline: Optional[float] = None) -> Tuple[str, str]:
+        """
+        Appelle l'IA; sans réponse au-delà de la latence habituelle, envoie le
+        même appel en double (éventuellement à un modèle secondaire) et garde
+        la première réponse obtenue.
+        
+        Args:
+            prompt: Prompt à envoyer
+            response_format: Format de réponse imposé (schéma JSON)
+            deadline: Échéance de l'étudiant (time.monotonic), None pour aucune
+            
+        Returns:
+            Tuple[str, str]: Réponse de l'IA et modèle qui l'a produite
+        """
+        hedge_delay = self._hedge_delay(deadline)
+        with self._stats_lock:
+            self._hedge_stats['calls'] += 1
+        started = time.monotonic()
+        
+        if hedge_delay is None:
+            answer = self._call_deepseek_api(prompt, response_format=response_format, deadline=deadline)
+            self.latency_tracker.record(time.monotonic() - started)
+            return answer
+        
+        cancel_event = threading.Event()
+        primary = self._hedge_executor.submit(self._call_deepseek_api, prompt, None, response_format,
+                                              deadline, None, cancel_event)
+        pending = {primary}
+        try:
+            done, pending = wait(pending, timeout=hedge_delay)
+            if not done:
+                logger.info(f"Pas de réponse après {hedge_delay:.1f}s: appel en double"
+                            + (f" ({self.hedge_model})" if self.hedge_model else ""))
+                with self._stats_lock:
+                    self._hedge_stats['hedged'] += 1
+                pending.add(self._hedge_executor.submit(self._call_deepseek_api, prompt, None, response_format,
+                                                        deadline, self.hedge_model, cancel_event))
+            
+            error = None
+            while True:
+                for future in done:
+                    try:
+                        answer = future.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if future is not primary:
+                        with self._stats_lock:
+                            self._hedge_stats['hedge_wins'] += 1
+                    self.latency_tracker.record(time.monotonic() - started)
+                    return answer
+                if not pending:
+                    raise error
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        finally:
+            # L'appel perdant n'enchaîne plus de tentative (sa requête en cours ne peut être interrompue)
+            cancel_event.set()
+    
+    def _build_request_data(self, prompt: str, stream: bool = False, max_tokens: Optional[int] = None,
+                            response_format: Optional[Dict[str, Any]] = None,
+                            model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Construit le corps de la requête de complétion.
+        
+        Args:
+            prompt: Prompt à envoyer
+            stream: True pour une réponse en flux (Server-Sent Events)
+            max_tokens: Taille maximale de la réponse (défaut: self.max_tokens)
+            response_format: Format de réponse imposé (schéma JSON)
+            model: Modèle interrogé (défaut: self.model)
+            
+        Returns:
+            Dict[str, Any]: Corps JSON de la requête
+        """
         data = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": "Tu es un expert en orientation professionnelle spécialisé dans le marché du travail africain, particulièrement au Bénin. Tu fournis des conseils pratiques et adaptés au contexte local."
+                    "content": self.system_prompt
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            "temperature": 0.7,
-            "max_tokens": 2000,
-            "top_p": 0.9
+            "temperature": self.temperature,
+            "max_tokens": max_tokens or self.max_tokens,
+            "top_p": self.top_p
         }
+        if stream:
+            data["stream"] = True
+        if response_format:
+            data["response_format"] = response_format
+        return data
+    
+    def _choose_model(self, prompt: str, max_tokens: int, tried: Iterable[str] = ()) -> str:
+        """
+        Modèle d'une tentative, choisi par le routeur (les modèles déjà en échec pour cet appel sont évités).
         
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.post(
-                    self.base_url,
-                    headers=headers,
-                    json=data,
-                    timeout=60
-                )
-                
-                if response.status_code == 200:
-                    response_data = response.json()
-                    if 'choices' in response_data and response_data['choices']:
-                        return response_data['choices'][0]['message']['content']
-                    else:
-                        raise Exception("Réponse API invalide: pas de contenu")
+        Args:
+            prompt: Prompt à envoyer
+            max_tokens: Taille maximale de la réponse
+            tried: Modèles déjà en échec pour cet appel
+            
+        Returns:
+            str: Nom du modèle
+        """
+        prompt_tokens = self.rate_limiter.estimate_tokens(self.system_prompt + prompt, 0)
+        return self.model_router.choose(prompt_tokens, max_tokens, exclude=tried)
+    
+    def _record_success(self, model: str, started_at: float, estimated_tokens: int, used_tokens: Optional[int] = None):
+        """Enregistre un appel réussi auprès de l'ordonnanceur et du routeur de modèles."""
+        self.rate_limiter.record_success(estimated_tokens, used_tokens)
+        self.model_router.record_success(model, time.monotonic() - started_at, used_tokens)
+    
+    def _record_failure(self, model: str, status_code: Optional[int] = None, started_at: Optional[float] = None,
+                        trip_breaker: bool = True):
+        """
+        Enregistre un échec auprès de l'ordonnanceur et du routeur de modèles.
+        
+        Args:
+            model: Modèle interrogé
+            status_code: Code HTTP de la réponse, ou None pour une erreur réseau
+            started_at: Instant d'envoi de la requête
+            trip_breaker: False si l'échec ne prouve pas une panne du service (délai raccourci par l'échéance)
+        """
+        self.rate_limiter.record_failure(status_code, started_at,
+                                         trip_breaker=trip_breaker and not self.model_router.can_fail_over)
+        self.model_router.record_failure(model, status_code)
+    
+    def _is_cut_short(self, error: Exception, timeout: float) -> bool:
+        """True si l'erreur est un dépassement d'un délai raccourci par l'échéance de l'étudiant."""
+        return isinstance(error, self._timeout_errors) and timeout < self.request_timeout
+    
+    def _attempt_from_error(self, data: Dict[str, Any], error: Exception, started_at: float,
+                            timeout: float, tried: set) -> _Attempt:
+        """
+        Enregistre l'échec d'une tentative sans réponse HTTP (erreur réseau, délai dépassé).
+        
+        Args:
+            data: Corps de la requête (modèle interrogé compris)
+            error: Erreur du client HTTP
+            started_at: Instant d'envoi de la requête
+            timeout: Délai accordé à la tentative
+            tried: Modèles en échec pour cet appel (complété)
+            
+        Returns:
+            _Attempt: Échec à renouveler
+        """
+        # Un délai raccourci par le budget de l'étudiant ne doit pas suspendre tous les appels
+        self._record_failure(data["model"], started_at=started_at,
+                             trip_breaker=not self._is_cut_short(error, timeout))
+        tried.add(data["model"])
+        return _Attempt(error_msg=f"Erreur de connexion: {str(error) or type(error).__name__}")
+    
+    def _attempt_from_response(self, data: Dict[str, Any], response, started_at: float,
+                               estimated_tokens: int, tried: set) -> _Attempt:
+        """
+        Interprète la réponse HTTP d'une tentative (requests ou httpx) et l'enregistre
+        auprès de l'ordonnanceur et du routeur.
+        
+        Args:
+            data: Corps de la requête (response_format retiré s'il est refusé)
+            response: Réponse HTTP entièrement lue
+            started_at: Instant d'envoi de la requête
+            estimated_tokens: Tokens réservés pour la requête
+            tried: Modèles en échec pour cet appel (complété)
+            
+        Returns:
+            _Attempt: Réponse de l'IA, ou échec à renouveler (sur le même modèle,
+            sans compter de tentative, si seul response_format est refusé)
+            
+        Raises:
+            Exception: Si la réponse est vide ou si une nouvelle tentative échouerait de même
+        """
+        if response.status_code == 200:
+            response_data = response.json()
+            usage = response_data.get('usage') or {}
+            self._record_success(data["model"], started_at, estimated_tokens, usage.get('total_tokens'))
+            if 'choices' in response_data and response_data['choices']:
+                return _Attempt(content=response_data['choices'][0]['message']['content'])
+            raise Exception("Réponse API invalide: pas de contenu")
+        
+        error_msg = f"Erreur API ({response.status_code}): {response.text}"
+        if (response.status_code == 400 and 'response_format' in data
+                and _rejects_response_format(response.text)):
+            # Sortie structurée non prise en charge (le prompt demande déjà du JSON):
+            # le modèle n'est pas en cause, il est réinterrogé sans response_format.
+            # Le service a répondu sans que l'appel soit probant pour le disjoncteur.
+            logger.warning(f"response_format refusé par l'API, nouvel essai sans: {error_msg}")
+            self.rate_limiter.release_probe()
+            self.response_format_supported = False
+            del data['response_format']
+            return _Attempt(error_msg=error_msg, retry_same_model=True)
+        
+        self._record_failure(data["model"], response.status_code, started_at)
+        tried.add(data["model"])
+        if not is_retryable_status(response.status_code):
+            # Clé invalide, requête refusée...: une nouvelle tentative échouerait de même
+            raise Exception(error_msg)
+        return _Attempt(error_msg=error_msg, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+    
+    def _retry_delay(self, attempt: int, outcome: _Attempt, deadline: Optional[float]) -> float:
+        """
+        Délai avant la tentative suivante, si le nombre de tentatives et l'échéance le permettent.
+        
+        Args:
+            attempt: Numéro de la tentative échouée (à partir de 0)
+            outcome: Échec de la tentative
+            deadline: Échéance de l'appel (time.monotonic), None pour aucune
+            
+        Returns:
+            float: Délai en secondes
+            
+        Raises:
+            Exception: Si c'était la dernière tentative
+            DeadlineExceededError: Si le budget de l'étudiant ne couvre pas une nouvelle tentative
+        """
+        if attempt >= self.max_retries - 1:
+            raise Exception(outcome.error_msg)
+        delay = self.rate_limiter.backoff_delay(attempt, outcome.retry_after)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise DeadlineExceededError(f"Délai de traitement dépassé ({self.student_deadline:.0f}s): {outcome.error_msg}")
+        logger.warning(f"Tentative {attempt + 1} échouée: {outcome.error_msg} (nouvel essai dans {delay:.1f}s)")
+        return delay
+    
+    def _call_deepseek_api(self, prompt: str, max_tokens: Optional[int] = None,
+                           response_format: Optional[Dict[str, Any]] = None,
+                           deadline: Optional[float] = None,
+                           model: Optional[str] = None,
+                           cancel_event: Optional[threading.Event] = None) -> Tuple[str, str]:
+        """
+        Appelle l'API DeepSeek via OpenRouter.
+        
+        Args:
+            prompt: Prompt à envoyer
+            max_tokens: Taille maximale de la réponse (défaut: self.max_tokens)
+            response_format: Format de réponse imposé (schéma JSON)
+            deadline: Échéance (time.monotonic) bornant les tentatives et leurs délais
+            model: Modèle imposé (défaut: choisi par le routeur à chaque tentative)
+            cancel_event: Arrête les nouvelles tentatives une fois positionné (appel en double devenu inutile)
+            
+        Returns:
+            Tuple[str, str]: Réponse de l'IA et modèle qui l'a produite
+        """
+        data = self._build_request_data(prompt, max_tokens=max_tokens, response_format=response_format)
+        estimated_tokens = self.rate_limiter.estimate_tokens(self.system_prompt + prompt, data["max_tokens"])
+        tried = set()
+        outcome = _Attempt()
+        attempt = 0
+        
+        # Les tentatives s'arrêtent sur une réponse, ou sur l'exception de _retry_delay
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise Exception("Appel annulé: réponse déjà obtenue")
+            if not outcome.retry_same_model:
+                # Bascule sur un autre modèle si celui de la tentative précédente a échoué
+                data["model"] = model or self._choose_model(prompt, data["max_tokens"], tried)
+            with self.rate_limiter.slot(estimated_tokens, deadline) as started_at:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    response = self.http_client.post(self.base_url, json=data, timeout=timeout)
+                except self._transport_errors as e:
+                    outcome = self._attempt_from_error(data, e, started_at, timeout, tried)
                 else:
-                    error_msg = f"Erreur API ({response.status_code}): {response.text}"
-                    if attempt == self.max_retries - 1:
-                        raise Exception(error_msg)
-                    logger.warning(f"Tentative {attempt + 1} échouée: {error_msg}")
-                    time.sleep(self.retry_delay)
-                    
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Erreur de connexion: {str(e)}"
-                if attempt == self.max_retries - 1:
-                    raise Exception(error_msg)
-                logger.warning(f"Tentative {attempt + 1} échouée: {error_msg}")
-                time.sleep(self.retry_delay)
-        
-        raise Exception("Échec de tous les appels API")
-    
-    def _structure_recommendation(self, ai_response: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+                    outcome = self._attempt_from_response(data, response, started_at, estimated_tokens, tried)
+            
+            if outcome.content is not None:
+                return outcome.content, data["model"]
+            if not outcome.retry_same_model:
+                time.sleep(self._retry_delay(attempt, outcome, deadline))
+                attempt += 1
+    
+    @contextmanager
+    def _open_stream(self, data: Dict[str, Any], timeout: float):
+        """
+        Ouvre une requête dont la réponse est lue en flux, quel que soit le client HTTP.
+        
+        Args:
+            data: Corps JSON de la requête
+            timeout: Délai accordé à la tentative (secondes)
+            
+        Yields:
+            requests.Response ou httpx.Response: Réponse non encore lue
+        """
+        if httpx is not None and isinstance(self.http_client, httpx.Client):
+            with self.http_client.stream("POST", self.base_url, json=data, timeout=timeout) as response:
+                yield response
+        else:
+            response = self.http_client.post(self.base_url, json=data, timeout=timeout, stream=True)
+            try:
+                yield response
+            finally:
+                response.close()
+    
+    def _stream_deepseek_api(self, prompt: str, route: Optional[Dict[str, str]] = None,
+                             deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Appelle l'API DeepSeek via OpenRouter en mode flux (stream: true).
+        
+        La réponse est lue par un thread de réception: la place occupée auprès de
+        l'ordonnanceur est libérée à la fin de la réponse HTTP, sans attendre que
+        le consommateur (affichage) ait traité tous les morceaux.
+        
+        Args:
+            prompt: Prompt à envoyer
+            route: Reçoit le modèle qui a produit la réponse (clé 'model') une fois le flux terminé
+            deadline: Échéance (time.monotonic) bornant les tentatives et leurs délais
+            
+        Yields:
+            str: Morceaux successifs de la réponse de l'IA
+        """
+        chunks = queue.Queue()
+        errors = []
+        
+        def receive():
+            try:
+                for text in self._read_stream(prompt, route, deadline):
+                    chunks.put(text)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                chunks.put(_STREAM_END)
+        
+        threading.Thread(target=receive, name="deepseek-stream", daemon=True).start()
+        while True:
+            text = chunks.get()
+            if text is _STREAM_END:
+                break
+            yield text
+        if errors:
+            raise errors[0]
+    
+    def _read_stream(self, prompt: str, route: Optional[Dict[str, str]],
+                     deadline: Optional[float]) -> Iterator[str]:
+        """
+        Lit la réponse en flux de l'API, en répétant les tentatives tant
+        qu'aucun morceau n'a été reçu (une réponse entamée n'est pas recommencée).
+        
+        Args:
+            prompt: Prompt à envoyer
+            route: Reçoit le modèle qui a produit la réponse (clé 'model')
+            deadline: Échéance (time.monotonic), None pour aucune
+            
+        Yields:
+            str: Morceaux successifs de la réponse de l'IA
+        """
+        data = self._build_request_data(prompt, stream=True)
+        estimated_tokens = self.rate_limiter.estimate_tokens(self.system_prompt + prompt, self.max_tokens)
+        tried = set()
+        attempt = 0
+        
+        while True:
+            received = False
+            outcome = None
+            started_at = timeout = None
+            data["model"] = self._choose_model(prompt, self.max_tokens, tried)
+            try:
+                with self.rate_limiter.slot(estimated_tokens, deadline) as started_at:
+                    timeout = self._attempt_timeout(deadline)
+                    with self._open_stream(data, timeout) as response:
+                        if response.status_code != 200:
+                            if httpx is not None and isinstance(response, httpx.Response):
+                                response.read()  # Le corps d'une réponse httpx en flux doit être chargé avant .text
+                            outcome = self._attempt_from_response(data, response, started_at, estimated_tokens, tried)
+                        else:
+                            for text in self._iter_sse_content(response):
+                                received = True
+                                yield text
+                            self._record_success(data["model"], started_at, estimated_tokens)
+            except self._transport_errors as e:
+                outcome = self._attempt_from_error(data, e, started_at, timeout, tried)
+            
+            if outcome is None:
+                if not received:
+                    raise Exception("Réponse API invalide: pas de contenu")
+                if route is not None:
+                    route['model'] = data["model"]
+                return
+            if received:
+                raise Exception(outcome.error_msg)
+            time.sleep(self._retry_delay(attempt, outcome, deadline))
+            attempt += 1
+    
+    def _iter_sse_content(self, response) -> Iterator[str]:
+        """
+        Extrait le texte des événements Server-Sent Events d'une réponse en flux.
+        
+        Args:
+            response: Réponse HTTP en flux
+            
+        Yields:
+            str: Contenu textuel de chaque événement (delta non vide)
+        """
+        data_lines = []
+        for line in response.iter_lines():
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            
+            if line.startswith('data:'):
+                data_lines.append(line[5:].lstrip(' '))
+                continue
+            if line or not data_lines:
+                # Commentaires (": OPENROUTER PROCESSING"), autres champs, lignes vides isolées
+                continue
+            
+            # Ligne vide: fin de l'événement
+            payload = '\n'.join(data_lines)
+            data_lines = []
+            if payload == '[DONE]':
+                return
+            
+            event = json.loads(payload)
+            if 'error' in event:
+                raise Exception(f"Erreur API en cours de flux: {event['error']}")
+            choices = event.get('choices') or []
+            if choices:
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    yield text
+    
+    def _structure_recommendation(self, ai_response: str, analysis: Dict[str, Any],
+                                  sections: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         Structure la réponse de l'IA en sections organisées.
         
         Args:
             ai_response: Réponse brute de l'IA
             analysis: Analyse préliminaire
+            sections: Sections déjà découpées (réponse en flux), sinon calculées ici
             
         Returns:
             Dict[str, Any]: Recommandation structurée
@@ -272,9 +1398,16 @@ Sois concret, pratique et encourageant.
             }
         }
         
-        # Essayer de parser les sections de la réponse IA
+        # Réponse JSON (sortie structurée): une seule lecture, le texte est reconstitué par section
+        if sections is None and self.structured_output:
+            sections = self._parse_structured_response(ai_response)
+            if sections is not None:
+                recommendation['full_recommendation'] = format_sections(sections)
+        
+        # Essayer de parser les sections de la réponse IA (découpage heuristique en repli)
         try:
-            sections = self._parse_ai_sections(ai_response)
+            if sections is None:
+                sections = self._parse_ai_sections(ai_response)
             recommendation.update(sections)
         except Exception as e:
             logger.warning(f"Impossible de parser les sections IA: {str(e)}")
@@ -293,72 +1426,9 @@ Sois concret, pratique et encourageant.
         Returns:
             Dict[str, str]: Sections parsées
         """
-        sections = {
-            'analysis': '',
-            'adequacy_level': '',
-            'alternative_careers': '',
-            'personalized_path': ''
-        }
-        
-        # Patterns de recherche pour les sections
-        section_patterns = {
-            'analysis': ['1. ÉVALUATION DU CHOIX INITIAL', 'ÉVALUATION DU CHOIX', 'ANALYSE'],
-            'adequacy_level': ['2. NIVEAU D\'ADÉQUATION', 'NIVEAU D\'ADÉQUATION', 'ADÉQUATION'],
-            'alternative_careers': ['3. CARRIÈRES ALTERNATIVES', 'CARRIÈRES ALTERNATIVES', 'ALTERNATIVES'],
-            'personalized_path': ['4. PARCOURS PERSONNALISÉ', 'PARCOURS PERSONNALISÉ', 'PARCOURS']
-        }
-        
-        lines = ai_response.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Vérifier si cette ligne commence une nouvelle section
-            section_found = None
-            for section_key, patterns in section_patterns.items():
-                for pattern in patterns:
-                    if pattern in line.upper():
-                        section_found = section_key
-                        break
-                if section_found:
-                    break
-            
-            if section_found:
-                # Sauvegarder la section précédente
-                if current_section and current_content:
-                    sections[current_section] = '\n'.join(current_content).strip()
-                
-                # Commencer la nouvelle section
-                current_section = section_found
-                current_content = []
-                
-                # Ajouter le contenu de la ligne actuelle (après le titre)
-                content_after_title = line
-                for pattern in section_patterns[section_found]:
-                    if pattern in line.upper():
-                        content_after_title = line[line.upper().find(pattern) + len(pattern):].strip()
-                        break
-                
-                if content_after_title and content_after_title != line:
-                    current_content.append(content_after_title)
-            else:
-                # Ajouter à la section courante
-                if current_section:
-                    current_content.append(line)
-        
-        # Sauvegarder la dernière section
-        if current_section and current_content:
-            sections[current_section] = '\n'.join(current_content).strip()
-        
-        # Si aucune section n'a été trouvée, mettre tout dans l'analyse
-        if not any(sections.values()):
-            sections['analysis'] = ai_response
-        
-        return sections
+        parser = SectionParser()
+        parser.feed(ai_response)
+        return parser.finish()
     
     def test_api_connection(self) -> Dict[str, Any]:
         """
@@ -370,7 +1440,7 @@ Sois concret, pratique et encourageant.
         try:
             test_prompt = "Bonjour, peux-tu confirmer que tu fonctionnes correctement ? Réponds simplement 'Test réussi'."
             
-            response = self._call_deepseek_api(test_prompt)
+            response, _ = self._call_deepseek_api(test_prompt)
             
             return {
                 'success': True,
@@ -394,7 +1464,16 @@ Sois concret, pratique et encourageant.
         """
         return {
             'model_used': self.model,
+            'models': self.model_router.get_stats(),
             'base_url': self.base_url,
             'knowledge_base_loaded': self.kb_manager.is_loaded,
-            'knowledge_base_summary': self.kb_manager.get_knowledge_base_summary()
+            'knowledge_base_summary': self.kb_manager.get_knowledge_base_summary(),
+            'cache': self.cache.get_stats() if (self.use_cache and self.cache) else {'enabled': False},
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'packing': dict(self._packing_stats, pack_size=self.pack_size),
+            'structured_output': dict(self._structured_stats, enabled=self.structured_output,
+                                      response_format_supported=self.response_format_supported),
+            'hedging': dict(self._hedge_stats, enabled=self.hedging, hedge_model=self.hedge_model,
+                            student_deadline=self.student_deadline,
+                            latency_p95=self.latency_tracker.percentile(Config.HEDGE_QUANTILE))
         }
\ No newline at end of file
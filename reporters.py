@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Reporter(ABC):
+    """
+    Destination des messages destinés à l'utilisateur (avertissements de lecture,
+    erreurs...). Les sous-classes choisissent le support: interface Streamlit,
+    journal, etc.
+    """
+    
+    @abstractmethod
+    def info(self, message: str):
+        """Message d'information."""
+    
+    @abstractmethod
+    def warning(self, message: str):
+        """Avertissement non bloquant (lignes ignorées, tableau incomplet...)."""
+    
+    @abstractmethod
+    def error(self, message: str):
+        """Erreur empêchant le traitement."""
+
+class LoggingReporter(Reporter):
+    """Rapporteur pour les traitements sans interface (ligne de commande, tâches planifiées)."""
+    
+    def __init__(self, log: logging.Logger = logger):
+        self.log = log
+    
+    def info(self, message: str):
+        self.log.info(message)
+    
+    def warning(self, message: str):
+        self.log.warning(message)
+    
+    def error(self, message: str):
+        self.log.error(message)
+
+class StreamlitReporter(Reporter):
+    """
+    Rapporteur pour l'application Streamlit.
+    
+    Streamlit n'est importé qu'au premier message, pour que les modules qui
+    l'utilisent par défaut restent utilisables sans Streamlit installé.
+    """
+    
+    def _streamlit(self):
+        import streamlit as st
+        return st
+    
+    def info(self, message: str):
+        self._streamlit().info(message)
+    
+    def warning(self, message: str):
+        self._streamlit().warning(message)
+    
+    def error(self, message: str):
+        self._streamlit().error(message)
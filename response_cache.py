@@ -0,0 +1,181 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Cache persistant (SQLite) des réponses de l'IA, adressé par le contenu de la requête.
+    
+    Les entrées expirent après `ttl_seconds` et le cache est borné à `max_entries`
+    entrées, les moins récemment utilisées étant évincées en premier.
+    """
+    
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            # WAL: lectures concurrentes possibles depuis plusieurs processus serveur
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+            )
+    
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Calcule la clé de cache à partir des éléments qui déterminent la réponse.
+        
+        Args:
+            **parts: Prompt, modèle et paramètres d'échantillonnage
+            
+        Returns:
+            str: Empreinte SHA-256 hexadécimale
+        """
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Récupère une réponse en cache.
+        
+        Args:
+            key: Clé de cache
+            
+        Returns:
+            Optional[str]: Réponse en cache ou None si absente ou expirée
+        """
+        return self.get_first([key])
+    
+    def get_first(self, keys: Iterable[str]) -> Optional[str]:
+        """
+        Récupère la première réponse en cache parmi plusieurs clés possibles
+        (ex. une par modèle), comptée comme une seule lecture dans les statistiques.
+        
+        Args:
+            keys: Clés de cache, dans l'ordre de préférence
+            
+        Returns:
+            Optional[str]: Première réponse présente et non expirée, None sinon
+        """
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                for key in keys:
+                    row = self._conn.execute(
+                        "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    
+                    if row is None:
+                        continue
+                    
+                    response, created_at = row
+                    if now - created_at > self.ttl_seconds:
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        continue
+                    
+                    self._conn.execute(
+                        "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                    )
+                    self.hits += 1
+                    return response
+                
+                self.misses += 1
+                return None
+            
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache impossible: {str(e)}")
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, response: str):
+        """
+        Enregistre une réponse et évince les entrées les moins récemment utilisées.
+        
+        Args:
+            key: Clé de cache
+            response: Réponse de l'IA
+        """
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, now)
+                )
+                self.writes += 1
+                
+                count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN ("
+                        "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                        (excess,)
+                    )
+                    self.evictions += excess
+            
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture dans le cache impossible: {str(e)}")
+    
+    def clear(self):
+        """Vide entièrement le cache."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques d'utilisation du cache.
+        
+        Returns:
+            Dict[str, Any]: Compteurs de succès, d'échecs et d'évictions
+        """
+        try:
+            with self._lock:
+                entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        
+        lookups = self.hits + self.misses
+        return {
+            'enabled': True,
+            'path': self.db_path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+    
+    def close(self):
+        """Ferme la connexion à la base du cache."""
+        with self._lock:
+            self._conn.close()
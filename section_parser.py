@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional
+
+# Patterns de recherche pour les sections de la réponse de l'IA (dans l'ordre du prompt)
+SECTION_PATTERNS = {
+    'analysis': ['1. ÉVALUATION DU CHOIX INITIAL', 'ÉVALUATION DU CHOIX', 'ANALYSE'],
+    'adequacy_level': ['2. NIVEAU D\'ADÉQUATION', 'NIVEAU D\'ADÉQUATION', 'ADÉQUATION'],
+    'alternative_careers': ['3. CARRIÈRES ALTERNATIVES', 'CARRIÈRES ALTERNATIVES', 'ALTERNATIVES'],
+    'personalized_path': ['4. PARCOURS PERSONNALISÉ', 'PARCOURS PERSONNALISÉ', 'PARCOURS']
+}
+
+class SectionParser:
+    """
+    Découpe incrémentale de la réponse de l'IA en sections.
+    
+    Le texte peut être fourni en une fois ou morceau par morceau (réponse en
+    flux): chaque ligne complète est classée dès sa réception, et une section est
+    considérée comme terminée dès que la suivante commence.
+    """
+    
+    def __init__(self):
+        self.sections = dict.fromkeys(SECTION_PATTERNS, '')
+        self.current_section: Optional[str] = None
+        self.current_content: List[str] = []
+        self._chunks: List[str] = []
+        self._buffer = ''
+    
+    @property
+    def text(self) -> str:
+        """Texte reçu jusqu'ici."""
+        return ''.join(self._chunks)
+    
+    def feed(self, text: str) -> List[str]:
+        """
+        Ajoute un morceau de texte et traite les lignes complètes.
+        
+        Args:
+            text: Morceau de la réponse de l'IA
+            
+        Returns:
+            List[str]: Sections terminées grâce à ce morceau
+        """
+        self._chunks.append(text)
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        
+        completed_sections = []
+        for line in lines:
+            completed_section = self._feed_line(line)
+            if completed_section:
+                completed_sections.append(completed_section)
+        return completed_sections
+    
+    def _feed_line(self, line: str) -> Optional[str]:
+        """
+        Classe une ligne complète.
+        
+        Args:
+            line: Ligne de la réponse
+            
+        Returns:
+            Optional[str]: Section terminée par cette ligne (début de la suivante), sinon None
+        """
+        line = line.strip()
+        if not line:
+            return None
+        
+        # Vérifier si cette ligne commence une nouvelle section
+        upper_line = line.upper()
+        section_found = None
+        for section_key, patterns in SECTION_PATTERNS.items():
+            if any(pattern in upper_line for pattern in patterns):
+                section_found = section_key
+                break
+        
+        if not section_found:
+            # Ajouter à la section courante
+            if self.current_section:
+                self.current_content.append(line)
+            return None
+        
+        # Sauvegarder la section précédente
+        completed_section = self._save_current_section()
+        
+        # Commencer la nouvelle section
+        self.current_section = section_found
+        self.current_content = []
+        
+        # Ajouter le contenu de la ligne actuelle (après le titre)
+        content_after_title = line
+        for pattern in SECTION_PATTERNS[section_found]:
+            if pattern in upper_line:
+                content_after_title = line[upper_line.find(pattern) + len(pattern):].strip()
+                break
+        
+        if content_after_title and content_after_title != line:
+            self.current_content.append(content_after_title)
+        
+        return completed_section
+    
+    def _save_current_section(self) -> Optional[str]:
+        """Enregistre la section en cours si elle a du contenu et retourne son nom."""
+        if self.current_section and self.current_content:
+            self.sections[self.current_section] = '\n'.join(self.current_content).strip()
+            return self.current_section
+        return None
+    
+    def snapshot(self) -> Dict[str, str]:
+        """
+        Sections connues à cet instant, y compris le contenu partiel de la section en cours.
+        
+        Returns:
+            Dict[str, str]: Contenu de chaque section
+        """
+        sections = dict(self.sections)
+        if self.current_section and self.current_content:
+            sections[self.current_section] = '\n'.join(self.current_content).strip()
+        return sections
+    
+    def finish(self) -> Dict[str, str]:
+        """
+        Traite la dernière ligne et retourne les sections définitives.
+        
+        Returns:
+            Dict[str, str]: Sections parsées (toute la réponse dans l'analyse si aucune n'est trouvée)
+        """
+        if self._buffer:
+            self._feed_line(self._buffer)
+            self._buffer = ''
+        
+        # Sauvegarder la dernière section
+        self._save_current_section()
+        
+        # Si aucune section n'a été trouvée, mettre tout dans l'analyse
+        if not any(self.sections.values()):
+            self.sections['analysis'] = self.text
+        
+        return dict(self.sections)
+
+def format_sections(sections: Dict[str, str]) -> str:
+    """
+    Reconstitue une réponse textuelle à partir de sections déjà découpées
+    (réponse JSON de l'IA), au format des réponses en texte libre.
+    
+    Args:
+        sections: Contenu de chaque section
+        
+    Returns:
+        str: Réponse avec un titre numéroté par section non vide
+    """
+    blocks = []
+    for section_key, patterns in SECTION_PATTERNS.items():
+        content = (sections.get(section_key) or '').strip()
+        if content:
+            blocks.append(f"{patterns[0]}\n{content}")
+    return '\n\n'.join(blocks)
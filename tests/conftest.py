@@ -0,0 +1,176 @@
+import json
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from knowledge_base_manager import KnowledgeBaseManager
+from model_router import ModelRouter
+from rate_limiter import RateLimiter
+from recommendation_engine import RecommendationEngine
+
+# Réponse texte de l'IA, dans le format des 4 sections attendues
+AI_REPLY = """1. ÉVALUATION DU CHOIX INITIAL
+Choix cohérent avec la filière.
+
+2. NIVEAU D'ADÉQUATION
+Profil bien aligné avec la filière
+
+3. CARRIÈRES ALTERNATIVES
+- Chef de chantier
+
+4. PARCOURS PERSONNALISÉ
+- Étape 1: stage en entreprise"""
+
+KB_DATA = {
+    "metiers": [
+        {
+            "nom_metier": nom,
+            "description": f"Métier de {nom.lower()}",
+            "secteur_activite": secteur,
+            "competences_requises_techniques": techniques,
+            "competences_requises_transversales": ["Communication efficace", "Rigueur"],
+            "formations_typiques": ["Licence en génie civil"],
+            "niveau_demande_marche": "élevé",
+            "perspectives_croissance": True,
+            "pertinence_realites_africaines_benin": "Forte demande locale"
+        }
+        for nom, secteur, techniques in [
+            ("Ingénieur BTP", "BTP", ["Calcul de structures", "Lecture de plans"]),
+            ("Chef de chantier", "BTP", ["Lecture de plans", "Gestion d'équipe"]),
+            ("Technicien en topographie", "BTP", ["Topographie", "Lecture de plans"]),
+            ("Développeur Web et Mobile", "Numérique", ["Programmation", "Bases de données"]),
+            ("Administrateur réseaux", "Numérique", ["Réseaux", "Bases de données"]),
+        ]
+    ],
+    "secteurs_porteurs": [
+        {"nom_secteur": "BTP", "description": "Construction et travaux publics",
+         "metiers_associes": ["Ingénieur BTP", "Chef de chantier"]},
+        {"nom_secteur": "Numérique", "description": "Secteur numérique en croissance",
+         "metiers_associes": ["Développeur Web et Mobile"]}
+    ],
+    "formations": [
+        {"nom_formation": "Licence en génie civil", "description": "Formation universitaire",
+         "metiers_prepares": ["Ingénieur BTP", "Chef de chantier"], "institutions_references": ["EPAC"]}
+    ]
+}
+
+def make_student(number: int, filiere: str = "Génie civil", carriere: str = "Ingénieur BTP") -> dict:
+    """Données d'un étudiant au format des fichiers téléversés."""
+    return {
+        'Nom': f"Nom{number}", 'Prénom': f"Prénom{number}", 'Date de Naissance': "2005-01-01",
+        'Lieu de Naissance': "Cotonou", 'Filière Actuelle': filiere, 'Carrière Envisagée': carriere
+    }
+
+class _StubServer(ThreadingHTTPServer):
+    # Rafales de connexions simultanées des tests de lots
+    request_queue_size = 256
+    daemon_threads = True
+
+class StubAPI:
+    """
+    Serveur HTTP local imitant l'API OpenRouter.
+    
+    `respond(body)` décide de chaque réponse: (code HTTP, contenu, en-têtes),
+    le contenu étant le texte de l'IA pour un code 200 et le corps brut sinon.
+    """
+    
+    def __init__(self):
+        self.requests = []
+        self.respond = lambda body: (200, AI_REPLY, {})
+        self._lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.requests.append(body)
+                status, content, headers = stub.respond(body)
+                content_type = 'application/json'
+                if status == 200 and body.get('stream'):
+                    # Réponse en flux: un événement Server-Sent Events par ligne de texte
+                    events = [{'choices': [{'delta': {'content': line}}]} for line in content.splitlines(keepends=True)]
+                    payload = ''.join(f"data: {json.dumps(event)}\n\n" for event in events)
+                    payload = (payload + "data: [DONE]\n\n").encode('utf-8')
+                    content_type = 'text/event-stream'
+                elif status == 200:
+                    payload = json.dumps({
+                        'choices': [{'message': {'content': content}}],
+                        'usage': {'prompt_tokens': 100, 'completion_tokens': 50, 'total_tokens': 150}
+                    }).encode('utf-8')
+                else:
+                    payload = content.encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(payload)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client parti avant la réponse (délai dépassé, appel en double annulé)
+                    pass
+        
+        self._server = _StubServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    
+    @property
+    def models(self) -> list:
+        """Modèles interrogés, dans l'ordre des requêtes."""
+        with self._lock:
+            return [body['model'] for body in self.requests]
+    
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def stub_api():
+    stub = StubAPI()
+    yield stub
+    stub.close()
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps(KB_DATA, ensure_ascii=False), encoding='utf-8')
+    return path
+
+@pytest.fixture
+def kb_manager(kb_file):
+    manager = KnowledgeBaseManager()
+    assert manager.load_knowledge_base(str(kb_file), use_snapshot=False)
+    return manager
+
+@pytest.fixture
+def make_engine(stub_api, kb_manager):
+    """Fabrique de moteurs pointant vers le serveur local, avec ordonnanceur et routeur propres au test."""
+    engines = []
+    
+    def factory(engine_class=RecommendationEngine, models=("test/primary",), rate_limiter=None, **kwargs):
+        kwargs.setdefault('use_cache', False)
+        kwargs.setdefault('student_deadline', 10)
+        rate_limiter = rate_limiter or RateLimiter(requests_per_minute=0, tokens_per_minute=0,
+                                                   backoff_base=0.01, backoff_max=0.1)
+        router = ModelRouter(list(models), prices={})
+        engine = engine_class("test-key", kb_manager, rate_limiter=rate_limiter, model_router=router, **kwargs)
+        engine.base_url = stub_api.url
+        engines.append(engine)
+        return engine
+    
+    yield factory
+    for engine in engines:
+        engine.close()
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from async_recommendation_engine import AsyncRecommendationEngine
+from conftest import AI_REPLY, make_student
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+def test_engine_is_usable_from_several_event_loops(make_engine):
+    # Moteur créé hors de toute boucle: sémaphore et client sont créés dans chaque boucle qui l'utilise
+    engine = make_engine(AsyncRecommendationEngine, max_concurrency=4)
+    assert 'error' not in asyncio.run(engine.agenerate_recommendation(make_student(1)))
+    assert 'error' not in asyncio.run(engine.agenerate_recommendation(make_student(2)))
+    # Le pont synchrone (boucle interne) cohabite avec les boucles précédentes
+    assert 'error' not in dict(engine.generate_recommendations_batch([make_student(3)]))[0]
+
+def test_sync_bridge_runs_a_batch(stub_api, make_engine):
+    engine = make_engine(AsyncRecommendationEngine, max_concurrency=16)
+    results = dict(engine.generate_recommendations_batch([make_student(i) for i in range(30)]))
+    assert sorted(results) == list(range(30))
+    assert all('error' not in recommendation for recommendation in results.values())
+    assert len(stub_api.requests) == 30
+
+def test_batch_survives_an_outage_then_recovery(stub_api, make_engine):
+    outage_until = time.monotonic() + 0.3
+    stub_api.respond = lambda body: ((503, '{"error": "indisponible"}', {}) if time.monotonic() < outage_until
+                                     else (200, AI_REPLY, {}))
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, failure_threshold=3,
+                          reset_timeout=0.2, backoff_base=0.01, backoff_max=0.05)
+    engine = make_engine(AsyncRecommendationEngine, rate_limiter=limiter, max_concurrency=8)
+    
+    results = list(engine.generate_recommendations_batch([make_student(i) for i in range(40)]))
+    
+    assert len(results) == 40
+    assert [r for _, r in results if 'error' in r] == []
+
+def test_failover_answer_is_cached_under_the_backup_model(stub_api, make_engine, tmp_path):
+    # Le modèle principal refuse response_format (nouvel essai sur le même modèle) puis est surchargé
+    stub_api.respond = lambda body: ((400, '{"error": "response_format"}', {}) if 'response_format' in body
+                                     else (503, '{"error": "surchargé"}', {}) if body['model'] == "test/primary"
+                                     else (200, AI_REPLY, {}))
+    cache = ResponseCache(str(tmp_path / "cache.db"), ttl_seconds=3600, max_entries=100)
+    engine = make_engine(AsyncRecommendationEngine, models=("test/primary", "test/backup"),
+                         use_cache=True, cache=cache, structured_output=True)
+    
+    assert 'error' not in asyncio.run(engine.agenerate_recommendation(make_student(1)))
+    assert stub_api.models == ["test/primary", "test/primary", "test/backup"]
+    assert engine.model_router.get_stats()[0]['failures'] == 1
+    
+    prompt = engine._build_structured_prompt(make_student(1), engine._analyze_student_profile(make_student(1)))
+    assert cache.get(engine._get_cache_key(prompt, model="test/backup", output='json')) == AI_REPLY
+    assert cache.get(engine._get_cache_key(prompt, model="test/primary", output='json')) is None
+    cache.close()
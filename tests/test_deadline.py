@@ -0,0 +1,51 @@
+import time
+
+from config import Config
+from conftest import AI_REPLY, make_student
+from rate_limiter import CircuitBreaker, LatencyTracker, RateLimiter
+
+def slow_reply(seconds: float):
+    def respond(body):
+        time.sleep(seconds)
+        return 200, AI_REPLY, {}
+    return respond
+
+def test_student_deadline_bounds_a_slow_call(stub_api, make_engine):
+    stub_api.respond = slow_reply(2)
+    engine = make_engine(student_deadline=0.5)
+    
+    started = time.monotonic()
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    assert time.monotonic() - started < 1.5
+    assert "Délai de traitement dépassé" in recommendation['error']
+
+def test_deadline_timeouts_do_not_open_the_breaker(stub_api, make_engine):
+    stub_api.respond = slow_reply(1)
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, failure_threshold=2,
+                          backoff_base=0.01, backoff_max=0.05)
+    engine = make_engine(rate_limiter=limiter, student_deadline=0.3, max_concurrency=4)
+    
+    results = list(engine.generate_recommendations_batch([make_student(i) for i in range(6)]))
+    
+    assert all('error' in recommendation for _, recommendation in results)
+    # Les délais dépassés viennent du budget des étudiants, pas d'une panne du service
+    assert limiter.breaker.state == CircuitBreaker.CLOSED
+
+def test_hedged_call_returns_the_backup_answer(stub_api, make_engine, monkeypatch):
+    monkeypatch.setattr(Config, 'HEDGE_MIN_DELAY', 0.05)
+    stub_api.respond = lambda body: (time.sleep(2 if body['model'] == "test/primary" else 0)
+                                     or (200, AI_REPLY, {}))
+    engine = make_engine(hedging=True, hedge_model="test/backup")
+    engine.latency_tracker = LatencyTracker(min_samples=1)
+    engine.latency_tracker.record(0.05)
+    # Appels précédents sans double: la part maximale d'appels doublés n'est pas atteinte
+    engine._hedge_stats['calls'] = 10
+    
+    started = time.monotonic()
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    assert 'error' not in recommendation
+    assert time.monotonic() - started < 1
+    assert stub_api.models == ["test/primary", "test/backup"]
+    assert engine.get_engine_stats()['hedging']['hedge_wins'] == 1
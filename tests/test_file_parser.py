@@ -0,0 +1,188 @@
+import io
+import json
+
+import docx
+import openpyxl
+import pandas as pd
+import pytest
+
+from conftest import make_student
+from file_parser import FileParser
+from reporters import Reporter
+
+COLUMNS = ['Nom', 'Prénom', 'Date de Naissance', 'Lieu de Naissance', 'Filière Actuelle', 'Carrière Envisagée']
+
+class RecordingReporter(Reporter):
+    """Conserve les messages au lieu de les afficher."""
+    
+    def __init__(self):
+        self.messages = []
+    
+    def info(self, message: str):
+        self.messages.append(('info', message))
+    
+    def warning(self, message: str):
+        self.messages.append(('warning', message))
+    
+    def error(self, message: str):
+        self.messages.append(('error', message))
+
+def named_file(content: bytes, name: str) -> io.BytesIO:
+    """Fichier en mémoire, nommé comme un fichier téléversé."""
+    file = io.BytesIO(content)
+    file.name = name
+    return file
+
+def excel_file(rows, columns=COLUMNS) -> io.BytesIO:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return named_file(buffer.getvalue(), "etudiants.xlsx")
+
+def word_file(paragraphs=(), tables=()) -> io.BytesIO:
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    for rows in tables:
+        table = document.add_table(rows=len(rows), cols=len(rows[0]))
+        for row, values in zip(table.rows, rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return named_file(buffer.getvalue(), "etudiants.docx")
+
+@pytest.fixture
+def parser():
+    return FileParser(reporter=RecordingReporter())
+
+def test_excel_rows_are_streamed_and_invalid_rows_reported(parser):
+    rows = [[make_student(i)[col] for col in COLUMNS] for i in range(3)]
+    rows.insert(1, [None, "Sans nom", None, None, "Génie civil", None])
+    rows.append([None] * len(COLUMNS))
+    
+    students = parser.iter_file(excel_file(rows))
+    assert next(students) == make_student(0)
+    assert list(students) == [make_student(1), make_student(2)]
+    assert parser.last_validation_report['skipped_rows'] == [3]
+    assert parser.reporter.messages[0][0] == 'warning'
+
+def test_excel_is_validated_in_chunks(parser, monkeypatch):
+    monkeypatch.setattr('config.Config.CSV_CHUNK_SIZE', 2)
+    rows = [[make_student(i)[col] for col in COLUMNS] for i in range(5)]
+    rows[2][0] = None
+    # Cellules non textuelles: converties comme str() les affiche
+    rows[4][2] = 2001
+    
+    students = parser.parse_file(excel_file(rows))
+    
+    assert [student['Nom'] for student in students] == ["Nom0", "Nom1", "Nom3", "Nom4"]
+    assert students[-1]['Date de Naissance'] == "2001"
+    assert parser.last_validation_report['skipped_rows'] == [4]
+    assert parser.last_validation_report['total_rows'] == 5
+
+def test_excel_missing_column_is_an_error(parser):
+    file = excel_file([["Nom0", "Génie civil"]], columns=['Nom', 'Filière Actuelle'])
+    with pytest.raises(ValueError, match="Colonnes manquantes"):
+        list(parser.iter_file(file))
+    assert parser.parse_file(excel_file([], columns=['Nom'])) == []
+    assert parser.reporter.messages[-1][0] == 'error'
+
+def test_csv_is_read_in_chunks(parser, monkeypatch):
+    monkeypatch.setattr('config.Config.CSV_CHUNK_SIZE', 2)
+    lines = [';'.join(COLUMNS)] + [';'.join(make_student(i).values()) for i in range(5)]
+    file = named_file('\n'.join(lines).encode('utf-8'), "etudiants.csv")
+    
+    assert parser.parse_file(file) == [make_student(i) for i in range(5)]
+    assert parser.last_validation_report['total_rows'] == 5
+
+def test_jsonl_skips_unreadable_lines(parser):
+    lines = [json.dumps(make_student(0), ensure_ascii=False), "{illisible", "",
+             json.dumps(make_student(1), ensure_ascii=False)]
+    file = named_file('\n'.join(lines).encode('utf-8'), "etudiants.jsonl")
+    
+    assert list(parser.iter_file(file)) == [make_student(0), make_student(1)]
+    assert parser.last_validation_report['skipped_rows'] == [2]
+
+def test_unsupported_format(parser):
+    with pytest.raises(ValueError, match="non supporté"):
+        list(parser.iter_file(named_file(b"", "etudiants.txt")))
+
+def test_columns_are_resolved_through_aliases_and_accents(parser):
+    column_indexes, missing = parser._resolve_columns(
+        ['ID', 'NOM', 'Prenoms', 'birthdate', 'Lieu', 'FILIERE ACTUELLE', 'Métier souhaité'])
+    assert missing == []
+    assert column_indexes == {'Nom': 1, 'Prénom': 2, 'Date de Naissance': 3, 'Lieu de Naissance': 4,
+                              'Filière Actuelle': 5, 'Carrière Envisagée': 6}
+    # Le nom exact l'emporte sur un alias
+    assert parser._resolve_columns(['name', 'Nom'])[0]['Nom'] == 1
+    assert parser._resolve_columns(['Nom'])[1] == COLUMNS[1:]
+
+def test_dataframe_rows_are_validated_column_wise(parser):
+    df = pd.DataFrame({
+        'Nom': ["Nom0", None, None, "NA"],
+        'Prénom': ["Prénom0", "Seul", None, None],
+        'Date de Naissance': pd.to_datetime(["2005-01-01", None, None, "2004-06-30"]),
+        'Lieu de Naissance': ["Cotonou", None, None, None],
+        'Filière Actuelle': ["Génie civil", "Génie civil", None, "Informatique"],
+        'Carrière Envisagée': ["Ingénieur BTP", None, None, None],
+    })
+    students, skipped = parser._students_from_dataframe(df, {col: i for i, col in enumerate(COLUMNS)},
+                                                        first_row_number=10)
+    
+    assert [student['Nom'] for student in students] == ["Nom0", "NA"]
+    assert students[0]['Date de Naissance'] == "2005-01-01 00:00:00"
+    assert students[1]['Lieu de Naissance'] == ""
+    # Ligne sans nom signalée, ligne entièrement vide ignorée sans avertissement
+    assert skipped == [11]
+
+def test_word_text_labels_are_read_in_one_pass(parser):
+    file = word_file([
+        "Nom: KOFFI Prénom: Ama",
+        "Né le : 2005-01-01",
+        "Lieu de naissance: Porto-Novo",
+        "Filière actuelle: Génie civil",
+        "Carrière envisagée: Ingénieur BTP",
+        "",
+        "NOM : DOSSOU",
+        "Prenom: Marc",
+        "Filiere: Informatique",
+    ])
+    students = list(parser.iter_file(file))
+    
+    assert students[0] == {'Nom': "KOFFI", 'Prénom': "Ama", 'Date de Naissance': "2005-01-01",
+                           'Lieu de Naissance': "Porto-Novo", 'Filière Actuelle': "Génie civil",
+                           'Carrière Envisagée': "Ingénieur BTP"}
+    # "nom:" n'est pas reconnu à l'intérieur de "prénom:"
+    assert students[1] == {'Nom': "DOSSOU", 'Prénom': "Marc", 'Filière Actuelle': "Informatique"}
+
+def test_word_tables_are_streamed_from_the_document_xml(parser, monkeypatch):
+    rows = [COLUMNS] + [list(make_student(i).values()) for i in range(3)]
+    rows[2][0] = ""
+    file = word_file(["Liste des étudiants"], tables=[[["Autre", "Tableau"], ["a", "b"]], rows])
+    # Disposition simple: python-docx n'est pas nécessaire
+    monkeypatch.setattr(docx, 'Document', lambda *args: pytest.fail("python-docx chargé inutilement"))
+    
+    assert list(parser.iter_file(file)) == [make_student(0), make_student(2)]
+    assert parser.last_validation_report == {'source': "Tableau Word 2", 'total_rows': 3, 'valid_rows': 2,
+                                             'skipped_rows': [3]}
+
+def test_word_tables_with_merged_cells_use_python_docx(parser):
+    rows = [COLUMNS] + [list(make_student(i).values()) for i in range(2)]
+    file = word_file(tables=[rows + [["Fin"] + [""] * (len(COLUMNS) - 1)]])
+    document = docx.Document(file)
+    last_row = document.tables[0].rows[-1].cells
+    last_row[0].merge(last_row[-1])
+    buffer = io.BytesIO()
+    document.save(buffer)
+    
+    file = named_file(buffer.getvalue(), "etudiants.docx")
+    assert parser._iter_docx_tables(file).__next__() == (0, None)
+    students = parser.parse_file(file)
+    assert students[:2] == [make_student(0), make_student(1)]
+    # Grille de python-docx: la cellule fusionnée est répétée dans chaque colonne couverte
+    assert students[2] == dict.fromkeys(COLUMNS, "Fin")
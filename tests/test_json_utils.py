@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from json_utils import parse_json_response, repair_truncated_json
+
+def test_reads_json_inside_a_code_fence():
+    text = 'Voici la réponse:\n```json\n{"analysis": "Bon choix"}\n```'
+    assert parse_json_response(text) == {"analysis": "Bon choix"}
+
+def test_ignores_text_around_the_value():
+    assert parse_json_response('Résultat: [1, 2] (fin)') == [1, 2]
+
+def test_repairs_a_truncated_string():
+    value = parse_json_response('{"analysis": "Bon choix", "personalized_path": "Étape 1: sta')
+    assert value == {"analysis": "Bon choix", "personalized_path": "Étape 1: sta"}
+
+def test_repairs_a_truncated_array_of_students():
+    text = '[{"etudiant": 1, "analysis": "A"}, {"etudiant": 2, "analysis": "B", "alternative_careers": ["X", '
+    value = parse_json_response(text)
+    assert [item['etudiant'] for item in value] == [1, 2]
+
+def test_missing_value_after_a_key_is_null():
+    assert json.loads(repair_truncated_json('{"a": 1, "b":')) == {"a": 1, "b": None}
+
+def test_trailing_escape_is_dropped():
+    assert json.loads(repair_truncated_json('{"a": "ligne\\')) == {"a": "ligne"}
+
+def test_complete_json_is_cut_at_the_end_of_the_value():
+    assert repair_truncated_json('{"a": 1}} reste') == '{"a": 1}'
+
+def test_no_json_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_json_response("Pas de JSON ici")
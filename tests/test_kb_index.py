@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from conftest import KB_DATA
+from kb_index import NameIndex, SimilarityIndex
+from knowledge_base_manager import KnowledgeBaseManager, Metier, SharedKnowledgeBase, get_shared_knowledge_base
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def similar_names(manager: KnowledgeBaseManager) -> dict:
+    return {metier.nom_metier: [similar.nom_metier for similar in manager.find_similar_metiers(metier)]
+            for metier in manager.metiers.values()}
+
+def test_name_index_exact_containing_and_fuzzy_search():
+    index = NameIndex()
+    for name in ["Ingénieur BTP", "Chef de chantier", "Ingénieur agronome"]:
+        index.add(name, name)
+    
+    assert index.get_exact("INGENIEUR btp") == "Ingénieur BTP"
+    assert index.get_exact("Ingénieur") is None
+    assert index.find_containing("génieur") == ["Ingénieur BTP", "Ingénieur agronome"]
+    # Faute de frappe: candidats trouvés par les trigrammes
+    assert index.search("chef de chantiers")[0][0] == "Chef de chantier"
+    assert index.search("Ingénieur BTP")[0] == ("Ingénieur BTP", 1.0)
+    assert index.search("zzz", min_score=0.5) == []
+
+def test_similarity_prefers_shared_sector_and_skills(kb_manager):
+    ingenieur = kb_manager.find_metier("Ingénieur BTP")
+    assert [m.nom_metier for m in kb_manager.find_similar_metiers(ingenieur, max_results=2)] == [
+        "Chef de chantier", "Technicien en topographie"]
+    
+    developpeur = kb_manager.find_metier("Développeur Web et Mobile")
+    assert kb_manager.find_similar_metiers(developpeur, max_results=1)[0].nom_metier == "Administrateur réseaux"
+
+def test_similarity_cache_is_invalidated_by_new_neighbours(kb_manager):
+    index = SimilarityIndex(top_k=2)
+    metiers = list(kb_manager.metiers.values())
+    for metier in metiers[:3]:
+        index.add(metier)
+    before = index.find_similar(metiers[0], max_results=2)
+    index.add(metiers[1].__class__(**dict(metiers[1].to_dict(), nom_metier="Conducteur de travaux",
+                                          competences_requises_techniques=["Calcul de structures",
+                                                                           "Lecture de plans"])))
+    after = index.find_similar(metiers[0], max_results=2)
+    assert after[0].nom_metier == "Conducteur de travaux"
+    assert after != before
+
+def test_snapshot_round_trip(kb_file, monkeypatch):
+    manager = KnowledgeBaseManager()
+    assert manager.load_knowledge_base(str(kb_file))
+    snapshot_path = Path(KnowledgeBaseManager.get_snapshot_path(str(kb_file)))
+    # Le chargement n'écrit rien à côté du fichier JSON (déploiement en lecture seule)
+    assert not snapshot_path.exists()
+    assert manager.save_snapshot(str(snapshot_path), str(kb_file))
+    
+    # Enregistrements restaurés sans repasser par leur constructeur
+    monkeypatch.setattr(Metier, '__init__', lambda *args, **kwargs: pytest.fail("Metier.__init__ appelé"))
+    reloaded = KnowledgeBaseManager()
+    assert reloaded.load_knowledge_base(str(kb_file))
+    assert reloaded.metiers == manager.metiers
+    assert reloaded.formations == manager.formations
+    assert similar_names(reloaded) == similar_names(manager)
+
+def test_stale_snapshot_is_ignored(kb_file):
+    manager = KnowledgeBaseManager()
+    assert manager.load_knowledge_base(str(kb_file))
+    snapshot_path = KnowledgeBaseManager.get_snapshot_path(str(kb_file))
+    assert manager.save_snapshot(snapshot_path, str(kb_file))
+    
+    data = dict(KB_DATA, metiers=KB_DATA['metiers'][:2])
+    kb_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    assert not KnowledgeBaseManager().load_snapshot(snapshot_path, str(kb_file))
+    
+    manager = KnowledgeBaseManager()
+    assert manager.load_knowledge_base(str(kb_file))
+    assert len(manager.metiers) == 2
+
+def test_shared_knowledge_base_reloads_a_changed_file(kb_file):
+    shared = SharedKnowledgeBase(str(kb_file), check_interval=0)
+    first = shared.get()
+    assert len(first.metiers) == 5
+    assert shared.get() is first
+    
+    data = dict(KB_DATA, metiers=KB_DATA['metiers'][:2])
+    kb_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    second = shared.get()
+    # Nouvelle instance substituée; l'ancienne reste utilisable par ses détenteurs
+    assert second is not first
+    assert len(second.metiers) == 2
+    assert len(first.metiers) == 5
+
+def test_shared_knowledge_base_is_unique_per_file(kb_file):
+    assert get_shared_knowledge_base(str(kb_file)) is get_shared_knowledge_base(str(kb_file))
+
+def test_snapshot_results_do_not_depend_on_the_vocabulary_order(kb_file):
+    """Instantané relu dans un autre processus, dont le vocabulaire partagé est rempli dans un autre ordre."""
+    manager = KnowledgeBaseManager()
+    assert manager.load_knowledge_base(str(kb_file))
+    assert manager.save_snapshot(KnowledgeBaseManager.get_snapshot_path(str(kb_file)), str(kb_file))
+    
+    script = f"""
+import json, sys
+sys.path.insert(0, {str(REPO_ROOT)!r})
+from knowledge_base_manager import COMPETENCE_VOCABULARY, KnowledgeBaseManager
+data = json.loads(open({str(kb_file)!r}, encoding='utf-8').read())
+skills = {{c for m in data['metiers'] for c in m['competences_requises_techniques'] + m['competences_requises_transversales']}}
+COMPETENCE_VOCABULARY.intern_all(['autre %d' % i for i in range(7)] + sorted(skills, reverse=True))
+manager = KnowledgeBaseManager()
+assert manager.load_snapshot(KnowledgeBaseManager.get_snapshot_path({str(kb_file)!r}), {str(kb_file)!r})
+print(json.dumps({{m.nom_metier: [s.nom_metier for s in manager.find_similar_metiers(m)] for m in manager.metiers.values()}}))
+"""
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONIOENCODING='utf-8')).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == similar_names(manager)
@@ -0,0 +1,101 @@
+import time
+
+from conftest import AI_REPLY, make_student
+from model_router import ModelRouter
+from response_cache import ResponseCache
+
+def test_choose_prefers_the_primary_until_a_backup_is_clearly_faster():
+    router = ModelRouter(["primary", "backup"], prices={}, order_penalty=0.25)
+    assert router.choose() == "primary"
+    router.record_success("primary", 1.0)
+    router.record_success("backup", 0.9)
+    assert router.choose() == "primary"
+    router.record_success("backup", 0.1)
+    assert router.choose() == "backup"
+
+def test_failing_model_is_set_aside_then_retried():
+    router = ModelRouter(["primary", "backup"], prices={}, alpha=0.5, error_threshold=0.5, cooldown=0.1)
+    router.record_failure("primary", 503)
+    assert router.choose() == "backup"
+    # Seul candidat restant: retenu malgré sa mise à l'écart
+    assert router.choose(exclude={"backup"}) == "primary"
+    time.sleep(0.11)
+    assert router.choose() == "primary"
+
+def test_rejected_requests_do_not_count_against_the_model():
+    router = ModelRouter(["primary", "backup"], prices={}, alpha=0.5, error_threshold=0.5)
+    router.record_failure("primary", 401)
+    router.record_failure("primary", 400)
+    assert router.choose() == "primary"
+    assert router.get_stats()[0]['failures'] == 0
+
+def test_cost_ceiling_excludes_expensive_models():
+    router = ModelRouter(["expensive", "cheap"], prices={"expensive": (100.0, 100.0), "cheap": (0.1, 0.1)},
+                         max_cost_per_request=0.01)
+    assert router.choose(prompt_tokens=1000, max_tokens=1000) == "cheap"
+
+def test_failover_to_the_backup_model(stub_api, make_engine):
+    stub_api.respond = lambda body: ((503, '{"error": "surchargé"}', {}) if body['model'] == "test/primary"
+                                     else (200, AI_REPLY, {}))
+    engine = make_engine(models=("test/primary", "test/backup"))
+    
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    assert 'error' not in recommendation
+    assert stub_api.models == ["test/primary", "test/backup"]
+
+def test_cached_response_is_keyed_by_the_answering_model(stub_api, make_engine, tmp_path):
+    stub_api.respond = lambda body: ((503, '{"error": "surchargé"}', {}) if body['model'] == "test/primary"
+                                     else (200, AI_REPLY, {}))
+    cache = ResponseCache(str(tmp_path / "cache.db"), ttl_seconds=3600, max_entries=100)
+    engine = make_engine(models=("test/primary", "test/backup"), use_cache=True, cache=cache,
+                         structured_output=False)
+    
+    engine.generate_recommendation(make_student(1))
+    # Une lecture manquée, bien que chaque modèle ait sa clé
+    assert (cache.hits, cache.misses) == (0, 1)
+    prompt = engine._build_deepseek_prompt(make_student(1), engine._analyze_student_profile(make_student(1)))
+    
+    assert cache.get(engine._get_cache_key(prompt, model="test/backup")) == AI_REPLY
+    assert cache.get(engine._get_cache_key(prompt, model="test/primary")) is None
+    # Réponse retrouvée sans nouvel appel
+    requests_before = len(stub_api.requests)
+    assert 'error' not in engine.generate_recommendation(make_student(1))
+    assert len(stub_api.requests) == requests_before
+    cache.close()
+
+def test_response_format_rejection_retries_the_same_model(stub_api, make_engine):
+    stub_api.respond = lambda body: ((400, '{"error": "response_format non pris en charge"}', {})
+                                     if 'response_format' in body else (200, AI_REPLY, {}))
+    engine = make_engine(models=("test/primary", "test/backup"), structured_output=True)
+    
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    assert 'error' not in recommendation
+    assert stub_api.models == ["test/primary", "test/primary"]
+    assert 'response_format' not in stub_api.requests[1]
+    assert not engine.response_format_supported
+    assert engine.model_router.get_stats()[0]['failures'] == 0
+
+def test_response_format_rejection_on_the_last_attempt_is_retried(stub_api, make_engine):
+    replies = iter([(503, "surcharge", {}), (503, "surcharge", {}),
+                    (400, '{"error": "response_format non pris en charge"}', {}), (200, AI_REPLY, {})])
+    stub_api.respond = lambda body: next(replies)
+    engine = make_engine(structured_output=True)
+    
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    # Le nouvel essai sans response_format ne compte pas parmi les tentatives
+    assert 'error' not in recommendation
+    assert len(stub_api.requests) == engine.max_retries + 1
+    assert not engine.response_format_supported
+
+def test_unrelated_bad_request_keeps_response_format(stub_api, make_engine):
+    stub_api.respond = lambda body: (400, '{"error": "prompt trop long"}', {})
+    engine = make_engine(structured_output=True)
+    
+    recommendation = engine.generate_recommendation(make_student(1))
+    
+    assert "prompt trop long" in recommendation['error']
+    assert len(stub_api.requests) == 1
+    assert engine.response_format_supported
@@ -0,0 +1,37 @@
+import json
+
+from conftest import AI_REPLY, make_student
+
+def packed_reply(body) -> tuple:
+    """Réponse groupée: élément complet pour l'étudiant 2, incomplet pour l'étudiant 1."""
+    prompt = body['messages'][-1]['content']
+    if "=== ÉTUDIANT" not in prompt:
+        return 200, AI_REPLY, {}
+    items = [
+        {"etudiant": 2, "analysis": "Choix cohérent", "adequacy_level": "Élevé",
+         "alternative_careers": ["Chef de chantier", "Topographe"], "personalized_path": ["Stage", "Licence"]},
+        {"etudiant": 1, "analysis": "Sans parcours"}
+    ]
+    return 200, "```json\n" + json.dumps(items, ensure_ascii=False) + "\n```", {}
+
+def test_sections_from_json_validates_and_flattens_lists(make_engine):
+    engine = make_engine()
+    sections = engine._sections_from_json({"analysis": " A ", "adequacy_level": 3,
+                                           "alternative_careers": ["X", " ", "Y"], "personalized_path": "P"})
+    assert sections == {'analysis': "A", 'adequacy_level': "3", 'alternative_careers': "- X\n- Y",
+                        'personalized_path': "P"}
+    assert engine._sections_from_json({"analysis": "A"}) is None
+    assert engine._sections_from_json(["A"]) is None
+
+def test_packed_reply_is_split_by_student_number(stub_api, make_engine):
+    stub_api.respond = packed_reply
+    engine = make_engine(structured_output=False)
+    
+    recommendations = engine.generate_recommendations_packed([make_student(1), make_student(2)])
+    
+    assert recommendations[1]['alternative_careers'] == "- Chef de chantier\n- Topographe"
+    # Élément invalide: l'étudiant est traité par un appel individuel
+    assert recommendations[0]['alternative_careers'] == "- Chef de chantier"
+    assert len(stub_api.requests) == 2
+    assert engine.get_engine_stats()['packing'] == {'packed_calls': 1, 'packed_students': 1, 'fallbacks': 1,
+                                                    'pack_size': 1}
@@ -0,0 +1,49 @@
+from conftest import make_student
+from profile_planner import (LIEU_PLACEHOLDER, NOM_PLACEHOLDER, PRENOM_PLACEHOLDER, ProfilePlanner,
+                             build_group_student, personalize_recommendation)
+
+def test_students_are_grouped_by_normalized_profile():
+    students = [
+        make_student(0, "Génie civil", "Ingénieur BTP"),
+        make_student(1, "GENIE CIVIL ", "ingénieur btp"),
+        make_student(2, "Informatique", "Développeur Web et Mobile"),
+        make_student(3, "Génie Civil", "Ingenieur BTP"),
+    ]
+    plan = ProfilePlanner().plan(students)
+    
+    assert [(group.representative_index, group.member_indices) for group in plan.groups] == [(0, [0, 1, 3]), (2, [2])]
+    assert plan.get_summary() == {'total_students': 4, 'distinct_profiles': 2, 'calls_saved': 2,
+                                  'collapse_ratio': 0.5, 'include_region': False}
+
+def test_region_splits_groups_when_included():
+    students = [make_student(0), dict(make_student(1), **{'Lieu de Naissance': "Parakou"})]
+    assert ProfilePlanner().plan(students).distinct_profiles == 1
+    assert ProfilePlanner(include_region=True).plan(students).distinct_profiles == 2
+
+def test_empty_plan():
+    plan = ProfilePlanner().plan([])
+    assert plan.distinct_profiles == 0
+    assert plan.collapse_ratio == 0.0
+
+def test_group_student_hides_personal_fields():
+    student = make_student(7)
+    group_student = build_group_student(student)
+    assert (group_student['Nom'], group_student['Prénom'], group_student['Lieu de Naissance']) == (
+        NOM_PLACEHOLDER, PRENOM_PLACEHOLDER, LIEU_PLACEHOLDER)
+    assert group_student['Filière Actuelle'] == student['Filière Actuelle']
+    assert build_group_student(student, include_region=True)['Lieu de Naissance'] == "Cotonou"
+    assert student['Nom'] == "Nom7"
+
+def test_personalize_replaces_placeholders_in_a_copy():
+    recommendation = {
+        'analysis': f"{PRENOM_PLACEHOLDER} {NOM_PLACEHOLDER}, né à {LIEU_PLACEHOLDER}",
+        'adequacy_level': "Bonne",
+        'score': 3,
+        'metadata': {'model': "test/primary"}
+    }
+    personalized = personalize_recommendation(recommendation, make_student(7))
+    
+    assert personalized['analysis'] == "Prénom7 Nom7, né à Cotonou"
+    assert personalized['metadata'] == {'model': "test/primary", 'shared_profile': True}
+    assert recommendation['analysis'].startswith(PRENOM_PLACEHOLDER)
+    assert 'shared_profile' not in recommendation['metadata']
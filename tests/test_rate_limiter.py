@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import AI_REPLY, make_student
+from rate_limiter import CircuitBreaker, CircuitOpenError, RateLimiter, TokenBucket, parse_retry_after
+
+def make_limiter(**kwargs) -> RateLimiter:
+    kwargs.setdefault('requests_per_minute', 0)
+    kwargs.setdefault('tokens_per_minute', 0)
+    return RateLimiter(**kwargs)
+
+def trip(limiter: RateLimiter):
+    """Ouvre le disjoncteur par une série d'erreurs serveur."""
+    for _ in range(limiter.breaker.failure_threshold):
+        limiter.record_failure(500)
+    assert limiter.breaker.state == CircuitBreaker.OPEN
+
+def test_token_bucket_spaces_requests_beyond_capacity():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    now = bucket.updated_at
+    assert bucket.reserve(1, now) == 0.0
+    assert bucket.reserve(1, now) == 0.0
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+    assert bucket.reserve(1, now) == pytest.approx(2.0)
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("illisible") is None
+
+def test_backoff_respects_retry_after():
+    limiter = make_limiter(backoff_base=0.01, backoff_max=60)
+    assert limiter.backoff_delay(0, retry_after=5) == 5
+    assert limiter.backoff_delay(10) <= 60
+
+def test_aimd_halves_once_per_burst_then_grows_back():
+    limiter = make_limiter(initial_concurrency=8)
+    sent_at = limiter.acquire()
+    limiter.release()
+    
+    limiter.record_failure(429, sent_at)
+    assert limiter.get_stats()['concurrency_limit'] == 4
+    # Requête envoyée avant la diminution: même rafale, pas de nouvelle division
+    limiter.record_failure(429, sent_at)
+    assert limiter.get_stats()['concurrency_limit'] == 4
+    assert limiter.get_stats()['throttled'] == 2
+    
+    # +1 par fenêtre complète de succès tant que la limite est atteinte
+    for _ in range(4):
+        limiter.acquire()
+    for _ in range(5):
+        limiter.record_success()
+    assert limiter.get_stats()['concurrency_limit'] == 5
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    breaker.record_failure(now=0)
+    breaker.record_failure(now=0)
+    assert breaker.admit(now=0) == 0.0
+    breaker.record_failure(now=0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.admit(now=4) == pytest.approx(6)
+
+def test_breaker_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, probe_timeout=5)
+    breaker.record_failure(now=0)
+    assert breaker.admit(now=10) == 0.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Les autres appels attendent le résultat du test
+    assert breaker.admit(now=11) == pytest.approx(4)
+    # Test resté sans réponse: un nouveau est autorisé
+    assert breaker.admit(now=15) == 0.0
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.admit(now=16) == 0.0
+
+def test_released_probe_lets_the_next_caller_test_the_service():
+    limiter = make_limiter(failure_threshold=1, reset_timeout=0.05)
+    trip(limiter)
+    limiter.breaker.probe_timeout = 30
+    time.sleep(0.06)
+    limiter.acquire()  # appel de test
+    limiter.release()
+    
+    limiter.release_probe()
+    started = time.monotonic()
+    limiter.acquire(deadline=started + 5)
+    assert time.monotonic() - started < 0.5
+    assert limiter.breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_acquire_waits_for_the_breaker_instead_of_failing():
+    limiter = make_limiter(failure_threshold=2, reset_timeout=0.2)
+    trip(limiter)
+    started = time.monotonic()
+    limiter.acquire(deadline=started + 5)
+    assert time.monotonic() - started >= 0.19
+    assert limiter.breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_acquire_fails_only_when_the_pause_outlasts_the_deadline():
+    limiter = make_limiter(failure_threshold=2, reset_timeout=30)
+    trip(limiter)
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        limiter.acquire(deadline=started + 1)
+    # Refus immédiat: attendre n'aurait servi à rien
+    assert time.monotonic() - started < 0.5
+    assert limiter.get_stats()['in_flight'] == 0
+
+def test_concurrency_wait_is_bounded_by_the_deadline():
+    limiter = make_limiter(initial_concurrency=1)
+    limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(deadline=time.monotonic() + 0.1)
+
+def test_callers_waiting_on_a_probe_resume_when_it_succeeds():
+    limiter = make_limiter(failure_threshold=1, reset_timeout=0.05, initial_concurrency=8)
+    trip(limiter)
+    limiter.breaker.probe_timeout = 5
+    time.sleep(0.06)
+    limiter.acquire()  # appel de test
+    
+    acquired = []
+    
+    def waiter():
+        limiter.acquire(deadline=time.monotonic() + 5)
+        acquired.append(time.monotonic())
+    
+    threads = [threading.Thread(target=waiter) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    assert not acquired
+    
+    limiter.record_success()
+    limiter.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(acquired) == 3
+
+def test_batch_survives_an_outage_then_recovery(stub_api, make_engine):
+    """Lot traité pendant une panne (503) puis le rétablissement: les étudiants attendent au lieu d'échouer."""
+    outage_until = time.monotonic() + 0.3
+    stub_api.respond = lambda body: ((503, '{"error": "indisponible"}', {}) if time.monotonic() < outage_until
+                                     else (200, AI_REPLY, {}))
+    limiter = make_limiter(failure_threshold=3, reset_timeout=0.2, backoff_base=0.01, backoff_max=0.05)
+    engine = make_engine(rate_limiter=limiter, max_concurrency=8)
+    
+    results = list(engine.generate_recommendations_batch([make_student(i) for i in range(40)]))
+    
+    assert len(results) == 40
+    assert [r for _, r in results if 'error' in r] == []
+    # Les appels sont suspendus pendant la pause: pas de rafale d'erreurs
+    assert len(stub_api.requests) < 80
+    assert limiter.breaker.state == CircuitBreaker.CLOSED
+
+def test_acquire_async_wakes_on_release_without_polling():
+    limiter = make_limiter(initial_concurrency=1)
+    
+    async def scenario():
+        first = await limiter.acquire_async()
+        second = asyncio.ensure_future(limiter.acquire_async(deadline=time.monotonic() + 5))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        # Libération depuis un autre thread: la coroutine est réveillée dans sa boucle
+        threading.Thread(target=limiter.release).start()
+        return first, await asyncio.wait_for(second, 1)
+    
+    first, second = asyncio.run(scenario())
+    assert second >= first
+    assert limiter.get_stats()['in_flight'] == 1
+
+def test_acquire_async_waits_for_the_breaker():
+    limiter = make_limiter(failure_threshold=1, reset_timeout=0.1)
+    trip(limiter)
+    
+    async def scenario():
+        started = time.monotonic()
+        await limiter.acquire_async(deadline=started + 5)
+        return time.monotonic() - started
+    
+    assert asyncio.run(scenario()) >= 0.09
+    
+    # Le test échoue: nouvelle pause, plus longue que l'échéance
+    limiter.breaker.reset_timeout = 30
+    limiter.record_failure(500)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(limiter.acquire_async(deadline=time.monotonic() + 1))
@@ -0,0 +1,50 @@
+from conftest import AI_REPLY
+from section_parser import SectionParser, format_sections
+
+def parse_in_chunks(text: str, size: int):
+    parser = SectionParser()
+    completed = []
+    for start in range(0, len(text), size):
+        completed += parser.feed(text[start:start + size])
+    return parser, completed, parser.finish()
+
+def test_whole_reply_is_split_into_sections():
+    _, _, sections = parse_in_chunks(AI_REPLY, len(AI_REPLY))
+    assert sections == {
+        'analysis': "Choix cohérent avec la filière.",
+        'adequacy_level': "Profil bien aligné avec la filière",
+        'alternative_careers': "- Chef de chantier",
+        'personalized_path': "- Étape 1: stage en entreprise"
+    }
+
+def test_chunked_reply_gives_the_same_sections():
+    _, _, whole = parse_in_chunks(AI_REPLY, len(AI_REPLY))
+    for size in (1, 3, 17):
+        parser, completed, sections = parse_in_chunks(AI_REPLY, size)
+        assert sections == whole
+        assert parser.text == AI_REPLY
+        # Chaque section est signalée dès que la suivante commence; la dernière à la fin
+        assert completed == ['analysis', 'adequacy_level', 'alternative_careers']
+
+def test_snapshot_includes_the_section_in_progress():
+    parser = SectionParser()
+    parser.feed("1. ÉVALUATION DU CHOIX INITIAL\nChoix cohé")
+    assert parser.snapshot()['analysis'] == ''
+    parser.feed("rent\n")
+    assert parser.snapshot()['analysis'] == "Choix cohérent"
+
+def test_content_on_the_title_line_is_kept():
+    parser = SectionParser()
+    parser.feed("4. PARCOURS PERSONNALISÉ - Étape 1: stage")
+    assert parser.finish()['personalized_path'] == "- Étape 1: stage"
+
+def test_reply_without_titles_goes_to_the_analysis():
+    parser = SectionParser()
+    parser.feed("Réponse libre sans titre")
+    assert parser.finish()['analysis'] == "Réponse libre sans titre"
+
+def test_format_sections_round_trips():
+    _, _, sections = parse_in_chunks(AI_REPLY, len(AI_REPLY))
+    parser = SectionParser()
+    parser.feed(format_sections(sections))
+    assert parser.finish() == sections
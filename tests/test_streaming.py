@@ -0,0 +1,37 @@
+import time
+
+from conftest import AI_REPLY, make_student
+from rate_limiter import RateLimiter
+
+def test_stream_yields_the_reply_and_its_sections(stub_api, make_engine):
+    engine = make_engine()
+    
+    events = list(engine.generate_recommendation_stream(make_student(1)))
+    
+    assert ''.join(event['text'] for event in events if event['type'] == 'delta') == AI_REPLY
+    assert events[-1]['type'] == 'done'
+    assert stub_api.requests[0]['stream'] is True
+
+def test_stream_releases_its_slot_before_the_consumer_finishes(stub_api, make_engine):
+    engine = make_engine()
+    events = engine.generate_recommendation_stream(make_student(1))
+    assert next(events)['type'] == 'delta'
+    
+    # Le consommateur n'a lu qu'un morceau: la réponse HTTP est pourtant terminée
+    waited_until = time.monotonic() + 2
+    while engine.rate_limiter.in_flight and time.monotonic() < waited_until:
+        time.sleep(0.01)
+    assert engine.rate_limiter.in_flight == 0
+    assert list(events)[-1]['type'] == 'done'
+
+def test_stream_retries_stop_at_the_student_deadline(stub_api, make_engine):
+    stub_api.respond = lambda body: (503, "surcharge", {'Retry-After': '5'})
+    rate_limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, backoff_base=0.01, backoff_max=10)
+    engine = make_engine(rate_limiter=rate_limiter, student_deadline=1)
+    
+    started = time.monotonic()
+    events = list(engine.generate_recommendation_stream(make_student(1)))
+    
+    assert "Délai de traitement dépassé" in events[-1]['error']
+    assert len(stub_api.requests) == 1
+    assert time.monotonic() - started < 1
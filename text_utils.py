@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+def strip_accents(text: str) -> str:
+    """
+    Supprime les accents (diacritiques) d'un texte.
+    
+    Args:
+        text: Texte à traiter
+        
+    Returns:
+        str: Texte sans accents
+    """
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un texte pour la comparaison: sans accents, en minuscules,
+    ponctuation remplacée par des espaces et espaces multiples réduits.
+    
+    Args:
+        text: Texte à normaliser
+        
+    Returns:
+        str: Texte normalisé
+    """
+    if not text:
+        return ''
+    normalized = strip_accents(text).casefold()
+    return _NON_ALNUM.sub(' ', normalized).strip()